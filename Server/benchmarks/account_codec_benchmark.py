@@ -0,0 +1,84 @@
+"""
+Account serialization benchmark
+Compares row size and encode/decode time of JSON rows against the binary codec
+
+Run from the Server directory: python -m benchmarks.account_codec_benchmark
+"""
+
+import json
+import random
+import time
+from typing import Callable, List, Tuple
+
+from database.account_codec import AccountCodec
+from database.account_model import Account
+from logic.home.structures.hero import Hero
+
+
+def build_account(hero_count: int, seed: int = 1) -> Account:
+    """Account with hero_count brawlers and some unlocked items"""
+    rand = random.Random(seed)
+    account = Account()
+    account.account_id = rand.randint(1, 1 << 40)
+    account.pass_token = "".join(rand.choice("abcdef0123456789") for _ in range(40))
+
+    avatar = account.avatar
+    avatar.account_id = account.account_id
+    avatar.name = f"Player{seed}"
+    avatar.trophies = rand.randint(0, 50000)
+    avatar.high_trophies = avatar.trophies + rand.randint(0, 500)
+    avatar.coins = rand.randint(0, 100000)
+    avatar.gems = rand.randint(0, 5000)
+    avatar.unlocked_skins = [29000000 + i for i in range(hero_count * 2)]
+    avatar.unlocked_pins = [52000000 + i for i in range(hero_count * 3)]
+    for index in range(hero_count):
+        hero = Hero(16000000 + index)
+        hero.trophies = rand.randint(0, 1250)
+        hero.highest_trophies = hero.trophies + rand.randint(0, 100)
+        hero.power_points = rand.randint(0, 3740)
+        avatar.heroes[hero.character_id] = hero
+
+    home = account.home
+    home.home_id = account.account_id
+    home.gold = avatar.coins
+    home.unlocked_heroes = list(avatar.heroes.keys())
+    home.selected_skins = {hero_id: 29000000 + i for i, hero_id in enumerate(avatar.heroes)}
+    return account
+
+
+def measure(func: Callable[[], object], iterations: int) -> float:
+    """Average microseconds per call"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def run(hero_counts: Tuple[int, ...] = (1, 20, 60), iterations: int = 2000) -> List[Tuple]:
+    """Benchmark each format for each account size, returns result rows"""
+    results = []
+    for hero_count in hero_counts:
+        account = build_account(hero_count)
+        formats = (
+            ("json", lambda: json.dumps(AccountCodec.to_plain_dict(account), ensure_ascii=False,
+                                        separators=(',', ':'))),
+            ("binary", lambda: AccountCodec.encode(account, compress=False)),
+            ("binary+zlib", lambda: AccountCodec.encode(account, compress=True)),
+        )
+        for name, encode in formats:
+            data = encode()
+            encode_us = measure(encode, iterations)
+            decode_us = measure(lambda: AccountCodec.decode(data), iterations)
+            results.append((hero_count, name, len(data), encode_us, decode_us))
+    return results
+
+
+def main() -> None:
+    """Print results as a table"""
+    print(f"{'heroes':>6} {'format':<12} {'bytes':>8} {'encode us':>10} {'decode us':>10}")
+    for hero_count, name, size, encode_us, decode_us in run():
+        print(f"{hero_count:>6} {name:<12} {size:>8} {encode_us:>10.1f} {decode_us:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Battle entity memory benchmark
+Reports bytes per instance of each battle entity class, then runs a battle that fires
+projectiles every tick and reports its traced memory, allocated blocks and how many
+projectiles were built new versus taken from the factory's free list
+
+Run from the Server directory: python -m benchmarks.battle_memory_benchmark
+"""
+
+import random
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+from logic.battle.component.buff import Buff, BuffType
+from logic.battle.object.area_effect import AreaEffect
+from logic.battle.object.character import Character
+from logic.battle.object.game_object import GameObject
+from logic.battle.object.game_object_factory import GameObjectFactory
+from logic.battle.object.game_object_manager import GameObjectManager
+from logic.battle.object.item import Item
+from logic.battle.object.projectile import Projectile
+from logic.battle.structure.battle_player import BattlePlayer
+from logic.battle.structure.player_kill_entry import PlayerKillEntry
+
+ENTITIES: Dict[str, Callable[[], object]] = {
+    "GameObject": GameObject,
+    "Character": Character,
+    "Projectile": Projectile,
+    "AreaEffect": AreaEffect,
+    "Item": Item,
+    "Buff": lambda: Buff(BuffType.DAMAGE_BOOST, 5.0),
+    "BattlePlayer": BattlePlayer,
+    "PlayerKillEntry": PlayerKillEntry,
+}
+
+
+def measure_instance(create: Callable[[], object], count: int) -> float:
+    """Traced bytes per live instance"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    instances = [create() for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del instances
+    return (after - before) / count
+
+
+def run_battle(ticks: int, characters: int, shots_per_tick: int, seed: int = 1) -> Tuple:
+    """Battle where every tick fires shots_per_tick projectiles that fly until they expire"""
+    rand = random.Random(seed)
+    GameObjectFactory.reset_pool()
+    manager = GameObjectManager("objects")
+    for index in range(characters):
+        character = GameObjectFactory.create_character(16000000 + index, 1)
+        character.set_position(rand.uniform(0, 4000), rand.uniform(0, 4000))
+        manager.add_object(character)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(ticks):
+        for _ in range(shots_per_tick):
+            projectile = GameObjectFactory.create_projectile(6000000, 1)
+            projectile.max_travel_distance = rand.uniform(100, 600)
+            projectile.launch(rand.uniform(0, 4000), rand.uniform(0, 4000), rand.uniform(0, 4000), rand.uniform(0, 4000))
+            manager.add_object(projectile)
+        manager.update(0.05)
+    elapsed_us = (time.perf_counter() - start) / ticks * 1e6
+    current, peak = tracemalloc.get_traced_memory()
+    blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    tracemalloc.stop()
+
+    pool = GameObjectFactory.get_pool_stats()
+    return ticks * shots_per_tick, current, peak, blocks, pool["allocated"], pool["reused"], elapsed_us
+
+
+def run(count: int = 20000) -> Tuple[List[Tuple[str, float]], Tuple]:
+    """Bytes per entity and the projectile battle"""
+    entities = [(name, measure_instance(create, count)) for name, create in ENTITIES.items()]
+    return entities, run_battle(400, 10, 20)
+
+
+def main() -> None:
+    """Print results as tables"""
+    entities, battle = run()
+    print(f"{'entity':<16} {'bytes':>7}")
+    for name, size in entities:
+        print(f"{name:<16} {size:>7.0f}")
+
+    shots, current, peak, blocks, allocated, reused, elapsed_us = battle
+    print()
+    print(f"battle: {shots} projectiles fired, {current / 1024:.1f} KiB live, {peak / 1024:.1f} KiB peak, "
+          f"{blocks} blocks, {allocated} projectiles built, {reused} reused, {elapsed_us:.1f} us/tick")
+
+
+if __name__ == "__main__":
+    main()
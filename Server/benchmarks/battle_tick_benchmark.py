@@ -0,0 +1,109 @@
+"""
+Battle tick scheduler benchmark
+Runs hundreds of simulated battles on BattleScheduler at 20 Hz and reports frame time,
+overruns and tick lateness (jitter) for each battle count and worker count, then runs busier
+battles on one and on several battle worker processes
+
+Run from the Server directory: python -m benchmarks.battle_tick_benchmark
+"""
+
+import time
+from typing import List, Tuple
+
+from logic.game.battle_scheduler import BattleScheduler
+from logic.game.battle_workers import BattleWorkerPool
+from settings.configuration import Configuration
+
+
+class SimulatedBattle:
+    """Battle with a fixed amount of work per tick and per input"""
+
+    def __init__(self, work: int):
+        """Initialize battle"""
+        self.work = work
+        self.is_game_over = False
+        self.inputs = 0
+        self.ticks = 0
+        self.positions = [(float(i), float(i)) for i in range(20)]
+
+    def process_udp_message(self, session_id: int, data: bytes) -> None:
+        """Count applied input"""
+        self.inputs += 1
+
+    def tick(self, delta_time: float) -> None:
+        """Move 20 objects work times"""
+        for _ in range(self.work):
+            self.positions = [(x + delta_time, y - delta_time) for x, y in self.positions]
+        self.ticks += 1
+
+
+def run_case(battles: int, workers: int, seconds: float, work: int) -> Tuple:
+    """Tick battles for the given time, feeding each one input per tick"""
+    BattleScheduler.start(20, workers, 256, BattleScheduler.remove)
+    simulated = [SimulatedBattle(work) for _ in range(battles)]
+    for battle_id, battle in enumerate(simulated, 1):
+        BattleScheduler.add(battle_id, battle)
+
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        for battle_id in range(1, battles + 1):
+            BattleScheduler.queue_input(battle_id, battle_id, b"input")
+        time.sleep(0.05)
+
+    metrics = BattleScheduler.get_metrics()
+    BattleScheduler.shutdown()
+    ticks = [battle.ticks for battle in simulated]
+    return (battles, workers, min(ticks), max(ticks), metrics["avg_frame_ms"], metrics["max_frame_ms"],
+            metrics["overruns"], metrics["skipped_ticks"], metrics["max_lateness_ms"])
+
+
+def run(cases: Tuple[Tuple[int, int], ...] = ((100, 1), (300, 2), (600, 2), (600, 4)),
+        seconds: float = 3.0, work: int = 2) -> List[Tuple]:
+    """Benchmark each (battles, workers) case, returns result rows"""
+    return [run_case(battles, workers, seconds, work) for battles, workers in cases]
+
+
+def run_process_case(battles: int, processes: int, seconds: float, work: int) -> Tuple:
+    """Tick battles on battle worker processes, feeding each one input per tick through the rings"""
+    config = Configuration()
+    config.battle_tick_workers = 1
+    Configuration.instance = config
+    BattleWorkerPool.start(processes, config.battle_ring_size, BattleWorkerPool.release, lambda session, data: None)
+    for battle_id in range(1, battles + 1):
+        BattleWorkerPool.assign(battle_id)
+        BattleWorkerPool.ship(battle_id, SimulatedBattle(work))
+
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        for battle_id in range(1, battles + 1):
+            BattleWorkerPool.queue_input(battle_id, battle_id, b"input")
+        time.sleep(0.05)
+
+    workers = BattleWorkerPool.get_metrics()["workers"]
+    BattleWorkerPool.shutdown()
+    return (battles, processes, max(worker["avg_frame_ms"] for worker in workers),
+            max(worker["max_frame_ms"] for worker in workers), sum(worker["overruns"] for worker in workers))
+
+
+def run_processes(cases: Tuple[Tuple[int, int], ...] = ((200, 1), (200, 2), (200, 4)),
+                  seconds: float = 4.0, work: int = 8) -> List[Tuple]:
+    """Benchmark each (battles, processes) case, returns result rows"""
+    return [run_process_case(battles, processes, seconds, work) for battles, processes in cases]
+
+
+def main() -> None:
+    """Print results as tables"""
+    print(f"{'battles':>7} {'workers':>7} {'ticks':>11} {'avg ms':>7} {'max ms':>7} "
+          f"{'overruns':>8} {'skipped':>7} {'late ms':>8}")
+    for battles, workers, low, high, avg_ms, max_ms, overruns, skipped, late_ms in run():
+        print(f"{battles:>7} {workers:>7} {f'{low}-{high}':>11} {avg_ms:>7.2f} {max_ms:>7.2f} "
+              f"{overruns:>8} {skipped:>7} {late_ms:>8.2f}")
+
+    print()
+    print(f"{'battles':>7} {'procs':>7} {'avg ms':>7} {'max ms':>7} {'overruns':>8}")
+    for battles, processes, avg_ms, max_ms, overruns in run_processes():
+        print(f"{battles:>7} {processes:>7} {avg_ms:>7.2f} {max_ms:>7.2f} {overruns:>8}")
+
+
+if __name__ == "__main__":
+    main()
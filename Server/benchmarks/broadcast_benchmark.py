@@ -0,0 +1,117 @@
+"""
+Broadcast fan-out benchmark
+Compares building a message per recipient, sharing one message object, and the
+encode-once EncodedMessage used by Processor.broadcast, for 10k sessions
+
+Run from the Server directory: python -m benchmarks.broadcast_benchmark
+"""
+
+import time
+from typing import Callable, List, Tuple
+
+from message.encoded_message import EncodedMessage
+from networking.frame_buffer import encode_header
+from networking.outbound_buffer import OutboundBuffer
+from titan.data_stream.byte_stream import ByteStream
+
+
+class ChatMessage:
+    """Team chat sized message with a real ByteStream encode"""
+
+    def __init__(self, text: str):
+        """Initialize message"""
+        self.text = text
+        self.stream = ByteStream()
+
+    def encode(self) -> None:
+        """Encode sender and text like a chat stream entry"""
+        self.stream.write_v_int(2)
+        self.stream.write_long(123456789)
+        self.stream.write_string("Sender")
+        self.stream.write_v_int(3)
+        self.stream.write_string(self.text)
+        self.stream.write_boolean(False)
+
+    def get_message_type(self) -> int:
+        """Get message type ID"""
+        return 24131
+
+    def get_version(self) -> int:
+        """Get message version"""
+        return 0
+
+    def get_message_bytes(self) -> bytes:
+        """Encoded payload"""
+        return self.stream.get_bytes()
+
+    def get_encoding_length(self) -> int:
+        """Encoded length"""
+        return len(self.stream.data)
+
+
+def write_frame(outbound: OutboundBuffer, message, header: bytes = None) -> None:
+    """Plaintext branch of Messaging.encrypt_and_write"""
+    if message.get_encoding_length() == 0:
+        message.encode()
+    payload = message.get_message_bytes()
+    if header is None:
+        header = encode_header(message.get_message_type(), len(payload), message.get_version())
+    outbound.append(header)
+    outbound.append(payload)
+
+
+def per_recipient(buffers: List[OutboundBuffer], text: str) -> None:
+    """A new message for every session (old Sessions.send_global_message)"""
+    for outbound in buffers:
+        write_frame(outbound, ChatMessage(text))
+
+
+def shared_message(buffers: List[OutboundBuffer], text: str) -> None:
+    """One message object, payload and header rebuilt per session (old MatchmakingSlot.update)"""
+    message = ChatMessage(text)
+    for outbound in buffers:
+        write_frame(outbound, message)
+
+
+def encode_once(buffers: List[OutboundBuffer], text: str) -> None:
+    """EncodedMessage, payload and header shared by every session (Processor.broadcast)"""
+    encoded = EncodedMessage(ChatMessage(text))
+    for outbound in buffers:
+        write_frame(outbound, encoded, encoded.header)
+
+
+def measure(strategy: Callable[[List[OutboundBuffer], str], None], sessions: int,
+            text: str, rounds: int) -> Tuple[float, int]:
+    """Average milliseconds per broadcast and payload bytes allocated per broadcast"""
+    total = 0.0
+    allocated = 0
+    for _ in range(rounds):
+        buffers = [OutboundBuffer(high_water=1 << 30) for _ in range(sessions)]
+        start = time.perf_counter()
+        strategy(buffers, text)
+        total += time.perf_counter() - start
+        allocated = len({id(chunk) for outbound in buffers for chunk in outbound._chunks})
+    return total / rounds * 1000, allocated
+
+
+def run(sessions: int = 10000, rounds: int = 5) -> List[Tuple]:
+    """Benchmark each strategy for a short and a long message, returns result rows"""
+    results = []
+    for text in ("gg", "x" * 512):
+        for name, strategy in (("per-recipient", per_recipient),
+                               ("shared-object", shared_message),
+                               ("encode-once", encode_once)):
+            elapsed_ms, buffers = measure(strategy, sessions, text, rounds)
+            results.append((len(text), name, elapsed_ms, buffers))
+    return results
+
+
+def main() -> None:
+    """Print results as a table"""
+    print(f"{'text':>5} {'strategy':<14} {'ms/broadcast':>13} {'distinct buffers':>17}")
+    for length, name, elapsed_ms, buffers in run():
+        print(f"{length:>5} {name:<14} {elapsed_ms:>13.2f} {buffers:>17}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Broadphase benchmark
+Scatters 100, 500 and 2000 obstacles over a map and, with the per-object and the NumPy
+backend, checks the single collision pass and the per-object find_collisions against an
+all-pairs test and the ring search of get_nearest_object against a full scan, then reports
+milliseconds per collision pass and microseconds per query
+
+Run from the Server directory: python -m benchmarks.broadphase_benchmark
+"""
+
+import random
+import time
+from typing import List, Optional, Set, Tuple
+
+from logic.battle.object.game_object import GameObject
+from logic.battle.object.game_object_factory import GameObjectFactory
+from logic.battle.object.game_object_manager import GameObjectManager
+from logic.battle.object.object_store import NUMPY_AVAILABLE
+
+MAP_SIZE = 4000.0
+QUERIES = 500
+
+
+def build_manager(count: int, backend: str, seed: int = 1) -> GameObjectManager:
+    """Manager with count obstacles of radius 10 to 40, every tenth one inactive"""
+    rand = random.Random(seed)
+    GameObjectFactory.reset_object_ids()
+    manager = GameObjectManager(backend)
+    for index in range(count):
+        obstacle = GameObjectFactory.create_obstacle(rand.uniform(0, MAP_SIZE), rand.uniform(0, MAP_SIZE),
+                                                     rand.uniform(10, 40))
+        if index % 10 == 0:
+            obstacle.deactivate()
+        manager.add_object(obstacle)
+    return manager
+
+
+def all_pairs(manager: GameObjectManager) -> Set[frozenset]:
+    """Colliding pairs by testing every object against every other"""
+    objects = list(manager.objects.values())
+    return {frozenset((obj.object_id, other.object_id))
+            for index, obj in enumerate(objects) for other in objects[index + 1:]
+            if obj.is_colliding_with(other)}
+
+
+def scan_nearest(manager: GameObjectManager, x: float, y: float) -> Optional[GameObject]:
+    """Nearest active object by looking at all of them"""
+    active = [obj for obj in manager.objects.values() if obj.is_object_active()]
+    return min(active, key=lambda obj: obj.distance_to_position(x, y), default=None)
+
+
+def check_same(manager: GameObjectManager, points: List[Tuple[float, float]]) -> int:
+    """Both collision paths and the ring search must agree with the brute-force answers"""
+    expected = all_pairs(manager)
+    pairs = {frozenset((obj.object_id, other.object_id)) for obj, other in manager.find_colliding_pairs()}
+    assert pairs == expected, "collision pass differs from the all-pairs test"
+    per_object = {frozenset((obj.object_id, other.object_id))
+                  for obj in manager.objects.values() for other in manager.find_collisions(obj)}
+    assert per_object == expected, "find_collisions differs from the all-pairs test"
+
+    for x, y in points:
+        found = manager.get_nearest_object(x, y)
+        reference = scan_nearest(manager, x, y)
+        assert found.distance_to_position(x, y) == reference.distance_to_position(x, y), \
+            f"nearest object differs at ({x:.1f}, {y:.1f})"
+    return len(expected)
+
+
+def measure(count: int, backend: str) -> Tuple:
+    """Collision pass and find_collisions loop in ms, ring search and full scan in us per query"""
+    manager = build_manager(count, backend)
+    rand = random.Random(2)
+    points = [(rand.uniform(0, MAP_SIZE), rand.uniform(0, MAP_SIZE)) for _ in range(QUERIES)]
+    pair_count = check_same(manager, points)
+    repeats = 5
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        manager.find_colliding_pairs()
+    pass_ms = (time.perf_counter() - start) / repeats * 1e3
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for obj in manager.objects.values():
+            manager.find_collisions(obj)
+    loop_ms = (time.perf_counter() - start) / repeats * 1e3
+
+    start = time.perf_counter()
+    for x, y in points:
+        manager.get_nearest_object(x, y)
+    ring_us = (time.perf_counter() - start) / QUERIES * 1e6
+
+    start = time.perf_counter()
+    for x, y in points:
+        scan_nearest(manager, x, y)
+    scan_us = (time.perf_counter() - start) / QUERIES * 1e6
+
+    return count, backend, pair_count, pass_ms, loop_ms, ring_us, scan_us
+
+
+def run(counts: Tuple[int, ...] = (100, 500, 2000)) -> List[Tuple]:
+    """Benchmark each object count with each backend, returns result rows"""
+    backends = ("objects", "numpy") if NUMPY_AVAILABLE else ("objects",)
+    return [measure(count, backend) for count in counts for backend in backends]
+
+
+def main() -> None:
+    """Print results as a table"""
+    if not NUMPY_AVAILABLE:
+        print("numpy is not installed, only the per-object backend is measured")
+    print(f"{'objects':>7} {'backend':<8} {'pairs':>6} {'pass ms':>8} {'per-obj ms':>10} "
+          f"{'nearest us':>10} {'scan us':>8}")
+    for count, backend, pair_count, pass_ms, loop_ms, ring_us, scan_us in run():
+        print(f"{count:>7} {backend:<8} {pair_count:>6} {pass_ms:>8.2f} {loop_ms:>10.2f} "
+              f"{ring_us:>10.1f} {scan_us:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+ByteStream benchmark
+Encodes OwnHomeDataMessage with cold section caches, then with warm section caches,
+and reads the result back field by field
+
+Run from the Server directory: python -m benchmarks.byte_stream_benchmark
+"""
+
+import time
+from typing import Callable, List, Tuple
+
+from benchmarks.account_codec_benchmark import build_account
+from logic.helper.section_cache import SectionCache
+from logic.message.home.own_home_data_message import OwnHomeDataMessage
+from titan.data_stream.byte_stream import ByteStream
+
+
+def build_message(hero_count: int) -> OwnHomeDataMessage:
+    """OwnHomeDataMessage for an account with hero_count brawlers"""
+    account = build_account(hero_count)
+    message = OwnHomeDataMessage()
+    message.home = account.home
+    message.avatar = account.avatar
+    return message
+
+
+def invalidate(message: OwnHomeDataMessage) -> None:
+    """Drop the encoded sections so the next encode runs every encoder"""
+    message.home.encode_cache.invalidate()
+    message.avatar.encode_cache.invalidate()
+
+
+def encode_cold(message: OwnHomeDataMessage) -> bytes:
+    """Every encoder runs, as on the first login"""
+    invalidate(message)
+    return encode_cached(message)
+
+
+def encode_cached(message: OwnHomeDataMessage) -> bytes:
+    """Home and avatar sections already encoded, as on GoHome"""
+    message.reset_stream()
+    message.encode()
+    return message.get_message_bytes()
+
+
+def read_fields(stream, count: int) -> None:
+    """Read count varints and a string, the bulk of a home decode"""
+    stream.read_v_long()
+    for _ in range(count):
+        stream.read_v_int()
+    stream.read_string()
+
+
+def measure(func: Callable[[], object], iterations: int) -> float:
+    """Average microseconds per call"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def run(hero_counts: Tuple[int, ...] = (1, 20, 60), iterations: int = 2000) -> List[Tuple]:
+    """Benchmark each stream for each account size, returns result rows"""
+    results = []
+    for hero_count in hero_counts:
+        message = build_message(hero_count)
+        reference = encode_cold(message)
+        for name, encode in (("cold", encode_cold), ("cached", encode_cached)):
+            assert encode(message) == reference, f"{name} output differs"
+            encode_us = measure(lambda: encode(message), iterations)
+            results.append((hero_count, name, len(reference), encode_us))
+
+        stream = ByteStream(reference)
+
+        def read() -> None:
+            stream.set_offset(0)
+            read_fields(stream, 12)
+        results.append((hero_count, "read", len(reference), measure(read, iterations * 10)))
+    return results
+
+
+def main() -> None:
+    """Print results as a table"""
+    print(f"{'heroes':>6} {'encode':<14} {'bytes':>7} {'us':>8}")
+    for hero_count, name, size, elapsed_us in run():
+        print(f"{hero_count:>6} {name:<14} {size:>7} {elapsed_us:>8.2f}")
+    sections = SectionCache.get_stats()
+    print(f"sections: {sections['hits']} hits, {sections['misses']} misses ({sections['hit_rate']:.1f}% hit rate)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+GameObjectManager update benchmark
+Steps battles of 10, 100 and 1000 objects (moving characters, projectiles, drifting objects)
+with the per-object backend and the NumPy array backend, checks both end in the same state
+and reports microseconds per tick, collision pass included
+
+Run from the Server directory: python -m benchmarks.game_object_benchmark
+"""
+
+import random
+import time
+from typing import Dict, List, Set, Tuple
+
+from logic.battle.object.game_object_factory import GameObjectFactory, GameObjectType
+from logic.battle.object.game_object_manager import GameObjectManager
+from logic.battle.object.object_store import NUMPY_AVAILABLE
+
+DELTA_TIME = 0.05
+
+
+def build_manager(count: int, backend: str, seed: int = 1) -> GameObjectManager:
+    """Manager with count objects: 40% characters walking to a target, 40% projectiles, 20% drifting"""
+    rand = random.Random(seed)
+    GameObjectFactory.reset_object_ids()
+    manager = GameObjectManager(backend)
+    for index in range(count):
+        if index % 5 < 2:
+            obj = GameObjectFactory.create_character(16000000 + index % 40, 1 + index % 11)
+            obj.set_position(rand.uniform(0, 4000), rand.uniform(0, 4000))
+            obj.move_to(rand.uniform(0, 4000), rand.uniform(0, 4000))
+        elif index % 5 < 4:
+            obj = GameObjectFactory.create_projectile(6000000 + index % 30, index)
+            obj.max_travel_distance = rand.uniform(200, 3000)
+            obj.launch(rand.uniform(0, 4000), rand.uniform(0, 4000), rand.uniform(0, 4000), rand.uniform(0, 4000))
+        else:
+            obj = GameObjectFactory.create_object(GameObjectType.OBSTACLE)
+            obj.set_position(rand.uniform(0, 4000), rand.uniform(0, 4000))
+            obj.set_velocity(rand.uniform(-100, 100), rand.uniform(-100, 100))
+            obj.set_acceleration(rand.uniform(-10, 10), rand.uniform(-10, 10))
+        manager.add_object(obj)
+    return manager
+
+
+def snapshot(manager: GameObjectManager) -> List[Tuple]:
+    """Comparable state of every object"""
+    return sorted((obj.object_id, obj.x, obj.y, obj.velocity_x, obj.velocity_y, obj.is_alive)
+                  for obj in manager.objects.values())
+
+
+def grid_cells(manager: GameObjectManager) -> Dict[int, Set[int]]:
+    """Object ids filed under each grid cell key"""
+    return {key: set(cell) for key, cell in manager.grid.cells.items()}
+
+
+def pair_ids(manager: GameObjectManager) -> Set[frozenset]:
+    """Ids of the colliding pairs of the current tick"""
+    return {frozenset((obj.object_id, other.object_id)) for obj, other in manager.get_collision_pairs()}
+
+
+def check_same(count: int, ticks: int) -> None:
+    """Both backends must end every tick in the same state, grid and collisions"""
+    plain = build_manager(count, "objects")
+    arrays = build_manager(count, "numpy")
+    for tick in range(ticks):
+        plain.update(DELTA_TIME)
+        arrays.update(DELTA_TIME)
+        assert snapshot(plain) == snapshot(arrays), f"backends differ after tick {tick + 1} with {count} objects"
+        assert grid_cells(plain) == grid_cells(arrays), f"grids differ after tick {tick + 1} with {count} objects"
+        assert pair_ids(plain) == pair_ids(arrays), f"collisions differ after tick {tick + 1} with {count} objects"
+
+
+def measure(count: int, backend: str, ticks: int) -> float:
+    """Average microseconds per update and collision pass"""
+    manager = build_manager(count, backend)
+    start = time.perf_counter()
+    for _ in range(ticks):
+        manager.update(DELTA_TIME)
+        manager.get_collision_pairs()
+    return (time.perf_counter() - start) / ticks * 1e6
+
+
+def run(counts: Tuple[int, ...] = (10, 100, 1000), ticks: int = 60) -> List[Tuple]:
+    """Benchmark both backends for each object count, returns result rows"""
+    backends = ("objects", "numpy") if NUMPY_AVAILABLE else ("objects",)
+    results = []
+    for count in counts:
+        if NUMPY_AVAILABLE:
+            check_same(count, ticks)
+        for backend in backends:
+            results.append((count, backend, measure(count, backend, ticks)))
+    return results
+
+
+def main() -> None:
+    """Print results as a table"""
+    if not NUMPY_AVAILABLE:
+        print("numpy is not installed, only the per-object backend is measured")
+    print(f"{'objects':>7} {'backend':<8} {'us/tick':>9}")
+    for count, backend, elapsed_us in run():
+        print(f"{count:>7} {backend:<8} {elapsed_us:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
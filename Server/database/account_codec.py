@@ -0,0 +1,638 @@
+"""
+Versioned binary serialization for accounts
+Replaces JSON blobs in the accounts table while still reading rows written as JSON
+Attributes outside the field tables travel in a JSON extras block so nothing is dropped on save
+"""
+
+import base64
+import importlib
+import json
+import struct
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from database.account_model import Account
+from logic.avatar.client_avatar import ClientAvatar
+from logic.home.client_home import ClientHome
+from logic.home.structures.hero import Hero
+from titan.data_stream.byte_stream import ByteStream
+from titan.util.zlib_helper import ZLibHelper
+
+# Field kinds
+INT = 0        # signed 32-bit, consecutive INT fields are packed as one block
+LONG = 1       # 64-bit
+STRING = 2
+BOOL = 3
+INT_LIST = 4
+INT_MAP = 5
+
+# Fields are only ever appended; a field added in version N is read when version >= N.
+# Name, thumbnail and trophies lead the avatar section so summaries stop reading early.
+AVATAR_FIELDS = (
+    ("name", STRING, 1),
+    ("thumbnail_id", INT, 1),
+    ("trophies", INT, 1),
+    ("account_id", LONG, 1),
+    ("name_color_id", INT, 1),
+    ("experience_points", INT, 1),
+    ("experience_level", INT, 1),
+    ("high_trophies", INT, 1),
+    ("tokens", INT, 1),
+    ("coins", INT, 1),
+    ("gems", INT, 1),
+    ("star_tokens", INT, 1),
+    ("power_play_points", INT, 1),
+    ("solo_wins", INT, 1),
+    ("duo_wins", INT, 1),
+    ("team_wins", INT, 1),
+    ("current_season", INT, 1),
+    ("current_season_trophies", INT, 1),
+    ("battle_pass_tier", INT, 1),
+    ("battle_pass_tokens", INT, 1),
+    ("profile_icon_id", INT, 1),
+    ("battles_played", INT, 1),
+    ("victory_count", INT, 1),
+    ("banned", BOOL, 1),
+    ("is_premium", BOOL, 1),
+    ("unlocked_skins", INT_LIST, 1),
+    ("unlocked_pins", INT_LIST, 1),
+)
+
+HOME_FIELDS = (
+    ("account_id", LONG, 1),
+    ("home_id", LONG, 1),
+    ("player_name", STRING, 1),
+    ("experience_level", INT, 1),
+    ("experience_points", INT, 1),
+    ("trophies", INT, 1),
+    ("highest_trophies", INT, 1),
+    ("gold", INT, 1),
+    ("diamonds", INT, 1),
+    ("token_doubler", INT, 1),
+    ("big_box_tokens", INT, 1),
+    ("star_tokens", INT, 1),
+    ("selected_hero", INT, 1),
+    ("name_color", INT, 1),
+    ("player_thumbnail", INT, 1),
+    ("battle_pass_season", INT, 1),
+    ("battle_pass_tokens", INT, 1),
+    ("battle_pass_tier", INT, 1),
+    ("premium_pass_purchased", BOOL, 1),
+    ("alliance_id", LONG, 1),
+    ("alliance_name", STRING, 1),
+    ("alliance_role", INT, 1),
+    ("preferred_theme_id", INT, 1),
+    ("total_battles", INT, 1),
+    ("victories", INT, 1),
+    ("defeats", INT, 1),
+    ("total_damage_dealt", LONG, 1),
+    ("last_online", LONG, 1),
+    ("total_play_time", LONG, 1),
+    ("unlocked_heroes", INT_LIST, 1),
+    ("unlocked_skins", INT_LIST, 1),
+    ("unlocked_locations", INT_LIST, 1),
+    ("selected_skins", INT_MAP, 1),
+)
+
+HERO_FIELDS = (
+    ("card_id", INT, 1),
+    ("trophies", INT, 1),
+    ("highest_trophies", INT, 1),
+    ("power_points", INT, 1),
+    ("power_level", INT, 1),
+    ("selected_star_power_id", INT, 1),
+    ("selected_gadget_id", INT, 1),
+    ("selected_gear_id1", INT, 1),
+    ("selected_gear_id2", INT, 1),
+    ("selected_skin_id", INT, 1),
+    ("selected_over_charge_id", INT, 1),
+)
+
+_DEFAULTS = {INT: 0, LONG: 0, STRING: "", BOOL: False}
+
+# Attributes that are runtime state rather than account data
+_TRANSIENT = frozenset(("dirty", "encode_cache"))
+
+# Only classes from these packages are rebuilt from stored extras
+_STRUCTURE_PACKAGES = ("logic.",)
+
+# "module:qualname" -> class, or None when it no longer resolves
+_STRUCTURES: Dict[str, Optional[type]] = {}
+
+# id(fields) -> attribute names kept out of the extras block
+_FIELD_NAMES: Dict[int, frozenset] = {}
+
+# (id(fields), version) -> compiled field plan
+_PLANS: Dict[Tuple[int, int], List[Tuple[int, Tuple[str, ...]]]] = {}
+
+
+def _pack_ints(buffer: bytearray, values) -> None:
+    """Append signed 32-bit values as one big-endian block"""
+    values = list(values)
+    try:
+        buffer.extend(struct.pack(f'>{len(values)}i', *values))
+    except struct.error:
+        # Out of range values wrap to int32 like the C# server's int fields
+        buffer.extend(struct.pack(f'>{len(values)}i', *(((int(v) + 0x80000000) & 0xFFFFFFFF) - 0x80000000
+                                                          for v in values)))
+
+
+def _unpack_ints(buffer: bytearray, offset: int, count: int) -> Tuple[Tuple[int, ...], int]:
+    """Read count signed 32-bit values, returns (values, new offset)"""
+    try:
+        return struct.unpack_from(f'>{count}i', buffer, offset), offset + count * 4
+    except struct.error:
+        raise ValueError("Truncated account data")
+
+
+def _to_json(value: Any) -> Any:
+    """JSON form of an attribute value; objects keep their class so _from_json can rebuild them"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (bytes, bytearray)):
+        return {"__bytes__": base64.b64encode(value).decode('ascii')}
+    if isinstance(value, (list, tuple, set)):
+        return [_to_json(item) for item in value]
+    if isinstance(value, dict):
+        if all(isinstance(key, str) and not key.startswith("__") for key in value):
+            return {key: _to_json(item) for key, item in value.items()}
+        return {"__items__": [[_to_json(key), _to_json(item)] for key, item in value.items()]}
+    if hasattr(value, '__dict__'):
+        cls = type(value)
+        return {"__type__": f"{cls.__module__}:{cls.__qualname__}",
+                "fields": {name: _to_json(item) for name, item in vars(value).items() if name not in _TRANSIENT}}
+    # Locks, callables and the like are runtime state
+    return None
+
+
+def _from_json(value: Any) -> Any:
+    """Rebuild a value written by _to_json"""
+    if isinstance(value, list):
+        return [_from_json(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if "__bytes__" in value:
+        return base64.b64decode(value["__bytes__"])
+    if "__items__" in value:
+        return {_from_json(key): _from_json(item) for key, item in value["__items__"]}
+    if "__type__" in value:
+        fields = {name: _from_json(item) for name, item in (value.get("fields") or {}).items()}
+        cls = _structure_class(value["__type__"])
+        if cls is None:
+            return fields
+        try:
+            obj = cls()
+        except TypeError:
+            obj = cls.__new__(cls)
+        obj.__dict__.update(fields)
+        return obj
+    return {key: _from_json(item) for key, item in value.items()}
+
+
+def _structure_class(name: str) -> Optional[type]:
+    """Class named "module:qualname" from the game logic packages, None if it cannot be found"""
+    if name in _STRUCTURES:
+        return _STRUCTURES[name]
+    cls = None
+    module_name, _, qualname = name.partition(":")
+    if module_name.startswith(_STRUCTURE_PACKAGES):
+        try:
+            cls = importlib.import_module(module_name)
+            for part in qualname.split("."):
+                cls = getattr(cls, part)
+        except (ImportError, AttributeError):
+            cls = None
+        if not isinstance(cls, type):
+            cls = None
+    _STRUCTURES[name] = cls
+    return cls
+
+
+class AccountCodec:
+    """Encodes accounts to a compact ByteStream layout and decodes both that layout and legacy JSON"""
+
+    MAGIC: int = 0xAC  # never a valid first byte of a JSON document
+    VERSION: int = 2   # 2: extras block after the avatar and home heroes
+    FLAG_ZLIB: int = 0x01
+
+    # Bodies smaller than this are stored uncompressed, zlib overhead would outweigh the gain
+    COMPRESS_THRESHOLD: int = 512
+
+    @staticmethod
+    def is_binary(data: Union[bytes, bytearray, str, None]) -> bool:
+        """Check if a stored row uses the binary layout"""
+        return isinstance(data, (bytes, bytearray)) and len(data) >= 3 and data[0] == AccountCodec.MAGIC
+
+    @staticmethod
+    def encode(account: Account, compress: bool = True) -> bytes:
+        """Encode account to bytes: magic, version, flags, then the (optionally zlib) body"""
+        stream = ByteStream()
+        stream.write_long(account.account_id)
+        stream.write_string(account.pass_token)
+        AccountCodec._encode_avatar(stream, account.avatar or ClientAvatar())
+        AccountCodec._encode_home(stream, account.home or ClientHome())
+        body = stream.get_bytes()
+
+        flags = 0
+        if compress and len(body) >= AccountCodec.COMPRESS_THRESHOLD:
+            length, compressed = ZLibHelper.compress_in_zlib_format(body)
+            if compressed is not None and length < len(body):
+                body = compressed
+                flags |= AccountCodec.FLAG_ZLIB
+
+        return bytes((AccountCodec.MAGIC, AccountCodec.VERSION, flags)) + body
+
+    @staticmethod
+    def decode(data: Union[bytes, bytearray, str]) -> Account:
+        """Decode a stored row, binary or legacy JSON; raises ValueError on unreadable data"""
+        return AccountCodec.decode_view(data).to_account()
+
+    @staticmethod
+    def decode_view(data: Union[bytes, bytearray, str]) -> 'AccountView':
+        """Decode account and avatar fields now, heroes and home on first access"""
+        if not AccountCodec.is_binary(data):
+            return AccountCodec._decode_json_view(data)
+
+        version, stream = AccountCodec._open(data)
+        account_id = stream.read_long()
+        pass_token = stream.read_string()
+
+        avatar = ClientAvatar()
+        AccountCodec._read_fields(stream, avatar, AVATAR_FIELDS, version)
+
+        # Remember where the heavy sections start and skip over them
+        heroes_offset = stream.offset
+        AccountCodec._skip_heroes(stream, version)
+        AccountCodec._read_extras(stream, avatar, AVATAR_FIELDS, version)
+        avatar.clear_dirty()
+        home_offset = stream.offset
+
+        def load_heroes() -> Dict[int, Hero]:
+            stream.offset = heroes_offset
+            return AccountCodec._read_heroes(stream, version)
+
+        def load_home() -> ClientHome:
+            stream.offset = home_offset
+            return AccountCodec._decode_home(stream, version)
+
+        return AccountView(account_id, pass_token, avatar, load_heroes, load_home)
+
+    @staticmethod
+    def read_summary(data: Union[bytes, bytearray, str]) -> Tuple[str, int, int]:
+        """Read only (name, thumbnail id, trophies) from a stored row"""
+        if not AccountCodec.is_binary(data):
+            avatar = json.loads(data).get("avatar") or {}
+            return avatar.get("name") or "", int(avatar.get("thumbnail_id") or 0), int(avatar.get("trophies") or 0)
+
+        version, stream = AccountCodec._open(data)
+        stream.read_long()
+        stream.read_string()
+        name = stream.read_string()
+        (thumbnail_id, trophies), stream.offset = _unpack_ints(stream.data, stream.offset, 2)
+        return name, thumbnail_id, trophies
+
+    @staticmethod
+    def to_plain_dict(account: Account) -> Dict[str, Any]:
+        """JSON-compatible dict with the same fields as the binary layout, extras inline"""
+        avatar = account.avatar or ClientAvatar()
+        home = account.home or ClientHome()
+
+        avatar_dict = AccountCodec._to_plain(avatar, AVATAR_FIELDS)
+        avatar_dict.update(AccountCodec._extras(avatar, AVATAR_FIELDS))
+        avatar_dict["heroes"] = [AccountCodec._hero_to_plain(hero) for hero in AccountCodec._iter_heroes(avatar)]
+        home_dict = AccountCodec._to_plain(home, HOME_FIELDS)
+        home_dict.update(AccountCodec._extras(home, HOME_FIELDS))
+        home_dict["heroes"] = [AccountCodec._hero_to_plain(hero) for hero in AccountCodec._iter_heroes(home)]
+
+        return {
+            "account_id": account.account_id,
+            "pass_token": account.pass_token,
+            "avatar": avatar_dict,
+            "home": home_dict,
+        }
+
+    @staticmethod
+    def _open(data: Union[bytes, bytearray]) -> Tuple[int, ByteStream]:
+        """Validate the header and return (version, body stream)"""
+        version = data[1]
+        if version > AccountCodec.VERSION:
+            raise ValueError(f"Account format version {version} is newer than supported {AccountCodec.VERSION}")
+
+        body = bytes(data[3:])
+        if data[2] & AccountCodec.FLAG_ZLIB:
+            length, body = ZLibHelper.decompress_in_mysql_format(body)
+            if body is None:
+                raise ValueError("Corrupted compressed account data")
+
+        return version, ByteStream(body)
+
+    @staticmethod
+    def _decode_json_view(data: Union[bytes, bytearray, str]) -> 'AccountView':
+        """Decode a row written as JSON, heroes and home are built on first access"""
+        try:
+            values = json.loads(data)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            raise ValueError(f"Unreadable account data: {e}")
+
+        avatar = ClientAvatar()
+        avatar_values = values.get("avatar") or {}
+        AccountCodec._from_plain(avatar, AVATAR_FIELDS, avatar_values)
+        AccountCodec._apply_extras(avatar, AVATAR_FIELDS, avatar_values)
+        avatar.clear_dirty()
+        home_values = values.get("home") or {}
+
+        def load_home() -> ClientHome:
+            home = ClientHome()
+            AccountCodec._from_plain(home, HOME_FIELDS, home_values)
+            AccountCodec._apply_extras(home, HOME_FIELDS, home_values)
+            home.heroes = AccountCodec._heroes_from_plain(home_values.get("heroes"))
+            home.clear_dirty()
+            return home
+
+        return AccountView(int(values.get("account_id") or 0), values.get("pass_token") or "", avatar,
+                           lambda: AccountCodec._heroes_from_plain(avatar_values.get("heroes")), load_home)
+
+    @staticmethod
+    def _encode_avatar(stream: ByteStream, avatar: ClientAvatar) -> None:
+        """Encode avatar fields, its heroes, then its extras"""
+        AccountCodec._write_fields(stream, avatar, AVATAR_FIELDS)
+        AccountCodec._write_heroes(stream, avatar)
+        AccountCodec._write_extras(stream, avatar, AVATAR_FIELDS)
+
+    @staticmethod
+    def _encode_home(stream: ByteStream, home: ClientHome) -> None:
+        """Encode home fields, its heroes, then its extras"""
+        AccountCodec._write_fields(stream, home, HOME_FIELDS)
+        AccountCodec._write_heroes(stream, home)
+        AccountCodec._write_extras(stream, home, HOME_FIELDS)
+
+    @staticmethod
+    def _decode_home(stream: ByteStream, version: int) -> ClientHome:
+        """Decode home written by _encode_home"""
+        home = ClientHome()
+        AccountCodec._read_fields(stream, home, HOME_FIELDS, version)
+        home.heroes = AccountCodec._read_heroes(stream, version)
+        AccountCodec._read_extras(stream, home, HOME_FIELDS, version)
+        home.clear_dirty()
+        return home
+
+    @staticmethod
+    def _extras(obj: Any, fields) -> Dict[str, Any]:
+        """Attributes of obj outside its field table and heroes (quests, offers, maps, profile,
+        settings, ...) as JSON values"""
+        known = AccountCodec._field_names(fields)
+        return {name: _to_json(value) for name, value in vars(obj).items() if name not in known}
+
+    @staticmethod
+    def _apply_extras(obj: Any, fields, values: Dict[str, Any]) -> None:
+        """Set the extras found in values on obj"""
+        known = AccountCodec._field_names(fields)
+        for name, value in values.items():
+            if name not in known:
+                setattr(obj, name, _from_json(value))
+
+    @staticmethod
+    def _write_extras(stream: ByteStream, obj: Any, fields) -> None:
+        """Write the extras of obj as one JSON string"""
+        stream.write_string(json.dumps(AccountCodec._extras(obj, fields), ensure_ascii=False, separators=(',', ':')))
+
+    @staticmethod
+    def _read_extras(stream: ByteStream, obj: Any, fields, version: int) -> None:
+        """Read extras written by _write_extras, absent before version 2"""
+        if version < 2:
+            return
+        data = stream.read_string()
+        if not data:
+            return
+        try:
+            values = json.loads(data)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Unreadable account extras: {e}")
+        AccountCodec._apply_extras(obj, fields, values)
+
+    @staticmethod
+    def _field_names(fields) -> frozenset:
+        """Attributes stored outside the extras block"""
+        names = _FIELD_NAMES.get(id(fields))
+        if names is None:
+            names = _FIELD_NAMES[id(fields)] = frozenset(name for name, _, _ in fields) | _TRANSIENT | {"heroes"}
+        return names
+
+    @staticmethod
+    def _iter_heroes(owner: Any):
+        """Heroes of an avatar or home, stored as dict or list"""
+        heroes = getattr(owner, 'heroes', None) or {}
+        return heroes.values() if isinstance(heroes, dict) else heroes
+
+    @staticmethod
+    def _write_heroes(stream: ByteStream, owner: Any) -> None:
+        """Write hero count, then character id and fields of every hero as one int block"""
+        heroes = list(AccountCodec._iter_heroes(owner))
+        stream.write_v_int(len(heroes))
+        names = AccountCodec._plan(HERO_FIELDS, AccountCodec.VERSION)[0][1]
+        values = []
+        for hero in heroes:
+            values.append(hero.character_id)
+            values.extend([getattr(hero, name, 0) or 0 for name in names])
+        _pack_ints(stream.data, values)
+
+    @staticmethod
+    def _read_heroes(stream: ByteStream, version: int) -> Dict[int, Hero]:
+        """Read heroes written by _write_heroes, keyed by character id"""
+        names = AccountCodec._plan(HERO_FIELDS, version)[0][1]
+        width = len(names) + 1
+        count = stream.read_v_int()
+        values, stream.offset = _unpack_ints(stream.data, stream.offset, count * width)
+
+        heroes = {}
+        for start in range(0, count * width, width):
+            hero = Hero(values[start])
+            hero.__dict__.update(zip(names, values[start + 1:start + width]))
+            heroes[hero.character_id] = hero
+        return heroes
+
+    @staticmethod
+    def _skip_heroes(stream: ByteStream, version: int) -> None:
+        """Move past a hero block without decoding it"""
+        width = len(AccountCodec._plan(HERO_FIELDS, version)[0][1]) + 1
+        count = stream.read_v_int()
+        stream.offset += count * width * 4
+
+    @staticmethod
+    def _plan(fields, version: int) -> List[Tuple[int, Tuple[str, ...]]]:
+        """Fields present in version as (kind, names); consecutive INT fields form one run"""
+        key = (id(fields), version)
+        plan = _PLANS.get(key)
+        if plan is None:
+            plan = []
+            for name, kind, since in fields:
+                if since > version:
+                    continue
+                if kind == INT and plan and plan[-1][0] == INT:
+                    plan[-1] = (INT, plan[-1][1] + (name,))
+                else:
+                    plan.append((kind, (name,)))
+            _PLANS[key] = plan
+        return plan
+
+    @staticmethod
+    def _write_fields(stream: ByteStream, obj: Any, fields) -> None:
+        """Write every field of obj in table order, missing attributes as defaults"""
+        for kind, names in AccountCodec._plan(fields, AccountCodec.VERSION):
+            if kind == INT:
+                _pack_ints(stream.data, [getattr(obj, name, 0) or 0 for name in names])
+                continue
+
+            value = getattr(obj, names[0], None)
+            if kind == LONG:
+                stream.write_long(value or 0)
+            elif kind == STRING:
+                stream.write_string(value or "")
+            elif kind == BOOL:
+                stream.write_boolean(bool(value))
+            elif kind == INT_LIST:
+                values = list(value or [])
+                stream.write_v_int(len(values))
+                _pack_ints(stream.data, values)
+            elif kind == INT_MAP:
+                values = value or {}
+                stream.write_v_int(len(values))
+                _pack_ints(stream.data, [number for pair in values.items() for number in pair])
+
+    @staticmethod
+    def _read_fields(stream: ByteStream, obj: Any, fields, version: int) -> None:
+        """Read fields present in version into obj"""
+        for kind, names in AccountCodec._plan(fields, version):
+            if kind == INT:
+                values, stream.offset = _unpack_ints(stream.data, stream.offset, len(names))
+                for name, value in zip(names, values):
+                    setattr(obj, name, value)
+                continue
+
+            if kind == LONG:
+                value = stream.read_long()
+            elif kind == STRING:
+                value = stream.read_string()
+            elif kind == BOOL:
+                value = stream.read_boolean()
+            elif kind == INT_LIST:
+                count = stream.read_v_int()
+                values, stream.offset = _unpack_ints(stream.data, stream.offset, count)
+                value = list(values)
+            else:
+                count = stream.read_v_int()
+                items, stream.offset = _unpack_ints(stream.data, stream.offset, count * 2)
+                value = dict(zip(items[::2], items[1::2]))
+            setattr(obj, names[0], value)
+
+    @staticmethod
+    def _to_plain(obj: Any, fields) -> Dict[str, Any]:
+        """Field table values of obj as a dict"""
+        plain = {}
+        for name, kind, _ in fields:
+            value = getattr(obj, name, None)
+            if value is None:
+                value = [] if kind == INT_LIST else {} if kind == INT_MAP else _DEFAULTS[kind]
+            plain[name] = value
+        return plain
+
+    @staticmethod
+    def _from_plain(obj: Any, fields, values: Dict[str, Any]) -> None:
+        """Apply known field values from a JSON dict, unknown keys are ignored"""
+        for name, kind, _ in fields:
+            if name not in values or values[name] is None:
+                continue
+            value = values[name]
+            if kind == INT_MAP:
+                value = {int(key): int(item) for key, item in value.items()}
+            elif kind == INT_LIST:
+                value = [int(item) for item in value]
+            setattr(obj, name, value)
+
+    @staticmethod
+    def _hero_to_plain(hero: Hero) -> Dict[str, Any]:
+        """Hero as a JSON dict"""
+        plain = AccountCodec._to_plain(hero, HERO_FIELDS)
+        plain["character_id"] = hero.character_id
+        return plain
+
+    @staticmethod
+    def _heroes_from_plain(heroes: Any) -> Dict[int, Hero]:
+        """Heroes from JSON, stored either as {id: hero} or as a list of heroes"""
+        if isinstance(heroes, dict):
+            items = [dict(values, character_id=values.get("character_id", key)) for key, values in heroes.items()]
+        else:
+            items = heroes or []
+
+        result = {}
+        for values in items:
+            if not isinstance(values, dict):
+                continue
+            hero = Hero(int(values.get("character_id") or 0))
+            AccountCodec._from_plain(hero, HERO_FIELDS, values)
+            result[hero.character_id] = hero
+        return result
+
+
+class AccountView:
+    """Read-only account for previews; heroes and home are decoded on first access"""
+
+    def __init__(self, account_id: int, pass_token: str, avatar: ClientAvatar,
+                 load_heroes: Callable[[], Dict[int, Hero]], load_home: Callable[[], ClientHome]):
+        """Initialize view from eagerly decoded fields and loaders for the deferred sections"""
+        self.account_id = account_id
+        self.pass_token = pass_token
+        self._avatar = avatar
+        self._home: Optional[ClientHome] = None
+        self._load_heroes: Optional[Callable[[], Dict[int, Hero]]] = load_heroes
+        self._load_home = load_home
+        self._lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        """Avatar name without decoding heroes"""
+        return self._avatar.name
+
+    @property
+    def trophies(self) -> int:
+        """Avatar trophies without decoding heroes"""
+        return self._avatar.trophies
+
+    @property
+    def thumbnail_id(self) -> int:
+        """Avatar thumbnail without decoding heroes"""
+        return self._avatar.thumbnail_id
+
+    @property
+    def avatar(self) -> ClientAvatar:
+        """Avatar with heroes, decoded on first access"""
+        if self._load_heroes is not None:
+            with self._lock:
+                if self._load_heroes is not None:
+                    self._avatar.heroes = self._load_heroes()
+                    self._avatar.clear_dirty()
+                    self._load_heroes = None
+        return self._avatar
+
+    @property
+    def home(self) -> ClientHome:
+        """Home, decoded on first access"""
+        if self._home is None:
+            with self._lock:
+                if self._home is None:
+                    self._home = self._load_home()
+        return self._home
+
+    def is_dirty(self) -> bool:
+        """Views are never saved"""
+        return False
+
+    def to_account(self) -> Account:
+        """Fully decoded, writable account"""
+        account = Account()
+        account.account_id = self.account_id
+        account.pass_token = self.pass_token
+        account.avatar = self.avatar
+        account.home = self.home
+        account.clear_dirty()
+        return account
@@ -16,6 +16,29 @@ class Account:
         self.pass_token: str = ""
         self.home: ClientHome = ClientHome()
         self.avatar: ClientAvatar = ClientAvatar()
+        self.dirty: bool = False
+
+    def mark_dirty(self) -> None:
+        """Flag account for the next cache flush; the change is unknown, so every encoded section is dropped"""
+        self.dirty = True
+        if self.home is not None:
+            self.home.encode_cache.invalidate()
+        if self.avatar is not None:
+            self.avatar.encode_cache.invalidate()
+
+    def is_dirty(self) -> bool:
+        """Check if account or its avatar/home changed since the last save"""
+        return (self.dirty
+                or (self.home is not None and self.home.dirty)
+                or (self.avatar is not None and self.avatar.dirty))
+
+    def clear_dirty(self) -> None:
+        """Clear changed flags on account, avatar and home"""
+        self.dirty = False
+        if self.home:
+            self.home.clear_dirty()
+        if self.avatar:
+            self.avatar.clear_dirty()
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert account to dictionary for JSON serialization"""
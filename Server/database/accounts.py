@@ -4,46 +4,68 @@ Database operations for user accounts
 """
 
 import json
-import mysql.connector
+import threading
 from mysql.connector import Error
-from typing import List, Optional
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
 import random
 import string
 from datetime import datetime
 
 from logic.home.structures import Hero
+from database.account_codec import AccountCodec, AccountView
 from database.cache.account_cache import AccountCache
+from database.batch_writer import BatchWriter
+from database.connection_pool import DatabasePool
 from database.models.account import Account
+from networking.ipc_broker import BrokerClient
 from settings.configuration import Configuration
 from utils.helpers import Helpers
 
+class AccountSnapshot(NamedTuple):
+    """Row values of an account, taken when it was queued for writing"""
+    account: Account
+    trophies: int
+    data: Union[bytes, str]
+    hero_rows: List[Tuple[int, int, int]]
+
+
 class Accounts:
     """Static class for account database operations"""
 
     _avatar_id_counter: int = 0
-    _connection_string: str = ""
+    _id_lock = threading.Lock()  # registrations arrive on every receive shard
+    _binary_format: bool = False
+
+    HERO_UPSERT_QUERY: str = (
+        "INSERT INTO account_heroes (`AccountId`, `HeroDataId`, `Trophies`) VALUES (%s, %s, %s) "
+        "ON DUPLICATE KEY UPDATE `Trophies`=VALUES(`Trophies`)"
+    )
+
+    # Drops the side-table rows of heroes an account no longer has; the second parameter is the
+    # comma-separated list of the heroes it keeps, so every row has the same shape for executemany
+    HERO_PRUNE_QUERY: str = (
+        "DELETE FROM account_heroes WHERE `AccountId` = %s AND NOT FIND_IN_SET(`HeroDataId`, %s)"
+    )
 
     @staticmethod
     def init(user: str, password: str) -> None:
         """Initialize database connection and settings"""
-        config = Configuration.instance
-
-        # Build connection configuration
-        connection_config = {
-            'host': '127.0.0.1',
-            'user': user,
-            'password': password,
-            'database': config.database_name,
-            'charset': 'utf8mb4',
-            'autocommit': True,
-            'ssl_disabled': True
-        }
+        # Share one bounded connection pool between all DAOs
+        DatabasePool.init(user, password)
 
-        # Store connection string for later use
-        Accounts._connection_string = json.dumps(connection_config)
-
-        # Initialize JSON serialization settings
-        # Python's json module handles null/None values differently than C#
+        # Binary rows need a BLOB Data column, otherwise keep writing JSON
+        config = Configuration.instance
+        Accounts._binary_format = False
+        if config.database_account_format == "binary":
+            if Accounts._data_column_is_binary():
+                Accounts._binary_format = True
+            else:
+                print("Accounts: Data column is not a BLOB, writing JSON rows "
+                      "(ALTER TABLE accounts MODIFY `Data` LONGBLOB to enable binary rows)")
+
+        # Denormalized per-brawler trophies for ranking queries
+        Accounts.ensure_hero_table()
+        Accounts.ensure_trophy_index()
 
         # Initialize account cache
         AccountCache.init()
@@ -55,27 +77,141 @@ class Accounts:
     def get_max_avatar_id() -> int:
         """Get the maximum avatar ID from database"""
         try:
-            config = json.loads(Accounts._connection_string)
-            connection = mysql.connector.connect(**config)
-            cursor = connection.cursor()
+            with DatabasePool.connection() as connection:
+                cursor = connection.cursor()
 
-            cursor.execute("SELECT COALESCE(MAX(Id), 0) FROM accounts")
-            result = cursor.fetchone()
+                cursor.execute("SELECT COALESCE(MAX(Id), 0) FROM accounts")
+                result = cursor.fetchone()
 
-            cursor.close()
-            connection.close()
+                cursor.close()
 
             return int(result[0]) if result else 0
         except Error as e:
             print(f"Database error in get_max_avatar_id: {e}")
             return 0
 
+    @staticmethod
+    def _data_column_is_binary() -> bool:
+        """Check if accounts.Data can hold binary rows"""
+        try:
+            with DatabasePool.connection() as connection:
+                cursor = connection.cursor()
+
+                cursor.execute(
+                    "SELECT DATA_TYPE FROM information_schema.COLUMNS "
+                    "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'accounts' AND COLUMN_NAME = 'Data'"
+                )
+                result = cursor.fetchone()
+
+                cursor.close()
+
+            return bool(result) and str(result[0]).lower().endswith("blob")
+        except Error as e:
+            print(f"Database error in _data_column_is_binary: {e}")
+            return False
+
+    @staticmethod
+    def _serialize(account: Account) -> Union[bytes, str]:
+        """Serialize account in the configured row format"""
+        if Accounts._binary_format:
+            return AccountCodec.encode(account, Configuration.instance.database_account_compression)
+        return json.dumps(AccountCodec.to_plain_dict(account), ensure_ascii=False, separators=(',', ':'))
+
+    @staticmethod
+    def _deserialize(data: Union[bytes, bytearray, str]) -> Optional[Account]:
+        """Deserialize a stored row, binary or JSON; None if it cannot be read"""
+        try:
+            return AccountCodec.decode(data)
+        except ValueError as e:
+            print(f"Unreadable account row: {e}")
+            return None
+
+    @staticmethod
+    def _deserialize_view(data: Union[bytes, bytearray, str]) -> Optional[AccountView]:
+        """Lazily deserialize a stored row for read-only use; None if it cannot be read"""
+        try:
+            return AccountCodec.decode_view(data)
+        except ValueError as e:
+            print(f"Unreadable account row: {e}")
+            return None
+
+    @staticmethod
+    def ensure_hero_table() -> None:
+        """Create the per-brawler trophy side table if it does not exist yet"""
+        try:
+            with DatabasePool.connection() as connection:
+                cursor = connection.cursor()
+
+                cursor.execute(
+                    "CREATE TABLE IF NOT EXISTS account_heroes ("
+                    "`AccountId` BIGINT NOT NULL, "
+                    "`HeroDataId` INT NOT NULL, "
+                    "`Trophies` INT NOT NULL DEFAULT 0, "
+                    "PRIMARY KEY (`AccountId`, `HeroDataId`), "
+                    "KEY `HeroTrophies` (`HeroDataId`, `Trophies`)"
+                    ")"
+                )
+
+                cursor.close()
+
+        except Error as e:
+            print(f"Database error in ensure_hero_table: {e}")
+
+    @staticmethod
+    def ensure_trophy_index() -> None:
+        """Index accounts.Trophies so leaderboards are seeded from the top rows only"""
+        try:
+            with DatabasePool.connection() as connection:
+                cursor = connection.cursor()
+
+                cursor.execute(
+                    "SELECT 1 FROM information_schema.STATISTICS "
+                    "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'accounts' "
+                    "AND COLUMN_NAME = 'Trophies' AND SEQ_IN_INDEX = 1"
+                )
+                if not cursor.fetchall():
+                    cursor.execute("ALTER TABLE accounts ADD INDEX `Trophies` (`Trophies`)")
+
+                cursor.close()
+
+        except Error as e:
+            print(f"Database error in ensure_trophy_index: {e}")
+
+    @staticmethod
+    def _get_hero_rows(account: Account) -> List[Tuple[int, int, int]]:
+        """(account id, hero data id, trophies) rows for the side table"""
+        heroes = account.avatar.heroes
+        heroes = heroes.values() if isinstance(heroes, dict) else heroes
+        return [(account.account_id, hero.character_id, hero.trophies) for hero in heroes]
+
+    @staticmethod
+    def _get_hero_prune_row(account_id: int, hero_rows: List[Tuple[int, int, int]]) -> Tuple[int, str]:
+        """HERO_PRUNE_QUERY parameters keeping exactly the heroes in hero_rows"""
+        return account_id, ",".join(str(row[1]) for row in hero_rows)
+
+    @staticmethod
+    def _next_avatar_id() -> Optional[int]:
+        """Next free account id; TCP workers share the table, so the broker hands them out"""
+        if BrokerClient.is_connected():
+            avatar_id = BrokerClient.call("next_row_id", "account", Accounts._avatar_id_counter)
+            if avatar_id is not None:
+                with Accounts._id_lock:
+                    Accounts._avatar_id_counter = max(Accounts._avatar_id_counter, avatar_id)
+            return avatar_id
+        with Accounts._id_lock:
+            Accounts._avatar_id_counter += 1
+            return Accounts._avatar_id_counter
+
     @staticmethod
     def create() -> Account:
         """Create a new account"""
+        avatar_id = Accounts._next_avatar_id()
+        if avatar_id is None:
+            print("Could not allocate an account id")
+            return None
+
         account = Account()
-        Accounts._avatar_id_counter += 1
-        account.account_id = Accounts._avatar_id_counter
+        account.account_id = avatar_id
         account.pass_token = Helpers.random_string(40)
 
         # Set up avatar
@@ -89,20 +225,19 @@ class Accounts:
         hero = Hero(16000000)
         account.avatar.heroes.append(hero)
 
-        # Serialize account to JSON
-        json_data = json.dumps(account.to_dict(), ensure_ascii=False, separators=(',', ':'))
+        # Serialize account in the configured row format
+        data = Accounts._serialize(account)
 
         try:
             # Save to database
-            config = json.loads(Accounts._connection_string)
-            connection = mysql.connector.connect(**config)
-            cursor = connection.cursor()
+            with DatabasePool.connection() as connection:
+                cursor = connection.cursor()
 
-            query = "INSERT INTO accounts (`Id`, `Trophies`, `Data`) VALUES (%s, %s, %s)"
-            cursor.execute(query, (account.account_id, account.avatar.trophies, json_data))
+                query = "INSERT INTO accounts (`Id`, `Trophies`, `Data`) VALUES (%s, %s, %s)"
+                cursor.execute(query, (account.account_id, account.avatar.trophies, data))
+                cursor.executemany(Accounts.HERO_UPSERT_QUERY, Accounts._get_hero_rows(account))
 
-            cursor.close()
-            connection.close()
+                cursor.close()
 
             # Cache the account
             AccountCache.cache(account)
@@ -114,56 +249,94 @@ class Accounts:
             return None
 
     @staticmethod
-    def save(account: Account) -> None:
-        """Save account to database"""
+    def save(account: Account) -> int:
+        """Save account to database, returns bytes written (0 on failure)"""
         if not account:
-            return
+            return 0
 
-        json_data = json.dumps(account.to_dict(), ensure_ascii=False, separators=(',', ':'))
+        data = Accounts._serialize(account)
 
         try:
-            config = json.loads(Accounts._connection_string)
-            connection = mysql.connector.connect(**config)
-            cursor = connection.cursor()
+            with DatabasePool.connection() as connection:
+                cursor = connection.cursor()
 
-            query = "UPDATE accounts SET `Trophies`=%s, `Data`=%s WHERE Id = %s"
-            cursor.execute(query, (account.avatar.trophies, json_data, account.account_id))
+                query = "UPDATE accounts SET `Trophies`=%s, `Data`=%s WHERE Id = %s"
+                cursor.execute(query, (account.avatar.trophies, data, account.account_id))
+                hero_rows = Accounts._get_hero_rows(account)
+                cursor.executemany(Accounts.HERO_UPSERT_QUERY, hero_rows)
+                cursor.execute(Accounts.HERO_PRUNE_QUERY, Accounts._get_hero_prune_row(account.account_id, hero_rows))
 
-            cursor.close()
-            connection.close()
+                cursor.close()
+
+            return len(data)
 
         except Error as e:
             print(f"Database error in save: {e}")
+            return 0
+
+    @staticmethod
+    def snapshot(account: Account, attempts: int = 3) -> Optional[AccountSnapshot]:
+        """Serialize an account for a later write; None if request threads kept changing it mid-encode"""
+        for _ in range(attempts):
+            try:
+                return AccountSnapshot(account, account.avatar.trophies, Accounts._serialize(account),
+                                       Accounts._get_hero_rows(account))
+            except RuntimeError:
+                # A dict or list grew while it was being iterated, encode again
+                continue
+        return None
+
+    @staticmethod
+    def save_batch(snapshots: List[AccountSnapshot]) -> Tuple[List[AccountSnapshot], int]:
+        """Save many account snapshots in multi-row batches, returns (failed snapshots, bytes written)"""
+        rows = [(snapshot.account.account_id, snapshot.trophies, snapshot.data) for snapshot in snapshots]
+
+        # Upsert form lets mysql.connector rewrite executemany into one multi-row INSERT per batch
+        query = ("INSERT INTO accounts (`Id`, `Trophies`, `Data`) VALUES (%s, %s, %s) "
+                 "ON DUPLICATE KEY UPDATE `Trophies`=VALUES(`Trophies`), `Data`=VALUES(`Data`)")
+
+        config = Configuration.instance
+        failed = set(BatchWriter.execute(query, rows, config.database_batch_size, config.database_batch_retries))
+
+        # Side table follows the saved rows; a failed hero batch is corrected by the account's next save
+        hero_rows = []
+        prune_rows = []
+        for index, snapshot in enumerate(snapshots):
+            if index not in failed:
+                hero_rows.extend(snapshot.hero_rows)
+                prune_rows.append(Accounts._get_hero_prune_row(snapshot.account.account_id, snapshot.hero_rows))
+        BatchWriter.execute(Accounts.HERO_UPSERT_QUERY, hero_rows, config.database_batch_size, config.database_batch_retries)
+        BatchWriter.execute(Accounts.HERO_PRUNE_QUERY, prune_rows, config.database_batch_size, config.database_batch_retries)
+
+        written = sum(len(row[2]) for index, row in enumerate(rows) if index not in failed)
+        return [snapshots[index] for index in sorted(failed)], written
 
     @staticmethod
     def load(account_id: int) -> Optional[Account]:
         """Load account from database"""
         # Check cache first
-        if AccountCache.is_account_cached(account_id):
-            return AccountCache.get_account(account_id)
+        account = AccountCache.get_account(account_id)
+        if account:
+            return account
 
         try:
-            config = json.loads(Accounts._connection_string)
-            connection = mysql.connector.connect(**config)
-            cursor = connection.cursor()
+            with DatabasePool.connection() as connection:
+                cursor = connection.cursor()
 
-            cursor.execute("SELECT * FROM accounts WHERE Id = %s", (account_id,))
-            result = cursor.fetchone()
+                cursor.execute("SELECT * FROM accounts WHERE Id = %s", (account_id,))
+                result = cursor.fetchone()
+
+                cursor.close()
 
             if result:
                 # Assuming the Data column is at index 2 (Id, Trophies, Data)
-                account_data = json.loads(result[2])
-                account = Account.from_dict(account_data)
+                account = Accounts._deserialize(result[2])
 
                 # Cache the account
-                AccountCache.cache(account)
-
-                cursor.close()
-                connection.close()
+                if account:
+                    AccountCache.cache(account)
                 return account
 
-            cursor.close()
-            connection.close()
             return None
 
         except Error as e:
@@ -171,29 +344,47 @@ class Accounts:
             return None
 
     @staticmethod
-    def get_ranking_list() -> List[Account]:
+    def load_view(account_id: int) -> Optional[Union[Account, AccountView]]:
+        """Load account for read-only use; uncached rows decode heroes and home only when accessed"""
+        account = AccountCache.get_account(account_id)
+        if account:
+            return account
+
+        try:
+            with DatabasePool.connection() as connection:
+                cursor = connection.cursor()
+
+                cursor.execute("SELECT `Data` FROM accounts WHERE Id = %s", (account_id,))
+                result = cursor.fetchone()
+
+                cursor.close()
+
+            # Views are not cached, the cache only holds writable accounts
+            return Accounts._deserialize_view(result[0]) if result else None
+
+        except Error as e:
+            print(f"Database error in load_view: {e}")
+            return None
+
+    @staticmethod
+    def get_ranking_list() -> List[AccountView]:
         """Get global ranking list"""
         account_list = []
 
         try:
-            config = json.loads(Accounts._connection_string)
-            connection = mysql.connector.connect(**config)
-            cursor = connection.cursor()
+            with DatabasePool.connection() as connection:
+                cursor = connection.cursor()
 
-            # Original C# had ORDER BY Trophies DESC commented out
-            cursor.execute("SELECT * FROM accounts LIMIT 200")
-            results = cursor.fetchall()
+                # Original C# had ORDER BY Trophies DESC commented out
+                cursor.execute("SELECT * FROM accounts LIMIT 200")
+                results = cursor.fetchall()
+
+                cursor.close()
 
             for result in results:
-                try:
-                    account_data = json.loads(result[2])  # Data column
-                    account = Account.from_dict(account_data)
+                account = Accounts._deserialize_view(result[2])  # Data column
+                if account:
                     account_list.append(account)
-                except json.JSONDecodeError:
-                    continue
-
-            cursor.close()
-            connection.close()
 
         except Error as e:
             print(f"Database error in get_ranking_list: {e}")
@@ -201,40 +392,133 @@ class Accounts:
         return account_list
 
     @staticmethod
-    def get_brawler_ranking_list(hero_data_id: int) -> List[Account]:
+    def get_brawler_ranking_list(hero_data_id: int, limit: int = 200) -> List[AccountView]:
         """Get brawler-specific ranking list"""
         account_list = []
 
         try:
-            config = json.loads(Accounts._connection_string)
-            connection = mysql.connector.connect(**config)
-            cursor = connection.cursor()
+            with DatabasePool.connection() as connection:
+                cursor = connection.cursor()
+
+                # Served by the (HeroDataId, Trophies) index, only the top rows are decoded
+                cursor.execute(
+                    "SELECT a.`Data` FROM account_heroes h "
+                    "JOIN accounts a ON a.`Id` = h.`AccountId` "
+                    "WHERE h.`HeroDataId` = %s ORDER BY h.`Trophies` DESC LIMIT %s",
+                    (hero_data_id, limit)
+                )
+                results = cursor.fetchall()
 
-            cursor.execute("SELECT * FROM accounts WHERE Trophies >= 1000")
-            results = cursor.fetchall()
+                cursor.close()
 
             for result in results:
-                try:
-                    account_data = json.loads(result[2])  # Data column
-                    account = Account.from_dict(account_data)
+                account = Accounts._deserialize_view(result[0])
+                if account:
+                    account_list.append(account)
 
-                    # Check if account has the specified hero
-                    if account.avatar.has_hero(hero_data_id):
-                        account_list.append(account)
+        except Error as e:
+            print(f"Database error in get_brawler_ranking_list: {e}")
 
-                except json.JSONDecodeError:
-                    continue
+        return account_list
 
-            cursor.close()
-            connection.close()
+    @staticmethod
+    def backfill_hero_trophies(chunk_size: int = 1000) -> int:
+        """Fill account_heroes from existing Data blobs, returns number of rows written"""
+        config = Configuration.instance
+        last_id = 0
+        written = 0
+
+        while True:
+            try:
+                with DatabasePool.connection() as connection:
+                    cursor = connection.cursor()
+
+                    cursor.execute(
+                        "SELECT `Id`, `Data` FROM accounts WHERE `Id` > %s ORDER BY `Id` LIMIT %s",
+                        (last_id, chunk_size)
+                    )
+                    results = cursor.fetchall()
+
+                    cursor.close()
+
+            except Error as e:
+                print(f"Database error in backfill_hero_trophies: {e}")
+                break
+
+            if not results:
+                break
+
+            hero_rows = []
+            for account_id, data in results:
+                account = Accounts._deserialize(data)
+                if account:
+                    account.account_id = int(account_id)
+                    hero_rows.extend(Accounts._get_hero_rows(account))
+
+            failed = BatchWriter.execute(Accounts.HERO_UPSERT_QUERY, hero_rows,
+                                         config.database_batch_size, config.database_batch_retries)
+            written += len(hero_rows) - len(failed)
+            last_id = int(results[-1][0])
+
+        return written
+
+    @staticmethod
+    def get_leaderboard_seed(limit: int) -> Tuple[List[Tuple[int, int]], Dict[int, List[Tuple[int, int]]]]:
+        """Best scores for seeding leaderboards from columns only: ([(id, trophies)], {hero id: [(id, trophies)]}),
+        at most limit rows per board, each read through its Trophies index; names and thumbnails are read
+        later, for ranked entries only, by get_summaries"""
+        accounts: List[Tuple[int, int]] = []
+        heroes: Dict[int, List[Tuple[int, int]]] = {}
+
+        try:
+            with DatabasePool.connection() as connection:
+                cursor = connection.cursor()
+
+                cursor.execute("SELECT `Id`, `Trophies` FROM accounts ORDER BY `Trophies` DESC LIMIT %s", (limit,))
+                accounts = [(int(account_id), int(trophies or 0)) for account_id, trophies in cursor.fetchall()]
 
-            # Sort by brawler trophies (descending)
-            account_list.sort(
-                key=lambda a: a.avatar.get_hero(hero_data_id).trophies if a.avatar.get_hero(hero_data_id) else 0,
-                reverse=True
-            )
+                # Brawler trophies come from the side table, one (HeroDataId, Trophies) range per brawler
+                cursor.execute("SELECT DISTINCT `HeroDataId` FROM account_heroes")
+                hero_data_ids = [int(row[0]) for row in cursor.fetchall()]
+
+                for hero_data_id in hero_data_ids:
+                    cursor.execute(
+                        "SELECT `AccountId`, `Trophies` FROM account_heroes "
+                        "WHERE `HeroDataId` = %s ORDER BY `Trophies` DESC LIMIT %s",
+                        (hero_data_id, limit)
+                    )
+                    heroes[hero_data_id] = [(int(account_id), int(trophies)) for account_id, trophies in cursor.fetchall()]
+
+                cursor.close()
 
         except Error as e:
-            print(f"Database error in get_brawler_ranking_list: {e}")
+            print(f"Database error in get_leaderboard_seed: {e}")
 
-        return account_list
+        return accounts, heroes
+
+    @staticmethod
+    def get_summaries(account_ids: List[int], chunk_size: int = 500) -> Dict[int, Tuple[str, int]]:
+        """(name, thumbnail id) of the given accounts, read from their rows in chunks"""
+        summaries = {}
+
+        try:
+            with DatabasePool.connection() as connection:
+                cursor = connection.cursor()
+
+                for start in range(0, len(account_ids), chunk_size):
+                    chunk = account_ids[start:start + chunk_size]
+                    placeholders = ", ".join(["%s"] * len(chunk))
+                    cursor.execute(f"SELECT `Id`, `Data` FROM accounts WHERE `Id` IN ({placeholders})", tuple(chunk))
+                    for account_id, data in cursor.fetchall():
+                        try:
+                            name, thumbnail_id, _ = AccountCodec.read_summary(data)
+                        except ValueError:
+                            continue
+                        summaries[int(account_id)] = (name or "", int(thumbnail_id or 0))
+
+                cursor.close()
+
+        except Error as e:
+            print(f"Database error in get_summaries: {e}")
+
+        return summaries
@@ -5,16 +5,27 @@ Caching system for user accounts with periodic saving
 
 import threading
 import time
-from typing import Dict, Optional
+from typing import Callable, Dict, List, Optional
 from database.models.account import Account
-from database.accounts import Accounts
+from database.accounts import Accounts, AccountSnapshot
+from database.bounded_cache import BoundedCache
+from database.write_behind_queue import WriteBehindQueue
+from settings.configuration import Configuration
 
 class AccountCache:
     """Static class for caching user accounts"""
 
-    _cached_accounts: Dict[int, Account] = {}
+    _cached_accounts: BoundedCache = BoundedCache()
     _thread: Optional[threading.Thread] = None
     _started: bool = True
+    _write_queue: Optional[WriteBehindQueue] = None
+    _save_listeners: List[Callable[[Account], None]] = []
+
+    # Flush statistics
+    last_flush_count: int = 0
+    last_flush_bytes: int = 0
+    total_flush_count: int = 0
+    total_flush_bytes: int = 0
 
     @classmethod
     @property
@@ -25,7 +36,23 @@ class AccountCache:
     @classmethod
     def init(cls) -> None:
         """Initialize account cache and start save thread"""
-        cls._cached_accounts = {}
+        config = Configuration.instance
+        cls._cached_accounts = BoundedCache(
+            max_size=config.account_cache_size,
+            idle_ttl=config.account_cache_idle_ttl,
+            is_pinned=cls._is_pinned,
+            on_evict=cls._on_evict
+        )
+
+        cls._write_queue = WriteBehindQueue(
+            cls._write_batch,
+            max_size=config.database_write_queue_size,
+            batch_size=config.database_batch_size,
+            put_timeout=config.database_write_queue_timeout,
+            name="AccountWriter"
+        )
+        cls._write_queue.start()
+
         cls._thread = threading.Thread(target=cls._update, daemon=True)
         cls._thread.start()
 
@@ -35,6 +62,7 @@ class AccountCache:
         while cls._started:
             try:
                 cls.save_all()
+                cls._cached_accounts.evict_expired()
                 time.sleep(30)  # Sleep for 30 seconds
             except Exception as e:
                 print(f"Error in AccountCache update thread: {e}")
@@ -42,16 +70,89 @@ class AccountCache:
 
     @classmethod
     def save_all(cls) -> None:
-        """Save all cached accounts to database"""
+        """Queue cached accounts that changed since the last flush for writing"""
         try:
-            for account in cls._cached_accounts.values():
-                try:
-                    Accounts.save(account)
-                except Exception as ex:
-                    print(f"Unhandled exception while saving account: {ex}")
+            for account in list(cls._cached_accounts.values()):
+                if account.is_dirty():
+                    cls.save(account)
         except Exception:
             pass  # Ignore exceptions in save_all
 
+    @classmethod
+    def save(cls, account: Account) -> bool:
+        """Queue one account for the write-behind worker, never waits on the database"""
+        if not account or not cls._write_queue:
+            return False
+
+        # Clear before encoding so mutations made after the snapshot re-flag the account
+        account.clear_dirty()
+        snapshot = Accounts.snapshot(account)
+        if snapshot is not None and cls._write_queue.put(account.account_id, snapshot):
+            return True
+
+        # Queue full or stopped, keep the account dirty for the next cycle
+        account.mark_dirty()
+        return False
+
+    @classmethod
+    def flush(cls, timeout: Optional[float] = None) -> bool:
+        """Queue dirty accounts and wait until the worker has written them"""
+        cls.save_all()
+        return cls._write_queue.drain(timeout) if cls._write_queue else True
+
+    @classmethod
+    def _write_batch(cls, snapshots: List[AccountSnapshot]) -> None:
+        """Write-behind worker callback persisting one batch of snapshots"""
+        try:
+            failed, written = Accounts.save_batch(snapshots)
+        except Exception as ex:
+            failed, written = snapshots, 0
+            print(f"Unhandled exception while saving accounts: {ex}")
+
+        for snapshot in failed:
+            snapshot.account.mark_dirty()
+        flushed = len(snapshots) - len(failed)
+
+        failed_ids = {snapshot.account.account_id for snapshot in failed}
+        cls._notify_listeners([snapshot.account for snapshot in snapshots
+                               if snapshot.account.account_id not in failed_ids])
+
+        cls.last_flush_count = flushed
+        cls.last_flush_bytes = written
+        cls.total_flush_count += flushed
+        cls.total_flush_bytes += written
+
+        if flushed:
+            print(f"AccountCache: flushed {flushed} accounts ({written} bytes)")
+
+    @classmethod
+    def get_write_queue_metrics(cls) -> Dict[str, int]:
+        """Metrics of the write-behind queue"""
+        return cls._write_queue.get_metrics() if cls._write_queue else {}
+
+    @classmethod
+    def mark_dirty(cls, account_id: int) -> None:
+        """Flag a cached account for the next flush"""
+        account = cls._cached_accounts.get(account_id)
+        if account:
+            account.mark_dirty()
+
+    @classmethod
+    def get_dirty_count(cls) -> int:
+        """Get count of cached accounts waiting for a flush"""
+        return sum(1 for account in list(cls._cached_accounts.values()) if account.is_dirty())
+
+    @classmethod
+    def _is_pinned(cls, account_id: int) -> bool:
+        """Accounts of online players are never evicted"""
+        from networking.session.sessions import Sessions
+        return Sessions.is_session_active(account_id)
+
+    @classmethod
+    def _on_evict(cls, account: Account) -> bool:
+        """Queue dirty accounts before eviction, keep them if the queue refuses"""
+        return not account.is_dirty() or cls.save(account)
+
     @classmethod
     def is_account_cached(cls, account_id: int) -> bool:
         """Check if account is in cache"""
@@ -60,22 +161,72 @@ class AccountCache:
     @classmethod
     def get_account(cls, account_id: int) -> Optional[Account]:
         """Get account from cache"""
-        return cls._cached_accounts.get(account_id)
+        account = cls._cached_accounts.get(account_id)
+        if account is None and cls._write_queue:
+            # Evicted but not written yet, the queued account is newer than the database row
+            snapshot = cls._write_queue.peek(account_id)
+            if snapshot is not None:
+                account = snapshot.account
+                cls._cached_accounts.put(account_id, account)
+        return account
 
     @classmethod
     def cache(cls, account: Account) -> None:
         """Cache an account"""
         if account and hasattr(account, 'account_id'):
             try:
-                cls._cached_accounts[account.account_id] = account
+                cls._cached_accounts.put(account.account_id, account)
             except Exception:
                 pass  # Ignore exceptions when caching
+            cls._notify_listeners([account])
+
+    @classmethod
+    def add_save_listener(cls, listener: Callable[[Account], None]) -> None:
+        """Register a callback run for every account that is cached or persisted"""
+        cls._save_listeners.append(listener)
+
+    @classmethod
+    def _notify_listeners(cls, accounts: List[Account]) -> None:
+        """Run save listeners, a failing listener never breaks persistence"""
+        for listener in cls._save_listeners:
+            for account in accounts:
+                try:
+                    listener(account)
+                except Exception as e:
+                    print(f"Error in AccountCache save listener: {e}")
 
     @classmethod
     def remove(cls, account_id: int) -> None:
-        """Remove account from cache"""
-        if account_id in cls._cached_accounts:
-            del cls._cached_accounts[account_id]
+        """Remove account from cache, queueing it first if it has unsaved changes"""
+        account = cls._cached_accounts.remove(account_id)
+        if account and account.is_dirty():
+            cls.save(account)
+
+    @classmethod
+    def release(cls, account_id: int, timeout: float = 8.0) -> bool:
+        """Remove account from cache and wait until its changes are in the database, so another
+        worker process can load it; on failure it stays cached and dirty for the next flush"""
+        account = cls._cached_accounts.remove(account_id)
+        if account is None and cls._write_queue:
+            snapshot = cls._write_queue.peek(account_id)
+            account = snapshot.account if snapshot is not None else None
+        if account is None:
+            return True
+
+        # An older snapshot may still be queued or being written even when the account is clean
+        queued = not account.is_dirty() or cls.save(account)
+        if queued and (cls._write_queue is None or cls._write_queue.wait_for(account_id, timeout)):
+            # A failed write marks the account dirty again
+            if not account.is_dirty():
+                return True
+
+        cls._cached_accounts.put(account_id, account)
+        return False
+
+    @classmethod
+    def get_cache_metrics(cls) -> Dict[str, int]:
+        """Hit, miss and eviction counters of the account cache"""
+        return cls._cached_accounts.get_metrics()
 
     @classmethod
     def shutdown(cls) -> None:
@@ -83,4 +234,8 @@ class AccountCache:
         cls._started = False
         if cls._thread and cls._thread.is_alive():
             cls._thread.join(timeout=5)
-        cls.save_all()  # Final save before shutdown
+
+        # Final save before shutdown, then let the worker write everything left
+        cls.save_all()
+        if cls._write_queue:
+            cls._write_queue.stop(timeout=30)
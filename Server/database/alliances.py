@@ -4,90 +4,122 @@ Database operations for alliances/clubs
 """
 
 import json
-import mysql.connector
+import threading
 from mysql.connector import Error
-from typing import List, Optional
+from typing import List, NamedTuple, Optional, Tuple
 import random
 
 from logic.club.alliance import Alliance
 from database.cache.alliance_cache import AllianceCache
+from database.batch_writer import BatchWriter
+from database.connection_pool import DatabasePool
+from networking.ipc_broker import BrokerClient
 from settings.configuration import Configuration
 
+class AllianceSnapshot(NamedTuple):
+    """Row values of an alliance, taken when it was queued for writing"""
+    alliance: Alliance
+    row: Tuple[int, str, int, str]
+
+
 class Alliances:
     """Static class for alliance database operations"""
 
     _alliance_id_counter: int = 0
-    _connection_string: str = ""
+    _id_lock = threading.Lock()  # alliances are created from every receive shard
 
     @staticmethod
     def init(user: str, password: str) -> None:
         """Initialize database connection and settings"""
-        config = Configuration.instance
-
-        # Build connection configuration
-        connection_config = {
-            'host': '127.0.0.1',
-            'user': user,
-            'password': password,
-            'database': config.database_name,
-            'charset': 'utf8mb4',
-            'autocommit': True,
-            'ssl_disabled': True
-        }
-
-        # Store connection string for later use
-        Alliances._connection_string = json.dumps(connection_config)
+        # Share one bounded connection pool between all DAOs
+        DatabasePool.init(user, password)
 
         # Initialize JSON serialization settings
         # Python's json module handles null/None values differently than C#
 
+        # Club leaderboard is seeded from the top rows only
+        Alliances.ensure_trophy_index()
+
         # Initialize alliance cache
         AllianceCache.init()
 
         # Get the maximum alliance ID from database
         Alliances._alliance_id_counter = Alliances.get_max_alliance_id()
 
+    @staticmethod
+    def ensure_trophy_index() -> None:
+        """Index alliances.Trophies for the ranking and leaderboard queries"""
+        try:
+            with DatabasePool.connection() as connection:
+                cursor = connection.cursor()
+
+                cursor.execute(
+                    "SELECT 1 FROM information_schema.STATISTICS "
+                    "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'alliances' "
+                    "AND COLUMN_NAME = 'Trophies' AND SEQ_IN_INDEX = 1"
+                )
+                if not cursor.fetchall():
+                    cursor.execute("ALTER TABLE alliances ADD INDEX `Trophies` (`Trophies`)")
+
+                cursor.close()
+
+        except Error as e:
+            print(f"Database error in ensure_trophy_index: {e}")
+
     @staticmethod
     def get_max_alliance_id() -> int:
         """Get the maximum alliance ID from database"""
         try:
-            config = json.loads(Alliances._connection_string)
-            connection = mysql.connector.connect(**config)
-            cursor = connection.cursor()
+            with DatabasePool.connection() as connection:
+                cursor = connection.cursor()
 
-            cursor.execute("SELECT COALESCE(MAX(Id), 0) FROM alliances")
-            result = cursor.fetchone()
+                cursor.execute("SELECT COALESCE(MAX(Id), 0) FROM alliances")
+                result = cursor.fetchone()
 
-            cursor.close()
-            connection.close()
+                cursor.close()
 
             return int(result[0]) if result else 0
         except Error as e:
             print(f"Database error in get_max_alliance_id: {e}")
             return 0
 
+    @staticmethod
+    def _next_alliance_id() -> Optional[int]:
+        """Next free alliance id; TCP workers share the table, so the broker hands them out"""
+        if BrokerClient.is_connected():
+            alliance_id = BrokerClient.call("next_row_id", "alliance", Alliances._alliance_id_counter)
+            if alliance_id is not None:
+                with Alliances._id_lock:
+                    Alliances._alliance_id_counter = max(Alliances._alliance_id_counter, alliance_id)
+            return alliance_id
+        with Alliances._id_lock:
+            Alliances._alliance_id_counter += 1
+            return Alliances._alliance_id_counter
+
     @staticmethod
     def create(alliance: Alliance) -> None:
         """Create a new alliance"""
         if not alliance:
             return
 
-        Alliances._alliance_id_counter += 1
-        alliance.id = Alliances._alliance_id_counter
+        alliance_id = Alliances._next_alliance_id()
+        if alliance_id is None:
+            print("Could not allocate an alliance id")
+            return
+        alliance.id = alliance_id
+        AllianceCache.claim(alliance_id)
 
         # Serialize alliance to JSON
         json_data = json.dumps(alliance.to_dict(), ensure_ascii=False, separators=(',', ':'))
 
         try:
-            config = json.loads(Alliances._connection_string)
-            connection = mysql.connector.connect(**config)
-            cursor = connection.cursor()
+            with DatabasePool.connection() as connection:
+                cursor = connection.cursor()
 
-            query = "INSERT INTO alliances (`Id`, `Name`, `Trophies`, `Data`) VALUES (%s, %s, %s, %s)"
-            cursor.execute(query, (alliance.id, alliance.name, alliance.trophies, json_data))
+                query = "INSERT INTO alliances (`Id`, `Name`, `Trophies`, `Data`) VALUES (%s, %s, %s, %s)"
+                cursor.execute(query, (alliance.id, alliance.name, alliance.trophies, json_data))
 
-            cursor.close()
-            connection.close()
+                cursor.close()
 
             # Cache the alliance
             AllianceCache.cache(alliance)
@@ -104,33 +136,55 @@ class Alliances:
         json_data = json.dumps(alliance.to_dict(), ensure_ascii=False, separators=(',', ':'))
 
         try:
-            config = json.loads(Alliances._connection_string)
-            connection = mysql.connector.connect(**config)
-            cursor = connection.cursor()
+            with DatabasePool.connection() as connection:
+                cursor = connection.cursor()
 
-            query = "UPDATE alliances SET `Trophies`=%s, `Data`=%s WHERE Id = %s"
-            cursor.execute(query, (alliance.trophies, json_data, alliance.id))
+                query = "UPDATE alliances SET `Trophies`=%s, `Data`=%s WHERE Id = %s"
+                cursor.execute(query, (alliance.trophies, json_data, alliance.id))
 
-            cursor.close()
-            connection.close()
+                cursor.close()
 
         except Error as e:
             print(f"Database error in save: {e}")
 
+    @staticmethod
+    def snapshot(alliance: Alliance) -> AllianceSnapshot:
+        """Serialize an alliance for a later write"""
+        json_data = json.dumps(alliance.to_dict(), ensure_ascii=False, separators=(',', ':'))
+        return AllianceSnapshot(alliance, (alliance.id, alliance.name, alliance.trophies, json_data))
+
+    @staticmethod
+    def save_batch(snapshots: List[AllianceSnapshot]) -> List[AllianceSnapshot]:
+        """Save many alliance snapshots in multi-row batches, returns snapshots that failed"""
+        rows = [snapshot.row for snapshot in snapshots]
+
+        query = ("INSERT INTO alliances (`Id`, `Name`, `Trophies`, `Data`) VALUES (%s, %s, %s, %s) "
+                 "ON DUPLICATE KEY UPDATE `Trophies`=VALUES(`Trophies`), `Data`=VALUES(`Data`)")
+
+        config = Configuration.instance
+        failed = BatchWriter.execute(query, rows, config.database_batch_size, config.database_batch_retries)
+        return [snapshots[index] for index in failed]
+
     @staticmethod
     def load(alliance_id: int) -> Optional[Alliance]:
         """Load alliance from database"""
         # Check cache first
-        if AllianceCache.is_alliance_cached(alliance_id):
-            return AllianceCache.get_alliance(alliance_id)
+        alliance = AllianceCache.get_alliance(alliance_id)
+        if alliance:
+            return alliance
+
+        # Only one worker process may hold (and write) an alliance at a time
+        if not AllianceCache.claim(alliance_id):
+            return None
 
         try:
-            config = json.loads(Alliances._connection_string)
-            connection = mysql.connector.connect(**config)
-            cursor = connection.cursor()
+            with DatabasePool.connection() as connection:
+                cursor = connection.cursor()
 
-            cursor.execute("SELECT * FROM alliances WHERE Id = %s", (alliance_id,))
-            result = cursor.fetchone()
+                cursor.execute("SELECT * FROM alliances WHERE Id = %s", (alliance_id,))
+                result = cursor.fetchone()
+
+                cursor.close()
 
             if result:
                 # Assuming the Data column is at index 3 (Id, Name, Trophies, Data)
@@ -139,13 +193,8 @@ class Alliances:
 
                 # Cache the alliance
                 AllianceCache.cache(alliance)
-
-                cursor.close()
-                connection.close()
                 return alliance
 
-            cursor.close()
-            connection.close()
             return None
 
         except Error as e:
@@ -158,12 +207,13 @@ class Alliances:
         alliance_list = []
 
         try:
-            config = json.loads(Alliances._connection_string)
-            connection = mysql.connector.connect(**config)
-            cursor = connection.cursor()
+            with DatabasePool.connection() as connection:
+                cursor = connection.cursor()
+
+                cursor.execute("SELECT * FROM alliances ORDER BY `Trophies` DESC LIMIT 200")
+                results = cursor.fetchall()
 
-            cursor.execute("SELECT * FROM alliances ORDER BY `Trophies` DESC LIMIT 200")
-            results = cursor.fetchall()
+                cursor.close()
 
             for result in results:
                 try:
@@ -173,14 +223,32 @@ class Alliances:
                 except json.JSONDecodeError:
                     continue
 
-            cursor.close()
-            connection.close()
-
         except Error as e:
             print(f"Database error in get_ranking_list: {e}")
 
         return alliance_list
 
+    @staticmethod
+    def get_leaderboard_seed(limit: int) -> List[Tuple[int, int, str]]:
+        """Narrow projection of the best limit alliances for seeding the club leaderboard: (id, trophies, name)"""
+        rows = []
+
+        try:
+            with DatabasePool.connection() as connection:
+                cursor = connection.cursor()
+
+                cursor.execute("SELECT `Id`, `Trophies`, `Name` FROM alliances ORDER BY `Trophies` DESC LIMIT %s", (limit,))
+                results = cursor.fetchall()
+
+                cursor.close()
+
+            rows = [(int(alliance_id), int(trophies or 0), name or "") for alliance_id, trophies, name in results]
+
+        except Error as e:
+            print(f"Database error in get_leaderboard_seed: {e}")
+
+        return rows
+
     @staticmethod
     def get_random_alliances(max_count: int) -> List[Alliance]:
         """Get random alliances up to max_count"""
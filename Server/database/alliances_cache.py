@@ -5,16 +5,27 @@ Caching system for alliances with periodic saving
 
 import threading
 import time
-from typing import Dict, Optional
+from typing import Callable, Dict, List, Optional
 from logic.club.alliance import Alliance
-from database.alliances import Alliances
+from database.alliances import Alliances, AllianceSnapshot
+from database.bounded_cache import BoundedCache
+from database.write_behind_queue import WriteBehindQueue
+from networking.ipc_broker import BrokerClient
+from settings.configuration import Configuration
 
 class AllianceCache:
     """Static class for caching alliances"""
 
-    _cached_alliances: Dict[int, Alliance] = {}
+    _cached_alliances: BoundedCache = BoundedCache()
     _thread: Optional[threading.Thread] = None
     _started: bool = True
+    _write_queue: Optional[WriteBehindQueue] = None
+    _unwritten: Dict[int, AllianceSnapshot] = {}  # evicted alliances whose write failed, retried by save_all
+    _unwritten_lock = threading.Lock()
+    _save_listeners: List[Callable[[Alliance], None]] = []
+
+    # Longer than IPCBroker.RELEASE_TIMEOUT so the broker answers first
+    CLAIM_TIMEOUT: float = 15.0
 
     @classmethod
     @property
@@ -25,7 +36,28 @@ class AllianceCache:
     @classmethod
     def init(cls) -> None:
         """Initialize alliance cache and start save thread"""
-        cls._cached_alliances = {}
+        config = Configuration.instance
+        cls._cached_alliances = BoundedCache(
+            max_size=config.alliance_cache_size,
+            idle_ttl=config.alliance_cache_idle_ttl,
+            on_evict=cls._on_evict
+        )
+
+        # Evicted alliances are written behind, off the thread that triggered the eviction
+        cls._write_queue = WriteBehindQueue(
+            cls._write_batch,
+            max_size=config.database_write_queue_size,
+            batch_size=config.database_batch_size,
+            put_timeout=config.database_write_queue_timeout,
+            name="AllianceWriter"
+        )
+        cls._write_queue.start()
+        cls._unwritten = {}
+
+        # In a worker process only the worker the broker lists for an alliance caches and writes it
+        if BrokerClient.is_connected():
+            BrokerClient.on("alliance_release", cls._release_requested)
+
         cls._thread = threading.Thread(target=cls._update, daemon=True)
         cls._thread.start()
 
@@ -35,6 +67,7 @@ class AllianceCache:
         while cls._started:
             try:
                 cls.save_all()
+                cls._cached_alliances.evict_expired()
                 time.sleep(30)  # Sleep for 30 seconds
             except Exception as e:
                 print(f"Error in AllianceCache update thread: {e}")
@@ -42,15 +75,60 @@ class AllianceCache:
 
     @classmethod
     def save_all(cls) -> None:
-        """Save all cached alliances to database"""
+        """Queue every cached alliance for writing, plus evicted ones whose write failed. All writes
+        go through the write-behind queue, so a newer snapshot replaces an older one of the same
+        alliance and is never overtaken by it"""
+        if not cls._write_queue:
+            return
         try:
+            with cls._unwritten_lock:
+                unwritten, cls._unwritten = cls._unwritten, {}
             for alliance in cls._cached_alliances.values():
-                try:
-                    Alliances.save(alliance)
-                except Exception as ex:
-                    print(f"Unhandled exception while saving alliance: {ex}")
-        except Exception:
-            pass  # Ignore exceptions in save_all
+                unwritten.pop(alliance.id, None)
+                cls._write_queue.put(alliance.id, Alliances.snapshot(alliance))
+            for alliance_id, snapshot in unwritten.items():
+                if not cls._write_queue.put(alliance_id, snapshot):
+                    cls._keep_unwritten(snapshot)
+        except Exception as ex:
+            print(f"Unhandled exception while saving alliances: {ex}")
+
+    @classmethod
+    def flush(cls, timeout: Optional[float] = None) -> bool:
+        """Queue every alliance and wait until the worker has written them"""
+        cls.save_all()
+        return cls._write_queue.drain(timeout) if cls._write_queue else True
+
+    @classmethod
+    def _keep_unwritten(cls, snapshot: AllianceSnapshot) -> None:
+        """Hold an evicted alliance's snapshot for the next save_all, unless a newer one is held"""
+        with cls._unwritten_lock:
+            cls._unwritten.setdefault(snapshot.alliance.id, snapshot)
+
+    @classmethod
+    def _write_batch(cls, snapshots: List[AllianceSnapshot]) -> None:
+        """Write-behind worker callback persisting one batch of snapshots"""
+        try:
+            failed = Alliances.save_batch(snapshots)
+        except Exception as ex:
+            failed = snapshots
+            print(f"Unhandled exception while saving alliances: {ex}")
+        if failed:
+            print(f"Failed to save {len(failed)} alliances, retrying next cycle")
+            # Cached alliances are queued again by save_all anyway; evicted ones are held for it
+            # instead of going back into the cache and being evicted again
+            for snapshot in failed:
+                if snapshot.alliance.id not in cls._cached_alliances:
+                    cls._keep_unwritten(snapshot)
+
+        failed_ids = {snapshot.alliance.id for snapshot in failed}
+        written = [snapshot.alliance for snapshot in snapshots if snapshot.alliance.id not in failed_ids]
+        cls._notify_listeners(written)
+
+        if BrokerClient.is_connected():
+            # Evicted alliances are in the database now, another worker may load them without a release
+            for alliance in written:
+                if alliance.id not in cls._cached_alliances:
+                    BrokerClient.notify("alliance_unregister", alliance.id)
 
     @classmethod
     def is_alliance_cached(cls, alliance_id: int) -> bool:
@@ -60,19 +138,106 @@ class AllianceCache:
     @classmethod
     def get_alliance(cls, alliance_id: int) -> Optional[Alliance]:
         """Get alliance from cache"""
-        return cls._cached_alliances.get(alliance_id)
+        alliance = cls._cached_alliances.get(alliance_id)
+        if alliance is None and cls._write_queue:
+            # Evicted but not written yet, the queued alliance is newer than the database row
+            snapshot = cls._write_queue.peek(alliance_id)
+            if snapshot is None:
+                with cls._unwritten_lock:
+                    snapshot = cls._unwritten.pop(alliance_id, None)
+            if snapshot is not None:
+                alliance = snapshot.alliance
+                cls._cached_alliances.put(alliance_id, alliance)
+        return alliance
 
     @classmethod
     def cache(cls, alliance: Alliance) -> None:
         """Cache an alliance"""
         if alliance and hasattr(alliance, 'id'):
-            cls._cached_alliances[alliance.id] = alliance
+            cls._cached_alliances.put(alliance.id, alliance)
+            cls._notify_listeners([alliance])
+
+    @classmethod
+    def add_save_listener(cls, listener: Callable[[Alliance], None]) -> None:
+        """Register a callback run for every alliance that is cached or persisted"""
+        cls._save_listeners.append(listener)
+
+    @classmethod
+    def _notify_listeners(cls, alliances: List[Alliance]) -> None:
+        """Run save listeners, a failing listener never breaks persistence"""
+        for listener in cls._save_listeners:
+            for alliance in alliances:
+                try:
+                    listener(alliance)
+                except Exception as e:
+                    print(f"Error in AllianceCache save listener: {e}")
 
     @classmethod
     def remove(cls, alliance_id: int) -> None:
-        """Remove alliance from cache"""
-        if alliance_id in cls._cached_alliances:
-            del cls._cached_alliances[alliance_id]
+        """Remove alliance from cache, queueing it for writing"""
+        alliance = cls._cached_alliances.remove(alliance_id)
+        if alliance and not cls._on_evict(alliance):
+            cls._keep_unwritten(Alliances.snapshot(alliance))
+
+    @classmethod
+    def _on_evict(cls, alliance: Alliance) -> bool:
+        """Alliances carry no dirty flag, queue every one for writing; kept if the queue refuses"""
+        if not cls._write_queue:
+            return False
+        return cls._write_queue.put(alliance.id, Alliances.snapshot(alliance))
+
+    @classmethod
+    def claim(cls, alliance_id: int) -> bool:
+        """Become the only worker caching and writing an alliance before loading it; the broker first
+        has the previous one write its copy. False if it did not, and the alliance must not be loaded"""
+        if not BrokerClient.is_connected():
+            return True
+        return BrokerClient.call("alliance_claim", alliance_id, timeout=cls.CLAIM_TIMEOUT) is True
+
+    @classmethod
+    def release(cls, alliance_id: int, timeout: float = 8.0) -> bool:
+        """Remove alliance from cache and wait until it is in the database, so another worker process
+        can load it; on failure it stays cached for the next save_all"""
+        alliance = cls._cached_alliances.remove(alliance_id)
+        if alliance is not None:
+            queued = cls._on_evict(alliance)
+        else:
+            # Evicted: its snapshot is queued, being written or held after a failed write
+            with cls._unwritten_lock:
+                snapshot = cls._unwritten.pop(alliance_id, None)
+            if snapshot is not None:
+                alliance = snapshot.alliance
+                queued = cls._write_queue.put(alliance_id, snapshot)
+            else:
+                queued = True
+
+        if queued and (cls._write_queue is None or cls._write_queue.wait_for(alliance_id, timeout)):
+            with cls._unwritten_lock:
+                failed = alliance_id in cls._unwritten
+            if not failed:
+                return True
+            with cls._unwritten_lock:
+                alliance = cls._unwritten.pop(alliance_id).alliance
+
+        if alliance is not None:
+            cls._cached_alliances.put(alliance_id, alliance)
+        return False
+
+    @classmethod
+    def _release_requested(cls, alliance_id: int) -> None:
+        """Another worker is loading the alliance; runs off the broker reader thread"""
+        threading.Thread(target=cls._release_to_broker, args=(alliance_id,),
+                         name=f"AllianceRelease-{alliance_id}", daemon=True).start()
+
+    @classmethod
+    def _release_to_broker(cls, alliance_id: int) -> None:
+        """Write and drop the alliance and acknowledge, even when it was not cached"""
+        BrokerClient.notify("alliance_released", alliance_id, cls.release(alliance_id))
+
+    @classmethod
+    def get_cache_metrics(cls) -> Dict[str, int]:
+        """Hit, miss and eviction counters of the alliance cache"""
+        return cls._cached_alliances.get_metrics()
 
     @classmethod
     def shutdown(cls) -> None:
@@ -81,3 +246,5 @@ class AllianceCache:
         if cls._thread and cls._thread.is_alive():
             cls._thread.join(timeout=5)
         cls.save_all()  # Final save before shutdown
+        if cls._write_queue:
+            cls._write_queue.stop(timeout=30)
@@ -0,0 +1,162 @@
+"""
+Asyncio adapter for the blocking database layer
+Runs Accounts/Alliances calls on a dedicated thread pool so an event loop never waits on MySQL
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from database.account_codec import AccountView
+from database.accounts import Accounts
+from database.alliances import Alliances
+from database.cache.account_cache import AccountCache
+from database.latency_histogram import LatencyHistogram
+from database.models.account import Account
+from logic.club.alliance import Alliance
+from settings.configuration import Configuration
+
+
+class AsyncDatabase:
+    """Static executor shared by the async repositories, with one latency histogram per call name"""
+
+    _executor: Optional[ThreadPoolExecutor] = None
+    _histograms: Dict[str, LatencyHistogram] = {}
+    _lock: threading.Lock = threading.Lock()
+
+    @classmethod
+    def init(cls, workers: Optional[int] = None) -> None:
+        """Create the executor; sized like the connection pool so workers rarely wait for a connection"""
+        with cls._lock:
+            if cls._executor is None:
+                workers = workers or Configuration.instance.database_async_workers
+                cls._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="AsyncDB")
+
+    @classmethod
+    def get_histogram(cls, name: str) -> LatencyHistogram:
+        """Get or create the histogram for a call name"""
+        histogram = cls._histograms.get(name)
+        if histogram is None:
+            with cls._lock:
+                histogram = cls._histograms.setdefault(name, LatencyHistogram(name))
+        return histogram
+
+    @classmethod
+    async def run(cls, name: str, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking call on the executor and record how long the caller waited"""
+        if cls._executor is None:
+            cls.init()
+
+        started = time.perf_counter()
+        failed = False
+        try:
+            return await asyncio.get_running_loop().run_in_executor(cls._executor, func, *args)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            cls.get_histogram(name).record((time.perf_counter() - started) * 1000, failed)
+
+    @classmethod
+    def submit(cls, name: str, func: Callable[..., Any], *args: Any) -> Optional[Future]:
+        """Run a blocking call on the executor from a thread without an event loop, such as a battle
+        tick thread; runs it in the caller when the executor is already shut down"""
+        if cls._executor is None:
+            cls.init()
+
+        def call() -> Any:
+            started = time.perf_counter()
+            failed = False
+            try:
+                return func(*args)
+            except Exception:
+                failed = True
+                raise
+            finally:
+                cls.get_histogram(name).record((time.perf_counter() - started) * 1000, failed)
+
+        try:
+            return cls._executor.submit(call)
+        except (RuntimeError, AttributeError):
+            call()
+            return None
+
+    @classmethod
+    def get_metrics(cls) -> Dict[str, Dict[str, float]]:
+        """Histogram snapshots keyed by call name"""
+        return {name: histogram.get_metrics() for name, histogram in sorted(cls._histograms.items())}
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """Wait for running calls and stop the executor"""
+        with cls._lock:
+            executor, cls._executor = cls._executor, None
+        if executor:
+            executor.shutdown(wait=True)
+
+
+class AsyncAccounts:
+    """Awaitable counterpart of Accounts"""
+
+    @staticmethod
+    async def load(account_id: int) -> Optional[Account]:
+        """Load account; the cache lookup runs on the executor too, it may wait on the cache lock
+        or peek the write-behind queue"""
+        return await AsyncDatabase.run("accounts.load", Accounts.load, account_id)
+
+    @staticmethod
+    async def load_view(account_id: int) -> Optional[Union[Account, AccountView]]:
+        """Load account for read-only use"""
+        return await AsyncDatabase.run("accounts.load_view", Accounts.load_view, account_id)
+
+    @staticmethod
+    async def create() -> Account:
+        """Create a new account"""
+        return await AsyncDatabase.run("accounts.create", Accounts.create)
+
+    @staticmethod
+    async def save(account: Account) -> bool:
+        """Queue account for the write-behind writer; may wait briefly on a full queue"""
+        return await AsyncDatabase.run("accounts.save", AccountCache.save, account)
+
+    @staticmethod
+    async def get_ranking_list() -> List[AccountView]:
+        """Get global ranking list"""
+        return await AsyncDatabase.run("accounts.get_ranking_list", Accounts.get_ranking_list)
+
+    @staticmethod
+    async def get_brawler_ranking_list(hero_data_id: int, limit: int = 200) -> List[AccountView]:
+        """Get brawler-specific ranking list"""
+        return await AsyncDatabase.run("accounts.get_brawler_ranking_list",
+                                       Accounts.get_brawler_ranking_list, hero_data_id, limit)
+
+
+class AsyncAlliances:
+    """Awaitable counterpart of Alliances"""
+
+    @staticmethod
+    async def load(alliance_id: int) -> Optional[Alliance]:
+        """Load alliance; the cache lookup runs on the executor like the query"""
+        return await AsyncDatabase.run("alliances.load", Alliances.load, alliance_id)
+
+    @staticmethod
+    async def create(alliance: Alliance) -> None:
+        """Create a new alliance"""
+        await AsyncDatabase.run("alliances.create", Alliances.create, alliance)
+
+    @staticmethod
+    async def save(alliance: Alliance) -> None:
+        """Save alliance to database"""
+        await AsyncDatabase.run("alliances.save", Alliances.save, alliance)
+
+    @staticmethod
+    async def get_ranking_list() -> List[Alliance]:
+        """Get global alliance ranking list"""
+        return await AsyncDatabase.run("alliances.get_ranking_list", Alliances.get_ranking_list)
+
+    @staticmethod
+    async def get_random_alliances(max_count: int) -> List[Alliance]:
+        """Get random alliances up to max_count"""
+        return await AsyncDatabase.run("alliances.get_random_alliances", Alliances.get_random_alliances, max_count)
@@ -0,0 +1,72 @@
+"""
+Batched writes for the database layer
+Groups many rows into executemany transactions instead of one round trip per row
+"""
+
+import time
+from typing import List, Sequence, Tuple
+
+from mysql.connector import Error
+
+from database.connection_pool import DatabasePool
+
+
+class BatchWriter:
+    """Static helper running one statement for many rows in batches"""
+
+    # Statistics
+    batches_written: int = 0
+    batches_retried: int = 0
+    rows_failed: int = 0
+
+    @classmethod
+    def execute(cls, query: str, rows: Sequence[Tuple], batch_size: int = 500,
+                retries: int = 2) -> List[int]:
+        """Write rows in transactions of batch_size, returns indices of rows that could not be written"""
+        failed: List[int] = []
+        batch_size = max(1, batch_size)
+
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+
+            if cls._write_batch(query, batch, retries):
+                cls.batches_written += 1
+                continue
+
+            # Whole batch kept failing, write row by row so one bad row does not sink the rest
+            for offset, row in enumerate(batch):
+                if not cls._write_batch(query, [row], 0):
+                    failed.append(start + offset)
+
+        cls.rows_failed += len(failed)
+        return failed
+
+    @classmethod
+    def _write_batch(cls, query: str, batch: Sequence[Tuple], retries: int) -> bool:
+        """Write one batch in a single transaction, retrying on failure"""
+        for attempt in range(retries + 1):
+            if attempt:
+                cls.batches_retried += 1
+                time.sleep(0.05 * attempt)
+
+            try:
+                with DatabasePool.connection() as connection:
+                    if hasattr(connection, 'start_transaction'):
+                        connection.start_transaction()
+                    cursor = connection.cursor()
+                    try:
+                        cursor.executemany(query, batch)
+                        connection.commit()
+                    except Exception:
+                        connection.rollback()
+                        raise
+                    finally:
+                        cursor.close()
+                return True
+
+            except Error as e:
+                print(f"Database error in batch write ({len(batch)} rows, attempt {attempt + 1}): {e}")
+            except Exception as e:
+                print(f"Unhandled exception in batch write ({len(batch)} rows, attempt {attempt + 1}): {e}")
+
+        return False
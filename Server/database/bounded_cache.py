@@ -0,0 +1,159 @@
+"""
+Bounded LRU cache with idle TTL eviction
+Backs AccountCache and AllianceCache so memory stays flat on long-running nodes
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class BoundedCache:
+    """Thread-safe LRU cache; pinned entries are never evicted, on_evict may veto an eviction.
+    on_evict runs after the lock is released, so a slow flush never stalls other lookups"""
+
+    def __init__(self, max_size: int = 10000, idle_ttl: float = 600.0,
+                 is_pinned: Optional[Callable[[Any], bool]] = None,
+                 on_evict: Optional[Callable[[Any], bool]] = None):
+        """Initialize cache; on_evict returns False to keep an entry (e.g. its flush failed)"""
+        self.max_size = max(1, max_size)
+        self.idle_ttl = idle_ttl
+        self._is_pinned = is_pinned or (lambda key: False)
+        self._on_evict = on_evict or (lambda value: True)
+
+        # key -> [value, last access time], least recently used first
+        self._entries: "OrderedDict[Any, List[Any]]" = OrderedDict()
+        # key -> value taken out for eviction whose on_evict has not returned yet
+        self._evicting: Dict[Any, Any] = {}
+        self._lock = threading.RLock()
+
+        # Metrics
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._entries or key in self._evicting
+
+    def get(self, key: Any) -> Optional[Any]:
+        """Get value and mark it as recently used"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if key not in self._evicting:
+                    self.misses += 1
+                    return None
+                # Still being evicted: the lookup keeps it
+                entry = self._entries[key] = [self._evicting[key], 0.0]
+            entry[1] = time.monotonic()
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Any, value: Any) -> None:
+        """Insert or replace value, evicting least recently used entries over max_size"""
+        with self._lock:
+            self._entries[key] = [value, time.monotonic()]
+            self._entries.move_to_end(key)
+            victims = self._take_lru() if len(self._entries) > self.max_size else []
+        self._finish_evictions(victims)
+
+    def remove(self, key: Any) -> Optional[Any]:
+        """Remove entry without calling on_evict"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None and key in self._evicting:
+                # Its on_evict is already handling it
+                return None
+            return entry[0] if entry else None
+
+    def values(self) -> List[Any]:
+        """Snapshot of cached values"""
+        with self._lock:
+            return [entry[0] for entry in self._entries.values()]
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+
+    def _take_lru(self) -> List[Tuple[Any, Any]]:
+        """Take entries from the LRU end until back under max_size, must hold the lock"""
+        victims = []
+        # Each entry is examined at most once since pinned entries move to the MRU end
+        for _ in range(len(self._entries)):
+            if len(self._entries) <= self.max_size:
+                break
+            key, entry = next(iter(self._entries.items()))
+            if self._take(key, entry):
+                victims.append((key, entry[0]))
+        return victims
+
+    def evict_expired(self) -> int:
+        """Evict entries idle for longer than idle_ttl, returns how many were evicted"""
+        deadline = time.monotonic() - self.idle_ttl
+        victims = []
+        with self._lock:
+            # Oldest access first, stop at the first entry that is still fresh
+            for key, entry in list(self._entries.items()):
+                if entry[1] > deadline:
+                    break
+                if self._take(key, entry):
+                    victims.append((key, entry[0]))
+        return self._finish_evictions(victims)
+
+    def _take(self, key: Any, entry: List[Any]) -> bool:
+        """Move an entry to the evicting set unless it is pinned; kept entries count as used"""
+        try:
+            pinned = self._is_pinned(key)
+        except Exception as e:
+            print(f"Error while evicting cache entry {key}: {e}")
+            pinned = True
+
+        if pinned:
+            entry[1] = time.monotonic()
+            self._entries.move_to_end(key)
+            return False
+
+        del self._entries[key]
+        self._evicting[key] = entry[0]
+        return True
+
+    def _finish_evictions(self, victims: List[Tuple[Any, Any]]) -> int:
+        """Run on_evict for taken entries without holding the lock, put back the ones it refuses"""
+        evicted = 0
+        for key, value in victims:
+            try:
+                accepted = self._on_evict(value)
+            except Exception as e:
+                print(f"Error while evicting cache entry {key}: {e}")
+                accepted = False
+
+            with self._lock:
+                self._evicting.pop(key, None)
+                if key in self._entries:
+                    # Looked up or replaced meanwhile, it stays cached
+                    continue
+                if accepted:
+                    self.evictions += 1
+                    evicted += 1
+                else:
+                    self._entries[key] = [value, time.monotonic()]
+        return evicted
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Snapshot of cache counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / lookups * 100) if lookups else 0.0,
+            }
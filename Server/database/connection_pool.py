@@ -0,0 +1,251 @@
+"""
+Shared bounded connection pool for the database layer
+Used by Accounts and Alliances instead of opening a connection per query
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from queue import Queue, Empty, Full
+from typing import Any, Callable, Dict, Iterator, Optional
+
+import mysql.connector
+from mysql.connector import Error
+
+from settings.configuration import Configuration
+
+
+class PoolTimeoutError(Error):
+    """Raised when no pooled connection becomes free within the checkout timeout"""
+
+
+class _PooledConnection:
+    """Raw DB-API connection plus the bookkeeping the pool needs"""
+
+    def __init__(self, raw: Any):
+        self.raw = raw
+        self.last_used: float = time.monotonic()
+        self.checked_out: bool = False
+
+
+class ConnectionPool:
+    """Bounded pool of DB-API connections; the DAOs' SQL uses the %s paramstyle of mysql.connector"""
+
+    def __init__(self, connect: Callable[[], Any], size: int = 8,
+                 checkout_timeout: float = 5.0, health_check_interval: float = 30.0):
+        """Initialize pool; connections are opened lazily up to size"""
+        self._connect = connect
+        self.size = max(1, size)
+        self.checkout_timeout = checkout_timeout
+        self.health_check_interval = health_check_interval
+
+        self._idle: Queue = Queue(maxsize=self.size)
+        self._lock = threading.Lock()
+        self._opened: int = 0
+        self._closed: bool = False
+
+        # Metrics
+        self.checkouts: int = 0
+        self.in_use: int = 0
+        self.reconnects: int = 0
+        self.timeouts: int = 0
+        self.total_wait_time: float = 0.0
+        self.max_wait_time: float = 0.0
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """Check out a connection for the duration of a with-block"""
+        pooled = self._checkout()
+        broken = False
+        try:
+            yield pooled.raw
+        except Exception:
+            # The connection may be mid-transaction or dead, never hand it out again
+            broken = True
+            raise
+        finally:
+            self._checkin(pooled, broken)
+
+    def _checkout(self) -> _PooledConnection:
+        """Take an idle connection, open a new one, or wait for a free one"""
+        if self._closed:
+            raise PoolTimeoutError(msg="Connection pool is closed")
+
+        started = time.monotonic()
+        pooled: Optional[_PooledConnection] = None
+
+        try:
+            pooled = self._idle.get_nowait()
+        except Empty:
+            with self._lock:
+                can_open = self._opened < self.size
+                if can_open:
+                    self._opened += 1
+            if can_open:
+                try:
+                    pooled = _PooledConnection(self._connect())
+                except Exception:
+                    with self._lock:
+                        self._opened -= 1
+                    raise
+            else:
+                try:
+                    pooled = self._idle.get(timeout=self.checkout_timeout)
+                except Empty:
+                    with self._lock:
+                        self.timeouts += 1
+                    raise PoolTimeoutError(
+                        msg=f"No database connection free after {self.checkout_timeout}s")
+
+        # A connection opened just now needs no ping
+        if pooled.checked_out:
+            pooled = self._ensure_healthy(pooled)
+        pooled.checked_out = True
+
+        waited = time.monotonic() - started
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.total_wait_time += waited
+            if waited > self.max_wait_time:
+                self.max_wait_time = waited
+
+        return pooled
+
+    def _ensure_healthy(self, pooled: _PooledConnection) -> _PooledConnection:
+        """Ping connections that sat idle for too long, reconnect stale ones"""
+        if time.monotonic() - pooled.last_used < self.health_check_interval:
+            return pooled
+
+        try:
+            if hasattr(pooled.raw, "ping"):
+                pooled.raw.ping(reconnect=False)
+            else:
+                cursor = pooled.raw.cursor()
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+                cursor.close()
+            return pooled
+        except Exception:
+            self._close_raw(pooled.raw)
+            try:
+                fresh = _PooledConnection(self._connect())
+            except Exception:
+                with self._lock:
+                    self._opened -= 1
+                raise
+            with self._lock:
+                self.reconnects += 1
+            return fresh
+
+    def _checkin(self, pooled: _PooledConnection, broken: bool) -> None:
+        """Return a connection to the idle queue or drop it"""
+        with self._lock:
+            self.in_use -= 1
+
+        if broken or self._closed:
+            self._discard(pooled)
+            return
+
+        pooled.last_used = time.monotonic()
+        try:
+            self._idle.put_nowait(pooled)
+        except Full:
+            self._discard(pooled)
+
+    def _discard(self, pooled: _PooledConnection) -> None:
+        """Close a connection and free its slot"""
+        self._close_raw(pooled.raw)
+        with self._lock:
+            self._opened -= 1
+
+    @staticmethod
+    def _close_raw(raw: Any) -> None:
+        """Close a raw connection, ignoring errors from dead sockets"""
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Snapshot of pool counters"""
+        with self._lock:
+            return {
+                "size": self.size,
+                "opened": self._opened,
+                "in_use": self.in_use,
+                "idle": self._idle.qsize(),
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "reconnects": self.reconnects,
+                "avg_wait_ms": (self.total_wait_time / self.checkouts * 1000) if self.checkouts else 0.0,
+                "max_wait_ms": self.max_wait_time * 1000,
+            }
+
+    def close(self) -> None:
+        """Close every idle connection and refuse new checkouts"""
+        self._closed = True
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except Empty:
+                break
+
+
+class DatabasePool:
+    """Static holder for the connection pool shared by all DAOs"""
+
+    _pool: Optional[ConnectionPool] = None
+    _lock: threading.Lock = threading.Lock()
+
+    @classmethod
+    def init(cls, user: str, password: str) -> ConnectionPool:
+        """Create the shared MySQL pool once; later calls reuse it"""
+        with cls._lock:
+            if cls._pool is not None:
+                return cls._pool
+
+            config = Configuration.instance
+            connection_config = {
+                'host': '127.0.0.1',
+                'user': user,
+                'password': password,
+                'database': config.database_name,
+                'charset': 'utf8mb4',
+                'autocommit': True,
+                'ssl_disabled': True
+            }
+
+            cls._pool = ConnectionPool(
+                lambda: mysql.connector.connect(**connection_config),
+                size=config.database_pool_size,
+                checkout_timeout=config.database_pool_timeout,
+                health_check_interval=config.database_pool_health_check_interval
+            )
+            return cls._pool
+
+    @classmethod
+    def set_pool(cls, pool: Optional[ConnectionPool]) -> None:
+        """Install a custom pool before the DAOs are used; its driver must accept %s placeholders"""
+        with cls._lock:
+            cls._pool = pool
+
+    @classmethod
+    def connection(cls):
+        """Check out a connection from the shared pool"""
+        if cls._pool is None:
+            raise PoolTimeoutError(msg="DatabasePool.init was not called")
+        return cls._pool.connection()
+
+    @classmethod
+    def get_metrics(cls) -> Dict[str, Any]:
+        """Metrics of the shared pool, empty if not initialized"""
+        return cls._pool.get_metrics() if cls._pool else {}
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """Close the shared pool"""
+        with cls._lock:
+            if cls._pool:
+                cls._pool.close()
+                cls._pool = None
@@ -0,0 +1,71 @@
+"""
+Fixed-bucket latency histogram
+Cheap enough to record on every database call and summarised by the status command
+"""
+
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+
+
+class LatencyHistogram:
+    """Counts call latencies in millisecond buckets and estimates percentiles from them"""
+
+    # Upper bucket bounds in milliseconds, the last bucket collects everything slower
+    BOUNDS: Tuple[float, ...] = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+    def __init__(self, name: str):
+        """Initialize empty histogram"""
+        self.name = name
+        self._buckets: List[int] = [0] * (len(self.BOUNDS) + 1)
+        self._lock = threading.Lock()
+        self.count: int = 0
+        self.errors: int = 0
+        self.total_ms: float = 0.0
+        self.max_ms: float = 0.0
+
+    def record(self, elapsed_ms: float, failed: bool = False) -> None:
+        """Add one observation"""
+        index = bisect_left(self.BOUNDS, elapsed_ms)
+        with self._lock:
+            self._buckets[index] += 1
+            self.count += 1
+            self.total_ms += elapsed_ms
+            if elapsed_ms > self.max_ms:
+                self.max_ms = elapsed_ms
+            if failed:
+                self.errors += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of calls, capped at the slowest call"""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            target = fraction * self.count
+            seen = 0
+            for index, bucket in enumerate(self._buckets):
+                seen += bucket
+                if seen >= target:
+                    return min(self.BOUNDS[index], self.max_ms) if index < len(self.BOUNDS) else self.max_ms
+            return self.max_ms
+
+    def get_metrics(self) -> Dict[str, float]:
+        """Snapshot of count, errors, average, p50/p95/p99 and max in milliseconds"""
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "avg_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": self.max_ms,
+        }
+
+    def reset(self) -> None:
+        """Clear all observations"""
+        with self._lock:
+            self._buckets = [0] * (len(self.BOUNDS) + 1)
+            self.count = 0
+            self.errors = 0
+            self.total_ms = 0.0
+            self.max_ms = 0.0
@@ -0,0 +1,165 @@
+"""
+Write-behind persistence queue
+Request threads enqueue snapshots of changed objects, one worker thread writes them in batches
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+
+class WriteBehindQueue:
+    """Bounded queue coalescing pending writes by key, drained by a single worker"""
+
+    def __init__(self, writer: Callable[[List[Any]], None], max_size: int = 10000,
+                 batch_size: int = 500, put_timeout: float = 0.5, name: str = "WriteBehindQueue"):
+        """Initialize queue; writer receives lists of at most batch_size items"""
+        self._writer = writer
+        self.max_size = max(1, max_size)
+        self.batch_size = max(1, batch_size)
+        self.put_timeout = put_timeout
+        self.name = name
+
+        self._pending: "OrderedDict[Any, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._idle = threading.Condition(self._lock)
+        self._in_flight: "OrderedDict[Any, Any]" = OrderedDict()
+        self._running: bool = False
+        self._thread: Optional[threading.Thread] = None
+
+        # Metrics
+        self.enqueued: int = 0
+        self.coalesced: int = 0
+        self.rejected: int = 0
+        self.written: int = 0
+        self.max_depth: int = 0
+
+    def start(self) -> None:
+        """Start the worker thread"""
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def put(self, key: Any, item: Any) -> bool:
+        """Queue item for writing; a pending write with the same key is replaced, not duplicated.
+        The worker writes items later on its own thread, so item must not be mutated after put"""
+        with self._lock:
+            if not self._running:
+                self.rejected += 1
+                return False
+
+            if key in self._pending:
+                self._pending[key] = item
+                self.coalesced += 1
+                return True
+
+            # Backpressure: wait briefly for the worker, then give up and let the caller retry later
+            deadline = time.monotonic() + self.put_timeout
+            while len(self._pending) >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.rejected += 1
+                    return False
+                self._not_full.wait(remaining)
+                if not self._running:
+                    self.rejected += 1
+                    return False
+
+            self._pending[key] = item
+            self.enqueued += 1
+            if len(self._pending) > self.max_depth:
+                self.max_depth = len(self._pending)
+            self._not_empty.notify()
+            return True
+
+    def _run(self) -> None:
+        """Worker loop writing pending items in batches"""
+        while True:
+            with self._lock:
+                while self._running and not self._pending:
+                    self._not_empty.wait()
+                if not self._running and not self._pending:
+                    return
+
+                while self._pending and len(self._in_flight) < self.batch_size:
+                    key, item = self._pending.popitem(last=False)
+                    self._in_flight[key] = item
+                batch = list(self._in_flight.values())
+                self._not_full.notify_all()
+
+            try:
+                self._writer(batch)
+            except Exception as e:
+                print(f"Unhandled exception in {self.name} worker: {e}")
+
+            with self._lock:
+                self.written += len(batch)
+                self._in_flight.clear()
+                # drain() and wait_for() recheck their own condition after every batch
+                self._idle.notify_all()
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Block until every queued item has been written, returns False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            while self._pending or self._in_flight:
+                if not self._running:
+                    return False
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+            return True
+
+    def wait_for(self, key: Any, timeout: Optional[float] = None) -> bool:
+        """Block until no write for key is queued or in flight, returns False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            while key in self._pending or key in self._in_flight:
+                if not self._running:
+                    return False
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+            return True
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop accepting items, write what is left and join the worker"""
+        with self._lock:
+            self._running = False
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+            self._idle.notify_all()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+
+    def peek(self, key: Any) -> Optional[Any]:
+        """Get an item that is queued or being written, None if there is none"""
+        with self._lock:
+            item = self._pending.get(key)
+            return item if item is not None else self._in_flight.get(key)
+
+    @property
+    def depth(self) -> int:
+        """Number of items waiting to be written"""
+        return len(self._pending)
+
+    def get_metrics(self) -> Dict[str, int]:
+        """Snapshot of queue counters"""
+        with self._lock:
+            return {
+                "depth": len(self._pending),
+                "in_flight": len(self._in_flight),
+                "max_depth": self.max_depth,
+                "enqueued": self.enqueued,
+                "coalesced": self.coalesced,
+                "rejected": self.rejected,
+                "written": self.written,
+            }
@@ -77,6 +77,7 @@ class CmdHandler:
         print("  /login [TAG]             - Send login token (requires session)")
         print("  /changetheme [THEME_ID]  - Change theme (requires session)")
         print("  /ToID [TAG]              - Convert tag to ID")
+        print("  /backfillheroes          - Rebuild per-brawler trophies table")
         print("  help                     - Show this help message")
 
     @staticmethod
@@ -116,6 +117,8 @@ class CmdHandler:
                 CmdHandler._execute_unlock_all_for_account(args)
             elif command == "removeall":
                 CmdHandler._execute_remove_all_for_account(args)
+            elif command == "backfillheroes":
+                CmdHandler._execute_backfill_hero_trophies()
             elif command == "maintenance" or command == "m":
                 print("Starting maintenance...")
                 CmdHandler._execute_shutdown()
@@ -163,6 +166,7 @@ class CmdHandler:
                     try:
                         theme_id = int(args[1])
                         account.home.preferred_theme_id = theme_id
+                        account.mark_dirty()
                         print(f"Theme changed to {theme_id}")
                     except ValueError:
                         print("Invalid theme ID")
@@ -189,8 +193,9 @@ class CmdHandler:
 
         # Refresh avatar to unlock all
         account.avatar.refresh()
+        account.mark_dirty()
 
-        AccountCache.save_all()
+        AccountCache.save(account)
         Logger.print_log(f"Successfully unlocked all brawlers for account {account_id} ({args[1]})")
 
         # Kick player if online
@@ -227,6 +232,7 @@ class CmdHandler:
                 i += 1
             else:
                 break
+        account.mark_dirty()
 
         Logger.print_log(f"Successfully removed all brawlers for account {account_id} ({args[1]})")
 
@@ -253,6 +259,7 @@ class CmdHandler:
             return
 
         account.avatar.is_premium = True
+        account.mark_dirty()
 
         # Kick player if online to refresh
         if Sessions.is_session_active(account_id):
@@ -277,6 +284,7 @@ class CmdHandler:
             return
 
         account.avatar.banned = False
+        account.mark_dirty()
 
         # Kick player if online to refresh
         if Sessions.is_session_active(account_id):
@@ -303,6 +311,7 @@ class CmdHandler:
         account.avatar.banned = True
         account.avatar.reset_trophies()
         account.avatar.name = "Brawler"
+        account.mark_dirty()
 
         # Kick player if online
         if Sessions.is_session_active(account_id):
@@ -327,6 +336,7 @@ class CmdHandler:
             return
 
         account.avatar.name = args[2]
+        account.mark_dirty()
 
         # Kick player if online to refresh
         if Sessions.is_session_active(account_id):
@@ -380,6 +390,7 @@ class CmdHandler:
             if hasattr(account.avatar, field_name):
                 value = int(args[3])
                 setattr(account.avatar, field_name, value)
+                account.mark_dirty()
                 print(f"Successfully changed {field_name} to {value}")
 
                 # Kick player if online to refresh
@@ -397,12 +408,18 @@ class CmdHandler:
         except Exception as e:
             print(f"Error changing field value: {e}")
 
+    @staticmethod
+    def _execute_backfill_hero_trophies():
+        """Fill account_heroes from the account blobs (run once after upgrading)"""
+        # Pending saves would otherwise be overwritten by older blob values
+        AccountCache.flush(timeout=30)
+        print("Backfilling brawler trophies...")
+        rows = Accounts.backfill_hero_trophies()
+        print(f"Done: {rows} brawler rows written")
+
     @staticmethod
     def _execute_shutdown():
         """Execute server shutdown"""
         Sessions.start_shutdown()
-        AccountCache.save_all()
-        AllianceCache.save_all()
-
-        AccountCache._started = False
-        AllianceCache._started = False
+        AccountCache.shutdown()
+        AllianceCache.shutdown()
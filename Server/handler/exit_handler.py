@@ -8,7 +8,11 @@ import signal
 import atexit
 from database.cache.account_cache import AccountCache  
 from database.cache.alliance_cache import AllianceCache
+from database.connection_pool import DatabasePool
+from database.async_db import AsyncDatabase
 from networking.session.sessions import Sessions
+from networking.worker_cluster import WorkerCluster
+from logic.game.battles import Battles
 from logger import Logger
 
 class ExitHandler:
@@ -20,15 +24,24 @@ class ExitHandler:
         try:
             Sessions.start_shutdown()
 
+            # Multi-process mode: workers flush their own caches on SIGTERM
+            if not WorkerCluster.is_worker():
+                WorkerCluster.shutdown()
+
             Logger.print_log("Shutting down...")
 
-            # Save all cached data
-            AccountCache.save_all()
-            AllianceCache.save_all()
+            # Stop battle ticks so no battle mutates accounts during the flush
+            Battles.shutdown()
+
+            # Let in-flight async calls finish before the caches flush
+            AsyncDatabase.shutdown()
+
+            # Save all cached data, draining the account write-behind queue
+            AccountCache.shutdown()
+            AllianceCache.shutdown()
 
-            # Stop cache threads
-            AccountCache._started = False
-            AllianceCache._started = False
+            # Close pooled database connections
+            DatabasePool.shutdown()
 
             print("Server is now in maintenance mode.")
             print("Shutdown complete!")
@@ -55,7 +68,7 @@ class ExitHandler:
     def _cleanup():
         """Cleanup function called on normal exit"""
         try:
-            AccountCache.save_all()
-            AllianceCache.save_all()
+            AccountCache.flush(timeout=30)
+            AllianceCache.flush(timeout=30)
         except Exception as e:
             print(f"Error during cleanup: {e}")
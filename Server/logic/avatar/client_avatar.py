@@ -5,10 +5,16 @@ Client avatar class for player avatar management
 
 from typing import Dict, List, Optional, Any
 from .structures.player_display_data import PlayerDisplayData
+from ..helper.section_cache import SectionCache
 
 class ClientAvatar:
     """Client avatar class for player avatar management"""
 
+    # Encoded sections cached between OwnHomeData and profile sends
+    SECTION_HEADER = "avatar.header"
+    SECTION_HEROES = "avatar.heroes"
+    SECTIONS = (SECTION_HEADER, SECTION_HEROES)
+
     def __init__(self):
         """Initialize client avatar"""
         self.account_id = 0
@@ -53,6 +59,19 @@ class ClientAvatar:
         self.battles_played = 0
         self.victory_count = 0
 
+        # Set by mutations, cleared once the owning account is persisted
+        self.dirty = False
+        self.encode_cache = SectionCache()
+
+    def mark_dirty(self, *sections: str) -> None:
+        """Flag avatar as changed since the last save and drop the encoded sections (all when none given)"""
+        self.dirty = True
+        self.encode_cache.invalidate(*sections)
+
+    def clear_dirty(self) -> None:
+        """Clear changed flag after a save"""
+        self.dirty = False
+
     def get_account_id(self) -> int:
         """Get account ID"""
         return self.account_id
@@ -60,6 +79,7 @@ class ClientAvatar:
     def set_account_id(self, account_id: int) -> None:
         """Set account ID"""
         self.account_id = account_id
+        self.mark_dirty(self.SECTION_HEADER)
 
     def get_name(self) -> str:
         """Get player name"""
@@ -68,6 +88,7 @@ class ClientAvatar:
     def set_name(self, name: str) -> None:
         """Set player name"""
         self.name = name
+        self.mark_dirty(self.SECTION_HEADER)
 
     def get_experience_level(self) -> int:
         """Get experience level"""
@@ -78,6 +99,7 @@ class ClientAvatar:
         self.experience_points = exp
         # Calculate level from experience points
         self.experience_level = max(1, exp // 1000 + 1)
+        self.mark_dirty(self.SECTION_HEADER)
 
     def get_trophies(self) -> int:
         """Get current trophies"""
@@ -88,6 +110,7 @@ class ClientAvatar:
         self.trophies = trophies
         if trophies > self.high_trophies:
             self.high_trophies = trophies
+        self.mark_dirty(self.SECTION_HEADER)
 
     def get_high_trophies(self) -> int:
         """Get highest trophies achieved"""
@@ -104,6 +127,7 @@ class ClientAvatar:
     def set_coins(self, coins: int) -> None:
         """Set coins"""
         self.coins = max(0, coins)
+        self.mark_dirty(self.SECTION_HEADER)
 
     def add_coins(self, amount: int) -> None:
         """Add coins"""
@@ -116,6 +140,7 @@ class ClientAvatar:
     def set_gems(self, gems: int) -> None:
         """Set gems"""
         self.gems = max(0, gems)
+        self.mark_dirty(self.SECTION_HEADER)
 
     def add_gems(self, amount: int) -> None:
         """Add gems"""
@@ -128,6 +153,7 @@ class ClientAvatar:
     def add_hero(self, hero_data_id: int, hero: Any) -> None:
         """Add hero to collection"""
         self.heroes[hero_data_id] = hero
+        self.mark_dirty(self.SECTION_HEROES)
 
     def get_hero(self, hero_data_id: int) -> Optional[Any]:
         """Get hero by ID"""
@@ -150,11 +176,13 @@ class ClientAvatar:
             self.duo_wins += 1
         elif mode == "team":
             self.team_wins += 1
+        self.mark_dirty(self.SECTION_HEADER)
 
     def unlock_skin(self, skin_id: int) -> bool:
         """Unlock skin"""
         if skin_id not in self.unlocked_skins:
             self.unlocked_skins.append(skin_id)
+            self.mark_dirty()
             return True
         return False
 
@@ -171,59 +199,47 @@ class ClientAvatar:
         return total_power / len(self.heroes)
 
     def encode(self, stream) -> None:
-        """Encode avatar to stream"""
+        """Encode avatar to stream, reusing the sections encoded by a previous send"""
+        self.encode_cache.write(stream, self.SECTION_HEADER, self._encode_header)
+        self.encode_cache.write(stream, self.SECTION_HEROES, self._encode_heroes)
+
+    def _encode_header(self, stream) -> None:
+        """Encode account info, progression, resources and statistics"""
         # Account info
         stream.write_v_long(self.account_id)
         stream.write_string(self.name)
-        stream.write_v_int(self.name_color_id)
-
-        # Experience and trophies
-        stream.write_v_int(self.experience_points)
-        stream.write_v_int(self.experience_level)
-        stream.write_v_int(self.trophies)
-        stream.write_v_int(self.high_trophies)
-
-        # Resources
-        stream.write_v_int(self.coins)
-        stream.write_v_int(self.gems)
-        stream.write_v_int(self.tokens)
-        stream.write_v_int(self.star_tokens)
-
-        # Statistics
-        stream.write_v_int(self.solo_wins)
-        stream.write_v_int(self.duo_wins)
-        stream.write_v_int(self.team_wins)
-
-        # Heroes
+        stream.write_v_ints((
+            self.name_color_id,
+            # Experience and trophies
+            self.experience_points, self.experience_level, self.trophies, self.high_trophies,
+            # Resources
+            self.coins, self.gems, self.tokens, self.star_tokens,
+            # Statistics
+            self.solo_wins, self.duo_wins, self.team_wins,
+        ))
+
+    def _encode_heroes(self, stream) -> None:
+        """Encode heroes in one pass"""
         stream.write_v_int(len(self.heroes))
+        values = []
         for hero_id, hero in self.heroes.items():
-            stream.write_v_int(hero_id)
-            if hasattr(hero, 'encode'):
-                hero.encode(stream)
+            values.append(hero_id)
+            if hasattr(hero, 'get_encoding_values'):
+                values.extend(hero.get_encoding_values())
+        stream.write_v_ints(values)
 
     def decode(self, stream) -> None:
         """Decode avatar from stream"""
         # Account info
         self.account_id = stream.read_v_long()
         self.name = stream.read_string()
-        self.name_color_id = stream.read_v_int()
-
-        # Experience and trophies
-        self.experience_points = stream.read_v_int()
-        self.experience_level = stream.read_v_int()
-        self.trophies = stream.read_v_int()
-        self.high_trophies = stream.read_v_int()
-
-        # Resources
-        self.coins = stream.read_v_int()
-        self.gems = stream.read_v_int()
-        self.tokens = stream.read_v_int()
-        self.star_tokens = stream.read_v_int()
-
-        # Statistics
-        self.solo_wins = stream.read_v_int()
-        self.duo_wins = stream.read_v_int()
-        self.team_wins = stream.read_v_int()
+        (self.name_color_id,
+         # Experience and trophies
+         self.experience_points, self.experience_level, self.trophies, self.high_trophies,
+         # Resources
+         self.coins, self.gems, self.tokens, self.star_tokens,
+         # Statistics
+         self.solo_wins, self.duo_wins, self.team_wins) = stream.read_v_ints(12)
 
         # Heroes (simplified)
         hero_count = stream.read_v_int()
@@ -231,6 +247,8 @@ class ClientAvatar:
             hero_id = stream.read_v_int()
             # Skip hero data for now
 
+        self.encode_cache.invalidate()
+
     def __str__(self) -> str:
         """String representation"""
         return (f"ClientAvatar('{self.name}', level={self.experience_level}, "
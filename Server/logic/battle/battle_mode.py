@@ -4,7 +4,8 @@ Battle mode enumeration and utilities
 """
 
 from enum import IntEnum
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional
+from .object.game_object_manager import GameObjectManager
 
 class BattleModeType(IntEnum):
     """Battle mode types"""
@@ -22,6 +23,39 @@ class BattleModeType(IntEnum):
     DUELS = 11
     WIPE_OUT = 12
 
+class BattleResult:
+    """Outcome of a finished battle for one account; the battle may run on a copy in a worker process,
+    so the master applies it to the live account"""
+
+    __slots__ = ("account_id", "trophies", "coins", "victory", "mode", "damage_dealt")
+
+    def __init__(self, account_id: int, trophies: int = 0, coins: int = 0, victory: bool = False,
+                 mode: str = "solo", damage_dealt: int = 0):
+        """Initialize battle result"""
+        self.account_id = account_id
+        self.trophies = trophies
+        self.coins = coins
+        self.victory = victory
+        self.mode = mode
+        self.damage_dealt = damage_dealt
+
+    def apply(self, account: Any) -> None:
+        """Apply the outcome to an account's avatar and home"""
+        avatar = account.avatar
+        home = account.home
+        if self.trophies:
+            avatar.add_trophies(self.trophies)
+            home.set_trophies(home.get_trophies() + self.trophies)
+        if self.coins:
+            avatar.add_coins(self.coins)
+        if self.victory:
+            avatar.add_victory(self.mode)
+        home.add_battle_result(self.victory, self.damage_dealt)
+
+    def __repr__(self) -> str:
+        """String representation"""
+        return f"BattleResult(account_id={self.account_id}, trophies={self.trophies}, victory={self.victory})"
+
 class BattleMode:
     """Battle mode management class"""
 
@@ -118,6 +152,38 @@ class BattleMode:
         self.team_size = self.get_team_size(mode_type)
         self.max_players = self.get_max_players(mode_type)
 
+        # Simulation state stepped by BattleScheduler once the battle is started
+        self.id = 0
+        self.game_object_manager = GameObjectManager()
+        self.is_started = False
+        self.is_game_over = False
+        self.ticks = 0
+        self.results: List[BattleResult] = []
+
+    def start(self) -> None:
+        """Mark the battle as started; it is ticked from now on"""
+        self.is_started = True
+
+    def tick(self, delta_time: float) -> None:
+        """Advance the battle by one fixed step"""
+        if not self.is_started or self.is_game_over:
+            return
+        self.game_object_manager.update(delta_time)
+        self.ticks += 1
+
+    def add_result(self, result: BattleResult) -> None:
+        """Record the outcome for one player's account"""
+        self.results.append(result)
+
+    def get_results(self) -> List[BattleResult]:
+        """Outcomes recorded so far"""
+        return self.results
+
+    def end(self) -> None:
+        """Finish the battle; the scheduler removes it after the current tick and its results are
+        applied to the players' accounts"""
+        self.is_game_over = True
+
     def __str__(self) -> str:
         """String representation"""
         return f"BattleMode({self.mode_name})"
@@ -22,6 +22,13 @@ class BuffType(IntEnum):
 class Buff:
     """Buff component for temporary battle effects"""
 
+    __slots__ = (
+        "buff_type", "duration", "remaining_time", "strength", "source_id",
+        "is_stackable", "max_stacks", "current_stacks", "is_active",
+        "damage_multiplier", "speed_multiplier", "health_per_second",
+        "damage_reduction", "name", "description", "icon_id",
+    )
+
     def __init__(self, buff_type: BuffType, duration: float):
         """Initialize buff"""
         self.buff_type = buff_type
@@ -20,6 +20,13 @@ class AreaEffectType(IntEnum):
 class AreaEffect(GameObject):
     """Area effect class for battle area-based effects"""
 
+    __slots__ = (
+        "effect_type", "radius", "strength", "duration", "remaining_time",
+        "tick_interval", "time_since_last_tick", "affected_targets", "max_targets",
+        "visual_scale", "particle_effect_id", "owner_id", "team_id", "affects_allies",
+        "affects_enemies", "affects_neutrals",
+    )
+
     def __init__(self):
         """Initialize area effect"""
         super().__init__()
@@ -0,0 +1,281 @@
+"""
+Broadphase for battle objects
+A uniform grid keyed by one integer per cell files every object of a battle for radius and
+nearest-object queries, and a per-tick pass over a second grid, sized from the largest
+collision radius, finds every colliding pair at once
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from .game_object import GameObject
+
+# Cell (x, y) has key (x << KEY_SHIFT) + y, unique while |y| < 2 ** (KEY_SHIFT - 1)
+KEY_SHIFT = 24
+
+# Neighbours after a cell in key order, so each pair of cells is compared once
+_FORWARD = ((1 << KEY_SHIFT) - 1, 1 << KEY_SHIFT, (1 << KEY_SHIFT) + 1, 1)
+
+# Colliders from which find_pairs_arrays is faster than find_pairs
+ARRAY_PAIRS_MIN = 64
+
+ColliderEntry = Tuple[float, float, float, GameObject]
+
+
+class UniformGrid:
+    """Objects filed by the cell their position falls in"""
+
+    def __init__(self, cell_size: float):
+        """Create an empty grid"""
+        self.cell_size = cell_size
+        self.cells: Dict[int, Dict[int, GameObject]] = {}
+        self.keys: Dict[int, int] = {}  # object id -> key of the cell holding it
+
+    def __len__(self) -> int:
+        """Number of filed objects"""
+        return len(self.keys)
+
+    def key_of(self, x: float, y: float) -> int:
+        """Key of the cell containing a position"""
+        size = self.cell_size
+        return (int(x // size) << KEY_SHIFT) + int(y // size)
+
+    def insert(self, obj: GameObject) -> None:
+        """File an object under its current position"""
+        key = self.key_of(obj.x, obj.y)
+        self.keys[obj.object_id] = key
+        cell = self.cells.get(key)
+        if cell is None:
+            self.cells[key] = {obj.object_id: obj}
+        else:
+            cell[obj.object_id] = obj
+
+    def remove(self, obj: GameObject) -> None:
+        """Take an object out of the cell it was filed in"""
+        key = self.keys.pop(obj.object_id, None)
+        if key is None:
+            return
+        cell = self.cells[key]
+        del cell[obj.object_id]
+        if not cell:
+            del self.cells[key]
+
+    def move(self, obj: GameObject, key: int) -> None:
+        """Refile an object under the cell key"""
+        old_key = self.keys[obj.object_id]
+        if old_key == key:
+            return
+        cell = self.cells[old_key]
+        del cell[obj.object_id]
+        if not cell:
+            del self.cells[old_key]
+
+        self.keys[obj.object_id] = key
+        cell = self.cells.get(key)
+        if cell is None:
+            self.cells[key] = {obj.object_id: obj}
+        else:
+            cell[obj.object_id] = obj
+
+    def refresh(self, obj: GameObject) -> None:
+        """Refile an object if it left its cell"""
+        key = self.key_of(obj.x, obj.y)
+        if key != self.keys[obj.object_id]:
+            self.move(obj, key)
+
+    def clear(self) -> None:
+        """Remove every object"""
+        self.cells.clear()
+        self.keys.clear()
+
+    def query_radius(self, x: float, y: float, radius: float) -> List[GameObject]:
+        """Objects whose position is within radius of (x, y)"""
+        size = self.cell_size
+        cells = self.cells
+        radius_squared = radius * radius
+        min_x, max_x = int((x - radius) // size), int((x + radius) // size)
+        min_y, max_y = int((y - radius) // size), int((y + radius) // size)
+
+        # A radius covering more cells than are occupied is cheaper to answer from the occupied ones
+        if (max_x - min_x + 1) * (max_y - min_y + 1) > len(cells):
+            candidates = list(cells.values())
+        else:
+            candidates = []
+            for cell_x in range(min_x, max_x + 1):
+                base = cell_x << KEY_SHIFT
+                for key in range(base + min_y, base + max_y + 1):
+                    cell = cells.get(key)
+                    if cell is not None:
+                        candidates.append(cell)
+
+        result = []
+        for cell in candidates:
+            for obj in cell.values():
+                dx = obj.x - x
+                dy = obj.y - y
+                if dx * dx + dy * dy <= radius_squared:
+                    result.append(obj)
+        return result
+
+    def nearest(self, x: float, y: float, object_type: Optional[int] = None) -> Optional[GameObject]:
+        """Closest active object (of object_type when given), searching rings of cells outwards
+        from the one containing (x, y)"""
+        cells = self.cells
+        if not cells:
+            return None
+        size = self.cell_size
+        center_x = int(x // size)
+        center_y = int(y // size)
+        nearest = None
+        nearest_squared = float('inf')
+
+        ring = 0
+        probed = 0
+        while probed <= 2 * len(cells) + 8:
+            ring_cells = [cells[key] for key in _ring_keys(center_x, center_y, ring) if key in cells]
+            nearest, nearest_squared = _closest(ring_cells, x, y, object_type, nearest, nearest_squared)
+
+            # Cells past this ring are at least ring cells away from (x, y)
+            reach = ring * size
+            if nearest is not None and nearest_squared <= reach * reach:
+                return nearest
+            probed += 8 * ring or 1
+            ring += 1
+
+        # Mostly empty rings: finish with the occupied cells instead
+        return _closest(cells.values(), x, y, object_type, nearest, nearest_squared)[0]
+
+
+def _closest(cells: Iterable[Dict[int, GameObject]], x: float, y: float, object_type: Optional[int],
+             nearest: Optional[GameObject], nearest_squared: float) -> Tuple[Optional[GameObject], float]:
+    """Closest active object in cells, starting from the best one found so far"""
+    for cell in cells:
+        for obj in cell.values():
+            if not (obj.is_active and obj.is_alive):
+                continue
+            if object_type is not None and obj.object_type != object_type:
+                continue
+            dx = obj.x - x
+            dy = obj.y - y
+            distance_squared = dx * dx + dy * dy
+            if distance_squared < nearest_squared:
+                nearest_squared = distance_squared
+                nearest = obj
+    return nearest, nearest_squared
+
+
+def _ring_keys(center_x: int, center_y: int, ring: int) -> Iterable[int]:
+    """Keys of the cells exactly ring cells from the center cell"""
+    if ring == 0:
+        yield (center_x << KEY_SHIFT) + center_y
+        return
+    low_y = center_y - ring
+    high_y = center_y + ring
+    for cell_x in range(center_x - ring, center_x + ring + 1):
+        base = cell_x << KEY_SHIFT
+        yield base + low_y
+        yield base + high_y
+    for cell_x in (center_x - ring, center_x + ring):
+        base = cell_x << KEY_SHIFT
+        yield from range(base + low_y + 1, base + high_y)
+
+
+def collider_entries(objects: Iterable[GameObject]) -> List[ColliderEntry]:
+    """Position and radius of every object that can collide right now"""
+    return [(obj.x, obj.y, obj.collision_radius, obj) for obj in objects
+            if obj.can_collide and obj.is_active and obj.is_alive]
+
+
+def find_pairs(entries: List[ColliderEntry], max_radius: float) -> List[Tuple[GameObject, GameObject]]:
+    """Every pair of colliding entries, each once, in one pass; cells are one largest collision
+    diameter wide so partners are always in the same or a neighbouring cell"""
+    if len(entries) < 2:
+        return []
+    size = max(2.0 * max_radius, 1.0)
+
+    cells: Dict[int, List[ColliderEntry]] = {}
+    for entry in entries:
+        key = (int(entry[0] // size) << KEY_SHIFT) + int(entry[1] // size)
+        cell = cells.get(key)
+        if cell is None:
+            cells[key] = [entry]
+        else:
+            cell.append(entry)
+
+    pairs = []
+    for key, cell in cells.items():
+        count = len(cell)
+        for index in range(count - 1):
+            x, y, radius, obj = cell[index]
+            for other_index in range(index + 1, count):
+                other_x, other_y, other_radius, other = cell[other_index]
+                dx = x - other_x
+                dy = y - other_y
+                # Same expression as GameObject.is_colliding_with
+                if (dx * dx + dy * dy) ** 0.5 <= radius + other_radius:
+                    pairs.append((obj, other))
+
+        for offset in _FORWARD:
+            neighbour = cells.get(key + offset)
+            if neighbour is None:
+                continue
+            for x, y, radius, obj in cell:
+                for other_x, other_y, other_radius, other in neighbour:
+                    dx = x - other_x
+                    dy = y - other_y
+                    if (dx * dx + dy * dy) ** 0.5 <= radius + other_radius:
+                        pairs.append((obj, other))
+    return pairs
+
+
+def find_pairs_arrays(x: Any, y: Any, radius: Any, objects: List[GameObject]) -> List[Tuple[GameObject, GameObject]]:
+    """find_pairs over NumPy columns of colliders: the same cells and neighbours, with every
+    candidate pair listed and tested at once"""
+    if len(objects) < ARRAY_PAIRS_MIN:
+        # Below this the per-call cost of NumPy outweighs the Python loops
+        entries = list(zip(x.tolist(), y.tolist(), radius.tolist(), objects))
+        return find_pairs(entries, max((entry[2] for entry in entries), default=0.0))
+    size = max(2.0 * float(radius.max()), 1.0)
+    keys = np.left_shift(np.floor_divide(x, size).astype("i8"), KEY_SHIFT) + np.floor_divide(y, size).astype("i8")
+    order = np.argsort(keys, kind="stable")
+    cell_keys, starts, counts = np.unique(keys[order], return_index=True, return_counts=True)
+
+    firsts, seconds = [], []
+    for offset in (0,) + _FORWARD:
+        if offset == 0:
+            cells = neighbours = np.arange(len(cell_keys))
+        else:
+            wanted = cell_keys + offset
+            neighbours = np.searchsorted(cell_keys, wanted)
+            found = neighbours < len(cell_keys)
+            found[found] = cell_keys[neighbours[found]] == wanted[found]
+            cells = np.flatnonzero(found)
+            neighbours = neighbours[found]
+
+        # Every member of a cell against every member of its neighbour
+        sizes = counts[cells] * counts[neighbours]
+        total = int(sizes.sum())
+        if total == 0:
+            continue
+        pair = np.repeat(np.arange(len(cells)), sizes)
+        local = np.arange(total) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        width = counts[neighbours][pair]
+        first = starts[cells][pair] + local // width
+        second = starts[neighbours][pair] + local % width
+        if offset == 0:
+            keep = first < second
+            first, second = first[keep], second[keep]
+        firsts.append(first)
+        seconds.append(second)
+
+    first = order[np.concatenate(firsts)]
+    second = order[np.concatenate(seconds)]
+    dx = x[first] - x[second]
+    dy = y[first] - y[second]
+    hit = np.sqrt(dx * dx + dy * dy) <= radius[first] + radius[second]
+    return [(objects[index], objects[other]) for index, other in zip(first[hit].tolist(), second[hit].tolist())]
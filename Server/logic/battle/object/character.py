@@ -19,6 +19,16 @@ class CharacterState(IntEnum):
 class Character(GameObject):
     """Character class for battle characters/brawlers"""
 
+    __slots__ = (
+        "character_data_id", "level", "state", "max_health", "current_health", "damage",
+        "movement_speed", "attack_range", "attack_speed", "last_attack_time",
+        "attack_cooldown", "respawn_time", "stun_remaining", "super_charge",
+        "super_charge_max", "has_super_ready", "equipped_skin_id", "equipped_gadget_id",
+        "equipped_star_power_id", "equipped_gear_ids", "kills", "assists",
+        "damage_dealt", "damage_taken", "healing_done", "target_x", "target_y",
+        "is_moving_to_target", "movement_direction_x", "movement_direction_y",
+    )
+
     def __init__(self):
         """Initialize character"""
         super().__init__()
@@ -237,10 +247,6 @@ class Character(GameObject):
             self.stun_remaining = duration
             self.stop_movement()
 
-    def is_alive(self) -> bool:
-        """Check if character is alive"""
-        return self.state != CharacterState.DEAD
-
     def is_stunned(self) -> bool:
         """Check if character is stunned"""
         return self.state == CharacterState.STUNNED
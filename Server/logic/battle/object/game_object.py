@@ -8,6 +8,14 @@ from typing import Optional, Tuple
 class GameObject:
     """Base game object class for battle objects"""
 
+    # _store and _row are only set while an ObjectArrayStore holds the object
+    __slots__ = (
+        "object_id", "x", "y", "rotation", "is_alive", "is_active", "creation_time",
+        "age", "scale_x", "scale_y", "alpha", "z_order", "velocity_x", "velocity_y",
+        "acceleration_x", "acceleration_y", "mass", "friction", "collision_radius",
+        "can_collide", "is_solid", "object_type", "data_id", "_store", "_row",
+    )
+
     def __init__(self):
         """Initialize game object"""
         self.object_id = 0
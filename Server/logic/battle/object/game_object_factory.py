@@ -3,7 +3,8 @@ Python conversion of Supercell.Laser.Logic.Battle.Objects.GameObjectFactory.cs
 Factory class for creating game objects
 """
 
-from typing import Dict, Optional, Type, Any
+import threading
+from typing import Dict, List, Optional, Type, Any
 from .game_object import GameObject
 from .character import Character
 from .projectile import Projectile
@@ -26,6 +27,18 @@ class GameObjectFactory:
     _object_types: Dict[int, Type[GameObject]] = {}
     _next_object_id = 1
 
+    # Free lists of dead objects waiting to be reused, per type; shared by the battle tick threads,
+    # so the lists, the object ID counter and the stats are only touched under _lock
+    POOLED_TYPES = (GameObjectType.PROJECTILE,)
+    POOL_LIMIT = 512
+    _pools: Dict[int, List[GameObject]] = {}
+    _lock = threading.Lock()
+
+    # Stats
+    allocated: int = 0
+    reused: int = 0
+    recycled: int = 0
+
     @classmethod
     def initialize(cls) -> None:
         """Initialize factory with object types"""
@@ -44,9 +57,22 @@ class GameObjectFactory:
         if object_type not in cls._object_types:
             return None
 
-        object_class = cls._object_types[object_type]
-        obj = object_class()
-        obj.object_id = cls._get_next_object_id()
+        with cls._lock:
+            pool = cls._pools.get(object_type)
+            obj = pool.pop() if pool else None
+            if obj is None:
+                cls.allocated += 1
+            else:
+                cls.reused += 1
+            object_id = cls._next_object_id
+            cls._next_object_id += 1
+
+        if obj is None:
+            obj = cls._object_types[object_type]()
+        else:
+            # A recycled instance, reset to a fresh state
+            obj.__init__()
+        obj.object_id = object_id
         obj.object_type = object_type
         obj.data_id = data_id
 
@@ -178,17 +204,51 @@ class GameObjectFactory:
 
         return clone
 
+    @classmethod
+    def recycle(cls, obj: GameObject) -> bool:
+        """Keep a dead object for reuse by create_object; only pooled types whose class is still the
+        registered one are kept, and the caller must not use the object afterwards"""
+        if obj.object_type not in cls.POOLED_TYPES or type(obj) is not cls._object_types.get(obj.object_type):
+            return False
+        with cls._lock:
+            pool = cls._pools.setdefault(obj.object_type, [])
+            if len(pool) >= cls.POOL_LIMIT:
+                return False
+            pool.append(obj)
+            cls.recycled += 1
+        return True
+
+    @classmethod
+    def get_pool_stats(cls) -> Dict[str, int]:
+        """Instances built, reused and recycled, and how many are waiting in the free lists"""
+        with cls._lock:
+            return {
+                "allocated": cls.allocated,
+                "reused": cls.reused,
+                "recycled": cls.recycled,
+                "pooled": sum(len(pool) for pool in cls._pools.values()),
+            }
+
+    @classmethod
+    def reset_pool(cls) -> None:
+        """Drop the free lists and stats"""
+        with cls._lock:
+            cls._pools = {}
+            cls.allocated = cls.reused = cls.recycled = 0
+
     @classmethod
     def _get_next_object_id(cls) -> int:
         """Get next unique object ID"""
-        object_id = cls._next_object_id
-        cls._next_object_id += 1
+        with cls._lock:
+            object_id = cls._next_object_id
+            cls._next_object_id += 1
         return object_id
 
     @classmethod
     def reset_object_ids(cls) -> None:
         """Reset object ID counter"""
-        cls._next_object_id = 1
+        with cls._lock:
+            cls._next_object_id = 1
 
     @classmethod
     def get_object_type_name(cls, object_type: int) -> str:
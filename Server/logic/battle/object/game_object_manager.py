@@ -3,26 +3,40 @@ Python conversion of Supercell.Laser.Logic.Battle.Objects.GameObjectManager.cs
 Manager class for game objects in battle
 """
 
-from typing import Dict, List, Optional, Set, Callable
+from typing import Dict, List, Optional, Set, Callable, Tuple
 from .game_object import GameObject
 from .game_object_factory import GameObjectFactory
 from .character import Character
 from .projectile import Projectile
 from .area_effect import AreaEffect
+from .broadphase import UniformGrid, collider_entries, find_pairs, find_pairs_arrays
+from .object_store import NUMPY_AVAILABLE, ObjectArrayStore
 
 class GameObjectManager:
     """Manager class for game objects in battle"""
 
-    def __init__(self):
+    # "objects" updates each object on its own, "numpy" steps them together in an ObjectArrayStore
+    default_backend = "objects"
+
+    def __init__(self, backend: Optional[str] = None):
         """Initialize game object manager"""
         self.objects: Dict[int, GameObject] = {}
         self.active_objects: Set[int] = set()
         self.objects_to_remove: Set[int] = set()
         self.objects_by_type: Dict[int, Set[int]] = {}
 
-        # Spatial optimization (simple grid)
+        # Spatial optimization (uniform grid, one integer key per cell)
         self.grid_size = 200.0
-        self.spatial_grid: Dict[tuple, Set[int]] = {}
+        self.grid = UniformGrid(self.grid_size)
+
+        # Colliding pairs, found at most once per update, and the largest collision radius
+        self.collision_pairs: Optional[List[Tuple[GameObject, GameObject]]] = None
+        self.max_collision_radius = 0.0
+
+        # Array backend; objects it cannot step are updated one by one
+        self.store: Optional[ObjectArrayStore] = None
+        self.scalar_objects: Set[int] = set()
+        self._init_store(backend or GameObjectManager.default_backend)
 
         # Update callbacks
         self.update_callbacks: List[Callable[[GameObject, float], None]] = []
@@ -46,7 +60,16 @@ class GameObjectManager:
         self.objects_by_type[obj_type].add(obj.object_id)
 
         # Add to spatial grid
-        self._add_to_spatial_grid(obj)
+        self.grid.insert(obj)
+        if obj.collision_radius > self.max_collision_radius:
+            self.max_collision_radius = obj.collision_radius
+        self.collision_pairs = None
+
+        if self.store is not None:
+            if self.store.accepts(obj):
+                self.store.bind(obj)
+            else:
+                self.scalar_objects.add(obj.object_id)
 
         self.total_objects_created += 1
         return True
@@ -59,7 +82,8 @@ class GameObjectManager:
         obj = self.objects[object_id]
 
         # Remove from spatial grid
-        self._remove_from_spatial_grid(obj)
+        self.grid.remove(obj)
+        self.collision_pairs = None
 
         # Remove from type mapping
         if obj.object_type in self.objects_by_type:
@@ -69,6 +93,12 @@ class GameObjectManager:
         self.active_objects.discard(object_id)
         del self.objects[object_id]
 
+        # Hand the object back with its own attributes
+        if self.store is not None:
+            if getattr(obj, '_store', None) is self.store:
+                self.store.unbind(obj)
+            self.scalar_objects.discard(object_id)
+
         self.total_objects_destroyed += 1
         return True
 
@@ -107,66 +137,65 @@ class GameObjectManager:
 
     def get_objects_in_radius(self, x: float, y: float, radius: float) -> List[GameObject]:
         """Get all objects within radius of position"""
-        result = []
-        radius_squared = radius * radius
-
-        # Use spatial grid for optimization
-        grid_cells = self._get_grid_cells_in_radius(x, y, radius)
-        candidate_objects = set()
-
-        for cell in grid_cells:
-            if cell in self.spatial_grid:
-                candidate_objects.update(self.spatial_grid[cell])
-
-        # Check distance for candidates
-        for obj_id in candidate_objects:
-            if obj_id in self.objects:
-                obj = self.objects[obj_id]
-                dx = obj.x - x
-                dy = obj.y - y
-                distance_squared = dx * dx + dy * dy
-
-                if distance_squared <= radius_squared:
-                    result.append(obj)
-
-        return result
+        return self.grid.query_radius(x, y, radius)
 
     def get_nearest_object(self, x: float, y: float, object_type: int = None) -> Optional[GameObject]:
         """Get nearest object to position"""
-        nearest = None
-        nearest_distance = float('inf')
-
-        objects_to_check = (self.get_objects_by_type(object_type) 
-                           if object_type is not None 
-                           else self.objects.values())
+        if object_type is not None and len(self.objects_by_type.get(object_type, ())) * 8 < len(self.objects):
+            # A rare type is cheaper to scan than to search the grid for
+            nearest = None
+            nearest_distance = float('inf')
+            for obj in self.get_objects_by_type(object_type):
+                if not obj.is_object_active():
+                    continue
 
-        for obj in objects_to_check:
-            if not obj.is_object_active():
-                continue
+                distance = obj.distance_to_position(x, y)
+                if distance < nearest_distance:
+                    nearest_distance = distance
+                    nearest = obj
 
-            distance = obj.distance_to_position(x, y)
-            if distance < nearest_distance:
-                nearest_distance = distance
-                nearest = obj
+            return nearest
 
-        return nearest
+        return self.grid.nearest(x, y, object_type)
 
     def find_collisions(self, obj: GameObject) -> List[GameObject]:
         """Find all objects colliding with given object"""
         if not obj.can_object_collide():
             return []
 
+        # A partner is at most this object's radius plus the largest radius away
+        reach = obj.collision_radius + max(obj.collision_radius, self.max_collision_radius)
         collisions = []
-        nearby_objects = self.get_objects_in_radius(obj.x, obj.y, obj.collision_radius * 2)
-
-        for other in nearby_objects:
+        for other in self.grid.query_radius(obj.x, obj.y, reach):
             if other.object_id != obj.object_id and obj.is_colliding_with(other):
                 collisions.append(other)
 
         return collisions
 
+    def find_colliding_pairs(self) -> List[Tuple[GameObject, GameObject]]:
+        """Find every pair of colliding objects, each once, in one pass over the battle"""
+        if self.store is not None:
+            x, y, radius, objects = self.store.collider_arrays(
+                collider_entries(self.objects[obj_id] for obj_id in self.scalar_objects))
+            self.max_collision_radius = float(radius.max()) if objects else 0.0
+            return find_pairs_arrays(x, y, radius, objects)
+
+        entries = collider_entries(self.objects.values())
+        self.max_collision_radius = max((entry[2] for entry in entries), default=0.0)
+        return find_pairs(entries, self.max_collision_radius)
+
+    def get_collision_pairs(self) -> List[Tuple[GameObject, GameObject]]:
+        """Colliding pairs of the current tick; the first call after an update finds them"""
+        if self.collision_pairs is None:
+            self.collision_pairs = self.find_colliding_pairs()
+        return self.collision_pairs
+
     def update(self, delta_time: float) -> None:
         """Update all game objects"""
+        if self.store is not None:
+            self._update_store(delta_time)
+            return
+
         # Update objects
         for obj_id in list(self.active_objects):
             if obj_id not in self.objects:
@@ -174,9 +203,6 @@ class GameObjectManager:
 
             obj = self.objects[obj_id]
 
-            # Update spatial grid position
-            old_cell = self._get_grid_cell(obj.x, obj.y)
-
             # Update object
             obj.update(delta_time)
 
@@ -185,26 +211,90 @@ class GameObjectManager:
                 callback(obj, delta_time)
 
             # Update spatial grid if position changed
-            new_cell = self._get_grid_cell(obj.x, obj.y)
-            if old_cell != new_cell:
-                self._update_spatial_grid(obj, old_cell, new_cell)
+            self.grid.refresh(obj)
 
             # Mark for removal if dead
             if not obj.is_object_alive():
                 self.objects_to_remove.add(obj_id)
 
         # Remove dead objects
+        self._remove_dead()
+        self.collision_pairs = None
+
+    def _update_store(self, delta_time: float) -> None:
+        """Update with the array backend: one step for every stored object, then the rest one by one"""
+        moved, dead = self.store.step(delta_time, self.grid.cell_size)
+        for obj, key in moved:
+            self.grid.move(obj, key)
+
+        callbacks = self.update_callbacks
+        if callbacks:
+            for obj in self.store.objects[:self.store.size]:
+                if obj is not None:
+                    for callback in callbacks:
+                        callback(obj, delta_time)
+
+        for obj_id in list(self.scalar_objects):
+            obj = self.objects[obj_id]
+            obj.update(delta_time)
+            for callback in callbacks:
+                callback(obj, delta_time)
+            self.grid.refresh(obj)
+            if not obj.is_object_alive():
+                self.objects_to_remove.add(obj_id)
+
+        for obj in dead:
+            self.objects_to_remove.add(obj.object_id)
+
+        self._remove_dead()
+        self.collision_pairs = None
+
+    def _remove_dead(self) -> None:
+        """Remove the objects that died this update and hand them to the factory's free lists"""
         for obj_id in self.objects_to_remove:
-            self.remove_object(obj_id)
+            obj = self.objects.get(obj_id)
+            if obj is not None and self.remove_object(obj_id):
+                GameObjectFactory.recycle(obj)
         self.objects_to_remove.clear()
 
+    def _init_store(self, backend: str) -> None:
+        """Create the array store for the numpy backend; without NumPy objects update one by one"""
+        self.backend = backend if backend == "numpy" and NUMPY_AVAILABLE else "objects"
+        if self.backend == "numpy":
+            self.store = ObjectArrayStore()
+
+    def __getstate__(self) -> dict:
+        """Pickle without the store; stored objects pickle as plain ones"""
+        state = self.__dict__.copy()
+        state['store'] = None
+        state['scalar_objects'] = set()
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """Rebuild the store and move the objects back into it"""
+        self.__dict__.update(state)
+        self._init_store(self.backend)
+        if self.store is not None:
+            for obj in self.objects.values():
+                if self.store.accepts(obj):
+                    self.store.bind(obj)
+                else:
+                    self.scalar_objects.add(obj.object_id)
+
     def clear(self) -> None:
         """Clear all objects"""
+        if self.store is not None:
+            for obj in self.objects.values():
+                if getattr(obj, '_store', None) is self.store:
+                    self.store.unbind(obj)
+            self.scalar_objects.clear()
         self.objects.clear()
         self.active_objects.clear()
         self.objects_to_remove.clear()
         self.objects_by_type.clear()
-        self.spatial_grid.clear()
+        self.grid.clear()
+        self.collision_pairs = None
+        self.max_collision_radius = 0.0
         GameObjectFactory.reset_object_ids()
 
     def get_object_count(self) -> int:
@@ -224,53 +314,6 @@ class GameObjectManager:
         if callback in self.update_callbacks:
             self.update_callbacks.remove(callback)
 
-    def _get_grid_cell(self, x: float, y: float) -> tuple:
-        """Get spatial grid cell for position"""
-        cell_x = int(x // self.grid_size)
-        cell_y = int(y // self.grid_size)
-        return (cell_x, cell_y)
-
-    def _add_to_spatial_grid(self, obj: GameObject) -> None:
-        """Add object to spatial grid"""
-        cell = self._get_grid_cell(obj.x, obj.y)
-        if cell not in self.spatial_grid:
-            self.spatial_grid[cell] = set()
-        self.spatial_grid[cell].add(obj.object_id)
-
-    def _remove_from_spatial_grid(self, obj: GameObject) -> None:
-        """Remove object from spatial grid"""
-        cell = self._get_grid_cell(obj.x, obj.y)
-        if cell in self.spatial_grid:
-            self.spatial_grid[cell].discard(obj.object_id)
-            if not self.spatial_grid[cell]:
-                del self.spatial_grid[cell]
-
-    def _update_spatial_grid(self, obj: GameObject, old_cell: tuple, new_cell: tuple) -> None:
-        """Update object position in spatial grid"""
-        # Remove from old cell
-        if old_cell in self.spatial_grid:
-            self.spatial_grid[old_cell].discard(obj.object_id)
-            if not self.spatial_grid[old_cell]:
-                del self.spatial_grid[old_cell]
-
-        # Add to new cell
-        if new_cell not in self.spatial_grid:
-            self.spatial_grid[new_cell] = set()
-        self.spatial_grid[new_cell].add(obj.object_id)
-
-    def _get_grid_cells_in_radius(self, x: float, y: float, radius: float) -> List[tuple]:
-        """Get grid cells within radius"""
-        cells = []
-        cell_radius = int((radius / self.grid_size) + 1)
-        center_x = int(x // self.grid_size)
-        center_y = int(y // self.grid_size)
-
-        for dx in range(-cell_radius, cell_radius + 1):
-            for dy in range(-cell_radius, cell_radius + 1):
-                cells.append((center_x + dx, center_y + dy))
-
-        return cells
-
     def get_statistics(self) -> Dict[str, int]:
         """Get manager statistics"""
         return {
@@ -278,5 +321,7 @@ class GameObjectManager:
             'active_objects': len(self.active_objects),
             'objects_created': self.total_objects_created,
             'objects_destroyed': self.total_objects_destroyed,
-            'spatial_grid_cells': len(self.spatial_grid)
+            'spatial_grid_cells': len(self.grid.cells),
+            'collision_pairs': len(self.collision_pairs or ()),
+            'array_objects': len(self.store) if self.store is not None else 0
         }
@@ -29,6 +29,14 @@ class ItemRarity(IntEnum):
 class Item(GameObject):
     """Item class for battle items and collectibles"""
 
+    __slots__ = (
+        "item_data_id", "item_type", "rarity", "amount", "value", "can_be_collected",
+        "auto_collect_radius", "collection_delay", "expires", "expire_time",
+        "remaining_expire_time", "is_power_up", "power_up_duration",
+        "power_up_strength", "bounce_height", "bounce_speed", "bounce_offset",
+        "visual_y", "glow_intensity", "collected_by_id", "collection_time",
+    )
+
     def __init__(self):
         """Initialize item"""
         super().__init__()
@@ -55,6 +63,7 @@ class Item(GameObject):
         self.bounce_height = 10.0
         self.bounce_speed = 2.0
         self.bounce_offset = 0.0
+        self.visual_y = 0.0
         self.glow_intensity = 1.0
 
         # Collection effects
@@ -0,0 +1,302 @@
+"""
+Structure-of-arrays storage for battle objects
+Positions, velocities, radii, health and alive flags of the objects of one battle live in
+contiguous NumPy arrays, so movement, Character move-to-target and Projectile travel are
+stepped for every object at once, and the grid cell each object is filed under is tracked per row
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from .broadphase import KEY_SHIFT, ColliderEntry
+from .game_object import GameObject
+from .character import Character, CharacterState
+from .projectile import Projectile
+
+KIND_OBJECT = 0
+KIND_CHARACTER = 1
+KIND_PROJECTILE = 2
+
+# Cell key of a row not yet stepped; no position maps to it
+_NO_CELL = -(1 << 62)
+
+# Kind of each class whose update the store reproduces; subclasses keep their own update
+_KINDS = {GameObject: KIND_OBJECT, Character: KIND_CHARACTER, Projectile: KIND_PROJECTILE}
+
+_COMMON_FIELDS = (
+    ("x", "f8"), ("y", "f8"), ("velocity_x", "f8"), ("velocity_y", "f8"),
+    ("acceleration_x", "f8"), ("acceleration_y", "f8"), ("friction", "f8"), ("age", "f8"),
+    ("collision_radius", "f8"), ("can_collide", "?"), ("is_alive", "?"), ("is_active", "?"),
+)
+_KIND_FIELDS = {
+    KIND_OBJECT: (),
+    KIND_CHARACTER: (
+        ("target_x", "f8"), ("target_y", "f8"), ("movement_direction_x", "f8"), ("movement_direction_y", "f8"),
+        ("movement_speed", "f8"), ("is_moving_to_target", "?"), ("state", "i1"), ("stun_remaining", "f8"),
+        ("respawn_time", "f8"), ("current_health", "i8"), ("max_health", "i8"),
+    ),
+    KIND_PROJECTILE: (
+        ("travel_distance", "f8"), ("max_travel_distance", "f8"), ("leaves_trail", "?"),
+    ),
+}
+_ALL_FIELDS = _COMMON_FIELDS + _KIND_FIELDS[KIND_CHARACTER] + _KIND_FIELDS[KIND_PROJECTILE]
+
+
+class _Column:
+    """Attribute of a stored object that reads and writes its row of a column"""
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        return obj._store.columns[self.name][obj._row].item()
+
+    def __set__(self, obj, value) -> None:
+        obj._store.columns[self.name][obj._row] = value
+
+
+class _StateColumn(_Column):
+    """Character state column, read back as CharacterState"""
+
+    __slots__ = ()
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        return CharacterState(obj._store.columns[self.name][obj._row])
+
+
+def _slot_names(cls: type) -> List[str]:
+    """Every slot of cls and its bases"""
+    names = []
+    for klass in cls.__mro__:
+        names.extend(klass.__dict__.get("__slots__", ()))
+    return names
+
+
+def _restore_plain(base: type, state: Dict[str, Any]) -> GameObject:
+    """Unpickle a stored object as a plain instance of its own class"""
+    obj = base.__new__(base)
+    for name, value in state.items():
+        setattr(obj, name, value)
+    return obj
+
+
+def _reduce_plain(obj: GameObject, protocol: int = 2) -> tuple:
+    """Pickle a stored object with its column values, as a plain instance"""
+    state = {}
+    for name in _slot_names(obj._store_base):
+        if name not in ("_store", "_row") and hasattr(obj, name):
+            state[name] = getattr(obj, name)
+    return _restore_plain, (obj._store_base, state)
+
+
+_stored_classes: Dict[type, type] = {}
+
+
+def _stored_class(base: type) -> type:
+    """Subclass of base whose kinematic attributes live in the store; same layout, so an
+    instance can switch between the two with __class__"""
+    stored = _stored_classes.get(base)
+    if stored is None:
+        fields = _COMMON_FIELDS + _KIND_FIELDS[_KINDS[base]]
+        namespace = {name: (_StateColumn(name) if name == "state" else _Column(name)) for name, _ in fields}
+        namespace.update({
+            "__slots__": (),
+            "__module__": base.__module__,
+            "__reduce_ex__": _reduce_plain,
+            "_store_base": base,
+            "_store_fields": tuple(name for name, _ in fields),
+        })
+        stored = _stored_classes[base] = type(base.__name__, (base,), namespace)
+    return stored
+
+
+class ObjectArrayStore:
+    """Rows of per-object columns for the GameObjects, Characters and Projectiles of one battle"""
+
+    def __init__(self, capacity: int = 64):
+        """Allocate empty columns"""
+        if not NUMPY_AVAILABLE:
+            raise ImportError("numpy is required for the array object store")
+        self.capacity = capacity
+        self.size = 0  # rows ever used; rows past it are untouched
+        self.columns: Dict[str, Any] = {name: np.zeros(capacity, dtype) for name, dtype in _ALL_FIELDS}
+        self.kind = np.zeros(capacity, "i1")
+        self.used = np.zeros(capacity, "?")
+        self.cell_keys = np.full(capacity, _NO_CELL, "i8")
+        self.objects: List[Optional[GameObject]] = [None] * capacity
+        self._free_rows: List[int] = []
+
+    @staticmethod
+    def accepts(obj: GameObject) -> bool:
+        """True for objects whose update the store reproduces"""
+        return type(obj) in _KINDS
+
+    def __len__(self) -> int:
+        """Number of stored objects"""
+        return self.size - len(self._free_rows)
+
+    def bind(self, obj: GameObject) -> None:
+        """Move an object's kinematic attributes into a row"""
+        base = type(obj)
+        stored = _stored_class(base)
+        row = self._free_rows.pop() if self._free_rows else self._next_row()
+
+        columns = self.columns
+        for name in stored._store_fields:
+            columns[name][row] = getattr(obj, name)
+        self.kind[row] = _KINDS[base]
+        self.used[row] = True
+        self.cell_keys[row] = _NO_CELL
+        self.objects[row] = obj
+
+        obj._store = self
+        obj._row = row
+        obj.__class__ = stored
+
+    def unbind(self, obj: GameObject) -> None:
+        """Give an object its attributes back and free its row"""
+        row = obj._row
+        values = [(name, getattr(obj, name)) for name in obj._store_fields]
+        obj.__class__ = obj._store_base
+        del obj._store, obj._row
+        for name, value in values:
+            setattr(obj, name, value)
+
+        self.used[row] = False
+        self.objects[row] = None
+        self._free_rows.append(row)
+
+    def _next_row(self) -> int:
+        """Append a row, doubling the columns when they are full"""
+        if self.size == self.capacity:
+            self.capacity *= 2
+            for name, column in self.columns.items():
+                self.columns[name] = np.resize(column, self.capacity)
+            self.kind = np.resize(self.kind, self.capacity)
+            self.used = np.resize(self.used, self.capacity)
+            self.used[self.size:] = False
+            self.cell_keys = np.resize(self.cell_keys, self.capacity)
+            self.objects.extend([None] * (self.capacity - self.size))
+        row = self.size
+        self.size += 1
+        return row
+
+    def step(self, delta_time: float, cell_size: float) -> Tuple[List[Tuple[GameObject, int]], List[GameObject]]:
+        """Advance every stored object by delta_time exactly as their update methods would, returns
+        the objects whose grid cell key changed (with the new key) and the objects that are dead"""
+        n = self.size
+        if n == 0:
+            return [], []
+        c = {name: column[:n] for name, column in self.columns.items()}
+        used = self.used[:n]
+        kind = self.kind[:n]
+        x, y = c["x"], c["y"]
+        old_x = x.copy()
+        old_y = y.copy()
+
+        # GameObject.update, for every active object
+        active = used & c["is_active"] & c["is_alive"]
+        velocity_x, velocity_y, friction = c["velocity_x"], c["velocity_y"], c["friction"]
+        c["age"][active] += delta_time
+        velocity_x[active] = (velocity_x[active] + c["acceleration_x"][active] * delta_time) * friction[active]
+        velocity_y[active] = (velocity_y[active] + c["acceleration_y"][active] * delta_time) * friction[active]
+        x[active] += velocity_x[active] * delta_time
+        y[active] += velocity_y[active] * delta_time
+
+        characters = used & (kind == KIND_CHARACTER)
+        if characters.any():
+            self._step_characters(c, characters, delta_time)
+
+        projectiles = active & (kind == KIND_PROJECTILE)
+        if projectiles.any():
+            self._step_projectiles(c, projectiles, old_x, old_y)
+
+        # Only objects whose cell key changed since the last step go back to Python
+        cell_x = np.floor_divide(x, cell_size).astype("i8")
+        cell_y = np.floor_divide(y, cell_size).astype("i8")
+        keys = np.left_shift(cell_x, KEY_SHIFT) + cell_y
+        cell_keys = self.cell_keys[:n]
+        changed = np.flatnonzero(used & (keys != cell_keys))
+        cell_keys[changed] = keys[changed]
+        objects = self.objects
+        moved = [(objects[row], key) for row, key in zip(changed.tolist(), keys[changed].tolist())]
+        dead = [objects[row] for row in np.flatnonzero(used & ~c["is_alive"]).tolist()]
+        return moved, dead
+
+    def collider_arrays(self, extra: List[ColliderEntry]) -> Tuple[Any, Any, Any, List[GameObject]]:
+        """Positions, radii and objects of every stored object that can collide right now,
+        followed by the extra entries of objects outside the store"""
+        n = self.size
+        c = self.columns
+        rows = np.flatnonzero(self.used[:n] & c["can_collide"][:n] & c["is_active"][:n] & c["is_alive"][:n])
+        x, y, radius = c["x"][rows], c["y"][rows], c["collision_radius"][rows]
+        objects = [self.objects[row] for row in rows.tolist()]
+        if extra:
+            x = np.concatenate((x, [entry[0] for entry in extra]))
+            y = np.concatenate((y, [entry[1] for entry in extra]))
+            radius = np.concatenate((radius, [entry[2] for entry in extra]))
+            objects.extend(entry[3] for entry in extra)
+        return x, y, radius, objects
+
+    @staticmethod
+    def _step_characters(c: Dict[str, Any], characters: Any, delta_time: float) -> None:
+        """Character.update after the base step: stun and respawn timers, then move-to-target"""
+        state = c["state"]
+        stunned = characters & (state == CharacterState.STUNNED)
+        c["stun_remaining"][stunned] -= delta_time
+        state[stunned & (c["stun_remaining"] <= 0)] = CharacterState.IDLE
+
+        respawning = characters & (state == CharacterState.DEAD) & (c["respawn_time"] > 0)
+        c["respawn_time"][respawning] -= delta_time
+
+        moving = characters & c["is_moving_to_target"] & (state == CharacterState.MOVING)
+        if not moving.any():
+            return
+        x, y = c["x"], c["y"]
+        target_x, target_y = c["target_x"], c["target_y"]
+        move_distance = c["movement_speed"] * delta_time
+        dx = target_x - x
+        dy = target_y - y
+        distance = np.sqrt(dx * dx + dy * dy)
+
+        arrived = moving & (distance <= move_distance)
+        x[arrived] = target_x[arrived]
+        y[arrived] = target_y[arrived]
+        c["is_moving_to_target"][arrived] = False
+        c["movement_direction_x"][arrived] = 0.0
+        c["movement_direction_y"][arrived] = 0.0
+        state[arrived] = CharacterState.IDLE
+
+        going = moving & ~arrived
+        x[going] += c["movement_direction_x"][going] * move_distance[going]
+        y[going] += c["movement_direction_y"][going] * move_distance[going]
+
+    def _step_projectiles(self, c: Dict[str, Any], projectiles: Any, old_x: Any, old_y: Any) -> None:
+        """Projectile.update around the base step: trail, travel distance, expiry"""
+        objects = self.objects
+        for row in np.flatnonzero(projectiles & c["leaves_trail"]).tolist():
+            projectile = objects[row]
+            projectile.trail_positions.append((float(old_x[row]), float(old_y[row])))
+            if len(projectile.trail_positions) > projectile.max_trail_length:
+                projectile.trail_positions.pop(0)
+
+        dx = c["x"] - old_x
+        dy = c["y"] - old_y
+        travel = c["travel_distance"]
+        travel[projectiles] += np.sqrt(dx[projectiles] * dx[projectiles] + dy[projectiles] * dy[projectiles])
+
+        # Both the explode and the plain path destroy the projectile
+        expired = projectiles & (travel >= c["max_travel_distance"])
+        c["is_alive"][expired] = False
+        c["is_active"][expired] = False
@@ -21,6 +21,17 @@ class ProjectileType(IntEnum):
 class Projectile(GameObject):
     """Projectile class for battle projectiles and bullets"""
 
+    __slots__ = (
+        "projectile_data_id", "projectile_type", "owner_id", "team_id", "damage",
+        "damage_falloff_start", "damage_falloff_end", "min_damage_multiplier", "speed",
+        "max_travel_distance", "travel_distance", "direction_x", "direction_y",
+        "pierces_targets", "max_pierce_count", "current_pierce_count", "bounces",
+        "max_bounce_count", "current_bounce_count", "explodes_on_impact",
+        "explosion_radius", "explosion_damage", "hit_targets", "target_id",
+        "homing_strength", "leaves_trail", "trail_effect_id", "trail_positions",
+        "max_trail_length",
+    )
+
     def __init__(self):
         """Initialize projectile"""
         super().__init__()
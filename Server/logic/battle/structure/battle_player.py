@@ -4,7 +4,7 @@ Battle player class for player data in battle
 """
 
 from typing import Dict, List, Optional
-from ..objects.character import Character
+from ..object.character import Character
 
 class BattlePlayerState:
     """Battle player states"""
@@ -16,6 +16,16 @@ class BattlePlayerState:
 class BattlePlayer:
     """Battle player class for player data in battle"""
 
+    __slots__ = (
+        "player_id", "account_id", "name", "level", "trophies", "state", "team_id",
+        "team_slot", "character", "character_data_id", "character_level",
+        "character_trophies", "hero_power_level", "bot", "equipped_skin_id",
+        "equipped_star_power_id", "equipped_gadget_id", "equipped_gear_ids", "kills",
+        "deaths", "assists", "damage_dealt", "damage_taken", "healing_done",
+        "time_alive", "distance_moved", "power_cubes_collected", "current_power_level",
+        "first_blood", "mvp", "star_player", "is_connected", "ping", "disconnect_time",
+    )
+
     def __init__(self):
         """Initialize battle player"""
         self.player_id = 0
@@ -34,6 +44,8 @@ class BattlePlayer:
         self.character_data_id = 0
         self.character_level = 1
         self.character_trophies = 0
+        self.hero_power_level = 0
+        self.bot = 0
 
         # Equipment
         self.equipped_skin_id = 0
@@ -125,10 +137,6 @@ class BattlePlayer:
         """Check if player is spectating"""
         return self.state == BattlePlayerState.SPECTATING
 
-    def is_connected(self) -> bool:
-        """Check if player is connected"""
-        return self.is_connected and self.state != BattlePlayerState.DISCONNECTED
-
     def get_team_id(self) -> int:
         """Get team ID"""
         return self.team_id
@@ -17,6 +17,13 @@ class KillType:
 class PlayerKillEntry:
     """Player kill entry for tracking kills in battle"""
 
+    __slots__ = (
+        "killer_id", "victim_id", "kill_type", "timestamp", "position_x", "position_y",
+        "weapon_id", "damage_dealt", "distance", "is_revenge", "is_first_blood",
+        "kill_streak", "assist_players", "assist_damage", "was_headshot",
+        "was_environmental", "used_super", "used_gadget",
+    )
+
     def __init__(self):
         """Initialize kill entry"""
         self.killer_id = 0
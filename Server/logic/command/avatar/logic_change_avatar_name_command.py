@@ -4,10 +4,14 @@ Command for changing avatar name
 """
 
 from ..command import Command, CommandType
+from ...avatar.client_avatar import ClientAvatar
+from ...home.client_home import ClientHome
 
 class LogicChangeAvatarNameCommand(Command):
     """Command for changing avatar name"""
 
+    ENCODE_SECTIONS = (ClientAvatar.SECTION_HEADER, ClientHome.SECTION_HEADER)
+
     def __init__(self):
         """Initialize change avatar name command"""
         super().__init__()
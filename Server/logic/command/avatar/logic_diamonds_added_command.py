@@ -4,10 +4,14 @@ Command for adding diamonds to avatar
 """
 
 from ..command import Command, CommandType
+from ...avatar.client_avatar import ClientAvatar
+from ...home.client_home import ClientHome
 
 class LogicDiamondsAddedCommand(Command):
     """Command for adding diamonds to avatar"""
 
+    ENCODE_SECTIONS = (ClientAvatar.SECTION_HEADER, ClientHome.SECTION_HEADER)
+
     def __init__(self):
         """Initialize diamonds added command"""
         super().__init__()
@@ -3,7 +3,7 @@ Python conversion of Supercell.Laser.Logic.Command.Command.cs
 Base command class for game commands
 """
 
-from typing import Optional, Any
+from typing import Optional, Any, Tuple
 
 class CommandType:
     """Command types"""
@@ -17,6 +17,9 @@ class CommandType:
 class Command:
     """Base command class for game commands"""
 
+    # Encoded home/avatar sections the command can change; empty drops every section
+    ENCODE_SECTIONS: Tuple[str, ...] = ()
+
     def __init__(self):
         """Initialize command"""
         self.command_type = CommandType.UNKNOWN
@@ -56,8 +56,8 @@ class CommandManager:
         self.pending_commands.append(command)
         return True
 
-    def execute_command(self, command: Command, avatar: any) -> bool:
-        """Execute single command"""
+    def execute_command(self, command: Command, avatar: any, home: any = None) -> bool:
+        """Execute single command, home is the avatar's ClientHome when the command can change it"""
         if not command or not command.can_execute(avatar):
             return False
 
@@ -67,6 +67,9 @@ class CommandManager:
             if error_code == 0:
                 command.success = True
                 self.commands_executed += 1
+
+                # Commands mutate avatar/home state, flag it for the next save and drop its encoded sections
+                self._invalidate(command, avatar, home)
             else:
                 command.set_error(error_code)
                 self.commands_failed += 1
@@ -92,13 +95,30 @@ class CommandManager:
             self.commands_failed += 1
             return False
 
-    def execute_pending_commands(self, avatar: any) -> int:
+    @staticmethod
+    def _invalidate(command: Command, avatar: any, home: any) -> None:
+        """Mark the avatar and home dirty, each dropping only the listed sections it owns
+        (every section of both when the command lists none)"""
+        if home is None and hasattr(avatar, 'get_client_home'):
+            home = avatar.get_client_home()  # HomeMode target
+        for owner in (avatar, home):
+            if not hasattr(owner, 'mark_dirty'):
+                continue
+            if not command.ENCODE_SECTIONS:
+                owner.mark_dirty()
+                continue
+            sections = [section for section in command.ENCODE_SECTIONS
+                        if section in getattr(owner, 'SECTIONS', ())]
+            if sections:
+                owner.mark_dirty(*sections)
+
+    def execute_pending_commands(self, avatar: any, home: any = None) -> int:
         """Execute all pending commands"""
         executed_count = 0
         commands_to_execute = self.pending_commands.copy()
 
         for command in commands_to_execute:
-            if self.execute_command(command, avatar):
+            if self.execute_command(command, avatar, home):
                 executed_count += 1
 
         return executed_count
@@ -0,0 +1,254 @@
+"""
+Fixed-timestep battle tick scheduler
+Every active battle is stepped at the configured tick rate by one of a few worker threads;
+client input is queued per battle and applied at the start of its next tick
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from logger import Logger
+
+
+class BattleSlot:
+    """Scheduler state of one battle: its input queue and tick counters"""
+
+    __slots__ = ("battle_id", "battle", "process", "inputs", "input_capacity", "ticks", "dropped_inputs",
+                 "unhandled_inputs", "max_tick_ms")
+
+    def __init__(self, battle_id: int, battle: Any, input_capacity: int):
+        """Initialize empty input queue"""
+        self.battle_id = battle_id
+        self.battle = battle
+        self.process: Optional[Callable[[int, bytes], Any]] = getattr(battle, 'process_udp_message', None)
+        self.inputs: Deque[Tuple[int, bytes]] = deque()
+        self.input_capacity = input_capacity
+
+        # Stats
+        self.ticks: int = 0
+        self.dropped_inputs: int = 0
+        self.unhandled_inputs: int = 0
+        self.max_tick_ms: float = 0.0
+
+    def push_input(self, session_id: int, data: bytes) -> bool:
+        """Queue client input for the next tick; False when the queue is full or the battle takes no input"""
+        if self.process is None:
+            self.unhandled_inputs += 1
+            if self.unhandled_inputs == 1:
+                Logger.warning(f"Battle {self.battle_id} ({type(self.battle).__name__}) has no process_udp_message, "
+                               f"dropping its input")
+            return False
+        if len(self.inputs) >= self.input_capacity:
+            self.dropped_inputs += 1
+            return False
+        self.inputs.append((session_id, data))
+        return True
+
+    def tick(self, delta_time: float) -> None:
+        """Apply queued input, then advance the battle by one fixed step"""
+        battle = self.battle
+        inputs = self.inputs
+        if inputs:
+            process = self.process
+            # Only what was queued before this tick; later input waits for the next one
+            for _ in range(len(inputs)):
+                session_id, data = inputs.popleft()
+                process(session_id, data)
+
+        tick = getattr(battle, 'tick', None)
+        if tick:
+            tick(delta_time)
+        else:
+            manager = getattr(battle, 'game_object_manager', None)
+            if manager:
+                manager.update(delta_time)
+        self.ticks += 1
+
+
+class TickWorker:
+    """One scheduler thread stepping its share of the battles at the fixed rate"""
+
+    # Frames more than this many intervals late are skipped instead of run back to back
+    MAX_CATCH_UP_TICKS = 3
+
+    def __init__(self, index: int, interval: float, on_game_over: Callable[[int], None]):
+        """Initialize worker and counters"""
+        self.index = index
+        self.interval = interval
+        self.on_game_over = on_game_over
+        self.slots: Dict[int, BattleSlot] = {}
+        self.running = False
+        self.thread = threading.Thread(target=self._run, name=f"BattleTick-{index}", daemon=True)
+
+        # Stats
+        self.frames: int = 0
+        self.overruns: int = 0
+        self.skipped_ticks: int = 0
+        self.total_frame_ms: float = 0.0
+        self.max_frame_ms: float = 0.0
+        self.max_lateness_ms: float = 0.0
+
+    def start(self) -> None:
+        """Start ticking"""
+        self.running = True
+        self.thread.start()
+
+    def _run(self) -> None:
+        """Run frames on a fixed schedule until stopped"""
+        interval = self.interval
+        next_frame = time.perf_counter()
+        while self.running:
+            now = time.perf_counter()
+            if now < next_frame:
+                time.sleep(next_frame - now)
+                now = time.perf_counter()
+
+            lateness = now - next_frame
+            if lateness > interval * self.MAX_CATCH_UP_TICKS:
+                # Too far behind to catch up, drop the missed frames and resynchronise
+                missed = int(lateness / interval)
+                self.skipped_ticks += missed
+                next_frame += missed * interval
+                lateness -= missed * interval
+            if lateness * 1000 > self.max_lateness_ms:
+                self.max_lateness_ms = lateness * 1000
+
+            self._run_frame()
+
+            frame_ms = (time.perf_counter() - now) * 1000
+            self.frames += 1
+            self.total_frame_ms += frame_ms
+            if frame_ms > self.max_frame_ms:
+                self.max_frame_ms = frame_ms
+            if frame_ms > interval * 1000:
+                self.overruns += 1
+
+            next_frame += interval
+
+    def _run_frame(self) -> None:
+        """Tick every battle owned by this worker once"""
+        for slot in list(self.slots.values()):
+            started = time.perf_counter()
+            try:
+                slot.tick(self.interval)
+            except Exception as e:
+                Logger.error(f"Error ticking battle {slot.battle_id}: {e}")
+
+            tick_ms = (time.perf_counter() - started) * 1000
+            if tick_ms > slot.max_tick_ms:
+                slot.max_tick_ms = tick_ms
+
+            if getattr(slot.battle, 'is_game_over', False):
+                self.on_game_over(slot.battle_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Frame timing of this worker"""
+        return {
+            "battles": len(self.slots),
+            "frames": self.frames,
+            "overruns": self.overruns,
+            "skipped_ticks": self.skipped_ticks,
+            "avg_frame_ms": self.total_frame_ms / self.frames if self.frames else 0.0,
+            "max_frame_ms": self.max_frame_ms,
+            "max_lateness_ms": self.max_lateness_ms,
+        }
+
+
+class BattleScheduler:
+    """Static scheduler running every active battle at a fixed tick rate"""
+
+    _workers: List[TickWorker] = []
+    _slots: Dict[int, BattleSlot] = {}
+    _lock = threading.Lock()
+    _input_capacity: int = 256
+    tick_rate: int = 20
+
+    # Stats
+    dropped_inputs: int = 0
+    unhandled_inputs: int = 0  # input for battles without process_udp_message
+
+    @classmethod
+    def start(cls, tick_rate: int, worker_count: int, input_capacity: int,
+              on_game_over: Callable[[int], None]) -> None:
+        """Start worker_count tick threads; on_game_over(battle_id) is called once a battle reports it is over"""
+        cls.tick_rate = max(1, tick_rate)
+        cls._input_capacity = max(1, input_capacity)
+        cls._slots = {}
+        cls._workers = [TickWorker(index, 1.0 / cls.tick_rate, on_game_over) for index in range(max(1, worker_count))]
+        for worker in cls._workers:
+            worker.start()
+
+    @classmethod
+    def add(cls, battle_id: int, battle: Any) -> None:
+        """Schedule a battle on the worker with the fewest battles"""
+        slot = BattleSlot(battle_id, battle, cls._input_capacity)
+        with cls._lock:
+            if not cls._workers:
+                return
+            worker = min(cls._workers, key=lambda w: len(w.slots))
+            cls._slots[battle_id] = slot
+            worker.slots[battle_id] = slot
+
+    @classmethod
+    def remove(cls, battle_id: int) -> None:
+        """Stop ticking a battle"""
+        with cls._lock:
+            cls._slots.pop(battle_id, None)
+            for worker in cls._workers:
+                worker.slots.pop(battle_id, None)
+
+    @classmethod
+    def get(cls, battle_id: int) -> Optional[Any]:
+        """Scheduled battle by ID"""
+        slot = cls._slots.get(battle_id)
+        return slot.battle if slot else None
+
+    @classmethod
+    def queue_input(cls, battle_id: int, session_id: int, data: bytes) -> bool:
+        """Queue client input for the battle's next tick; False when the battle is unknown, takes no input
+        or its queue is full"""
+        slot = cls._slots.get(battle_id)
+        if slot is None:
+            return False
+        if not slot.push_input(session_id, data):
+            if slot.process is None:
+                cls.unhandled_inputs += 1
+            else:
+                cls.dropped_inputs += 1
+            return False
+        return True
+
+    @classmethod
+    def get_metrics(cls) -> Dict[str, Any]:
+        """Tick timing over all workers, plus per-worker stats"""
+        workers = [worker.get_stats() for worker in cls._workers]
+        frames = sum(stats["frames"] for stats in workers)
+        slots = list(cls._slots.values())
+        return {
+            "tick_rate": cls.tick_rate,
+            "battles": len(slots),
+            "frames": frames,
+            "overruns": sum(stats["overruns"] for stats in workers),
+            "skipped_ticks": sum(stats["skipped_ticks"] for stats in workers),
+            "avg_frame_ms": (sum(stats["avg_frame_ms"] * stats["frames"] for stats in workers) / frames
+                             if frames else 0.0),
+            "max_frame_ms": max((stats["max_frame_ms"] for stats in workers), default=0.0),
+            "max_lateness_ms": max((stats["max_lateness_ms"] for stats in workers), default=0.0),
+            "max_tick_ms": max((slot.max_tick_ms for slot in slots), default=0.0),
+            "dropped_inputs": cls.dropped_inputs,
+            "unhandled_inputs": cls.unhandled_inputs,
+            "workers": workers,
+        }
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """Stop all tick threads"""
+        for worker in cls._workers:
+            worker.running = False
+        for worker in cls._workers:
+            if worker.thread.is_alive():
+                worker.thread.join(timeout=2)
+        cls._workers = []
+        cls._slots = {}
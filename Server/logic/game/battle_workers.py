@@ -0,0 +1,430 @@
+"""
+Battle simulation worker processes
+Each battle runs in one worker process for its whole life, placed on the least loaded worker;
+client input goes to the worker and outbound packets and the results of finished battles come back
+over shared-memory rings, while this process keeps only a handle per battle
+"""
+
+import multiprocessing
+import pickle
+import struct
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from networking.shm_ring import ShmRing
+from settings.configuration import Configuration
+from logger import Logger
+from .battle_scheduler import BattleScheduler
+
+# Ring record: kind, battle id, session id, then the payload
+_RECORD = struct.Struct("<Bii")
+KIND_INPUT = 1      # master -> worker, client input
+KIND_SEND = 2       # worker -> master, UDP payload for a session
+KIND_GAME_OVER = 3  # worker -> master, battle finished, with its pickled results
+KIND_STATS = 4      # worker -> master, pickled scheduler metrics
+
+STATS_INTERVAL = 1.0
+RESULT_PUSH_TIMEOUT = 2.0  # how long a worker waits for room in a full ring for an end record
+PENDING_INPUT_TIMEOUT = 2.0  # how long a worker holds input for a battle whose "add" has not arrived
+
+
+class BattleHandle:
+    """What the master keeps of a battle simulated in a worker process"""
+
+    __slots__ = ("id", "worker_index")
+
+    def __init__(self, battle_id: int, worker_index: int):
+        """Initialize handle"""
+        self.id = battle_id
+        self.worker_index = worker_index
+
+    def __repr__(self) -> str:
+        """String representation"""
+        return f"BattleHandle(id={self.id}, worker={self.worker_index})"
+
+
+class PendingInputs:
+    """Worker-side input for battles not added yet. Input travels on the ring and the battle on the
+    control pipe, so input sent right after the battle was shipped can arrive first"""
+
+    def __init__(self, capacity: int, timeout: float = PENDING_INPUT_TIMEOUT):
+        """Initialize empty buffer; capacity is per battle, like the scheduler's input queues"""
+        self.capacity = max(1, capacity)
+        self.timeout = timeout
+        self._battles: Dict[int, Tuple[float, List[Tuple[int, bytes]]]] = {}
+
+        # Stats
+        self.dropped: int = 0
+
+    def hold(self, battle_id: int, session_id: int, data: bytes) -> bool:
+        """Keep input until the battle is added; False (and counted as dropped) when its buffer is full"""
+        held = self._battles.setdefault(battle_id, (time.monotonic(), []))[1]
+        if len(held) >= self.capacity:
+            self.dropped += 1
+            return False
+        held.append((session_id, data))
+        return True
+
+    def take(self, battle_id: int) -> List[Tuple[int, bytes]]:
+        """Input held for a battle that was just added, oldest first"""
+        entry = self._battles.pop(battle_id, None)
+        return entry[1] if entry else []
+
+    def discard(self, battle_id: int) -> None:
+        """Forget input for a removed battle"""
+        entry = self._battles.pop(battle_id, None)
+        if entry:
+            self.dropped += len(entry[1])
+
+    def expire(self) -> int:
+        """Drop input held longer than the timeout, for battles that never arrive; returns the count"""
+        deadline = time.monotonic() - self.timeout
+        expired = 0
+        for battle_id in [battle_id for battle_id, (since, _) in self._battles.items() if since < deadline]:
+            expired += len(self._battles.pop(battle_id)[1])
+        self.dropped += expired
+        return expired
+
+    def __len__(self) -> int:
+        return sum(len(held) for _, held in self._battles.values())
+
+
+class BattleWorker:
+    """Master-side record of one worker process: its rings, control pipe and battles"""
+
+    def __init__(self, index: int, ring_size: int):
+        """Create the rings and control pipe; the process is started by BattleWorkerPool"""
+        context = multiprocessing.get_context("spawn")
+        self.index = index
+        self.inputs = ShmRing(ring_size)
+        self.outputs = ShmRing(ring_size)
+        self.control, self.remote_control = context.Pipe()
+        self.control_lock = threading.Lock()
+        self.battles: Set[int] = set()
+        self.stats: Dict[str, Any] = {}
+        self.process = context.Process(
+            target=_battle_worker_main,
+            args=(index, Configuration.instance, self.inputs.name, self.outputs.name, self.remote_control),
+            name=f"BattleWorker-{index}",
+            daemon=True
+        )
+
+    def send_control(self, message: tuple) -> bool:
+        """Send a control message, False when the worker is gone"""
+        try:
+            with self.control_lock:
+                self.control.send(message)
+            return True
+        except (OSError, EOFError, BrokenPipeError):
+            return False
+
+    def get_load(self) -> tuple:
+        """Placement key: battle count first, then the worker's last reported frame time"""
+        return len(self.battles), self.stats.get("avg_frame_ms", 0.0)
+
+    def close(self) -> None:
+        """Free the rings and the pipe"""
+        self.control.close()
+        self.remote_control.close()
+        self.inputs.close()
+        self.outputs.close()
+
+
+class BattleWorkerPool:
+    """Static pool of battle worker processes (master side)"""
+
+    _workers: List[BattleWorker] = []
+    _placement: Dict[int, BattleWorker] = {}
+    _lock = threading.Lock()
+    _reader: Optional[threading.Thread] = None
+    _running: bool = False
+    _on_game_over: Optional[Callable[[int, List[Any]], None]] = None
+    _sender: Optional[Callable[[int, bytes], None]] = None
+
+    # Stats
+    shipped: int = 0
+    ship_failures: int = 0
+    dropped_inputs: int = 0
+    worker_deaths: int = 0
+
+    @classmethod
+    def start(cls, count: int, ring_size: int, on_game_over: Callable[[int, List[Any]], None],
+              sender: Callable[[int, bytes], None]) -> bool:
+        """Spawn count workers; on_game_over(battle_id, results) runs when a worker reports a finished
+        battle and sender(session_id, data) delivers its outbound packets. False when workers cannot be used"""
+        if count <= 0:
+            return False
+        if multiprocessing.current_process().daemon:
+            # Daemonic processes (TCP workers) may not have children
+            Logger.print_log("Battle worker processes are not available here, simulating battles in-process")
+            return False
+
+        cls._on_game_over = on_game_over
+        cls._sender = sender
+        cls._placement = {}
+        cls._workers = [BattleWorker(index, ring_size) for index in range(count)]
+        for worker in cls._workers:
+            worker.process.start()
+
+        cls._running = True
+        cls._reader = threading.Thread(target=cls._read_outputs, name="BattleWorkerReader", daemon=True)
+        cls._reader.start()
+        Logger.print_log(f"Started {count} battle worker processes")
+        return True
+
+    @classmethod
+    def is_running(cls) -> bool:
+        """True when battles are simulated in worker processes"""
+        return cls._running
+
+    @classmethod
+    def owns(cls, battle_id: int) -> bool:
+        """True when the battle is placed on a worker"""
+        return battle_id in cls._placement
+
+    @classmethod
+    def assign(cls, battle_id: int) -> Optional[int]:
+        """Reserve the least loaded live worker for a battle, returns its index"""
+        with cls._lock:
+            workers = [worker for worker in cls._workers if worker.process.is_alive()]
+            if not workers:
+                return None
+            worker = min(workers, key=BattleWorker.get_load)
+            worker.battles.add(battle_id)
+            cls._placement[battle_id] = worker
+            return worker.index
+
+    @classmethod
+    def ship(cls, battle_id: int, battle: Any) -> Optional[int]:
+        """Hand a set-up battle to its reserved worker, returns the worker index; None (and the
+        reservation dropped) when it cannot be pickled or the worker is gone, so the caller can
+        simulate it in-process"""
+        worker = cls._placement.get(battle_id)
+        if worker is None:
+            return None
+        try:
+            blob = pickle.dumps(battle, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            Logger.error(f"Battle {battle_id} cannot be moved to a worker process: {e}")
+            blob = None
+
+        if blob is None or not worker.send_control(("add", battle_id, blob)):
+            cls.ship_failures += 1
+            cls.release(battle_id)
+            return None
+        cls.shipped += 1
+        return worker.index
+
+    @classmethod
+    def release(cls, battle_id: int) -> None:
+        """Forget a battle's placement and stop it in its worker"""
+        with cls._lock:
+            worker = cls._placement.pop(battle_id, None)
+            if worker is None:
+                return
+            worker.battles.discard(battle_id)
+        worker.send_control(("remove", battle_id))
+
+    @classmethod
+    def queue_input(cls, battle_id: int, session_id: int, data: bytes) -> bool:
+        """Pass client input to the battle's worker; False when its ring is full"""
+        worker = cls._placement.get(battle_id)
+        if worker is None:
+            return False
+        if not worker.inputs.push(_RECORD.pack(KIND_INPUT, battle_id, session_id) + data):
+            cls.dropped_inputs += 1
+            return False
+        return True
+
+    @classmethod
+    def remove_session(cls, battle_id: int, session_id: int) -> None:
+        """Drop a disconnected player from a battle in a worker"""
+        worker = cls._placement.get(battle_id)
+        if worker:
+            worker.send_control(("remove_session", battle_id, session_id))
+
+    @classmethod
+    def _read_outputs(cls) -> None:
+        """Deliver what the workers send back, and notice workers that died"""
+        next_check = time.monotonic() + STATS_INTERVAL
+        while cls._running:
+            busy = False
+            for worker in cls._workers:
+                for record in worker.outputs.pop_all():
+                    busy = True
+                    try:
+                        cls._dispatch(worker, record)
+                    except Exception as e:
+                        Logger.error(f"Error handling battle worker {worker.index} output: {e}")
+
+            if time.monotonic() >= next_check:
+                next_check = time.monotonic() + STATS_INTERVAL
+                cls._check_workers()
+            if not busy:
+                time.sleep(0.001)
+
+    @classmethod
+    def _dispatch(cls, worker: BattleWorker, record: bytes) -> None:
+        """Handle one record from a worker's output ring"""
+        kind, battle_id, session_id = _RECORD.unpack_from(record)
+        if kind == KIND_SEND:
+            cls._sender(session_id, record[_RECORD.size:])
+        elif kind == KIND_GAME_OVER:
+            payload = record[_RECORD.size:]
+            cls._on_game_over(battle_id, pickle.loads(payload) if payload else [])
+        elif kind == KIND_STATS:
+            worker.stats = pickle.loads(record[_RECORD.size:])
+
+    @classmethod
+    def _check_workers(cls) -> None:
+        """End the battles of workers that exited; new battles avoid them"""
+        for worker in cls._workers:
+            if worker.battles and not worker.process.is_alive():
+                cls.worker_deaths += 1
+                Logger.error(f"Battle worker {worker.index} exited with code {worker.process.exitcode}, "
+                             f"ending its {len(worker.battles)} battles")
+                for battle_id in list(worker.battles):
+                    cls._on_game_over(battle_id, [])
+
+    @classmethod
+    def get_metrics(cls) -> Dict[str, Any]:
+        """Per-worker load and tick timing, ring drops and shipping counters"""
+        workers = []
+        for worker in cls._workers:
+            stats = worker.stats
+            workers.append({
+                "pid": worker.process.pid,
+                "alive": worker.process.is_alive(),
+                "battles": len(worker.battles),
+                "avg_frame_ms": stats.get("avg_frame_ms", 0.0),
+                "max_frame_ms": stats.get("max_frame_ms", 0.0),
+                "overruns": stats.get("overruns", 0),
+                "input_ring_used": worker.inputs.get_used(),
+                "output_drops": stats.get("output_drops", 0),
+                "pending_inputs": stats.get("pending_inputs", 0),
+                "unclaimed_inputs": stats.get("unclaimed_inputs", 0),
+                "unhandled_inputs": stats.get("unhandled_inputs", 0),
+            })
+        return {
+            "processes": len(cls._workers),
+            "battles": len(cls._placement),
+            "shipped": cls.shipped,
+            "ship_failures": cls.ship_failures,
+            "dropped_inputs": cls.dropped_inputs,
+            "output_drops": sum(worker["output_drops"] for worker in workers),
+            "unclaimed_inputs": sum(worker["unclaimed_inputs"] for worker in workers),
+            "unhandled_inputs": sum(worker["unhandled_inputs"] for worker in workers),
+            "worker_deaths": cls.worker_deaths,
+            "workers": workers,
+        }
+
+    @classmethod
+    def shutdown(cls, timeout: float = 5.0) -> None:
+        """Stop the workers and free their rings"""
+        if not cls._running:
+            return
+        cls._running = False
+        for worker in cls._workers:
+            worker.send_control(("stop",))
+        deadline = time.monotonic() + timeout
+        for worker in cls._workers:
+            worker.process.join(max(0.0, deadline - time.monotonic()))
+            if worker.process.is_alive():
+                worker.process.kill()
+        if cls._reader and cls._reader.is_alive():
+            cls._reader.join(timeout=2)
+        for worker in cls._workers:
+            worker.close()
+        cls._workers = []
+        cls._placement = {}
+
+
+def _battle_worker_main(index: int, config: Any, input_name: str, output_name: str, control: Any) -> None:
+    """Entry point of a battle worker process: tick the battles handed to it until told to stop"""
+    Configuration.instance = config
+
+    from logic.data import DataTables
+    from networking.udp.udp_gateway import UDPGateway
+    DataTables.load()
+
+    inputs = ShmRing(name=input_name)
+    outputs = ShmRing(name=output_name)
+
+    def send(session_id: int, data: bytes) -> None:
+        outputs.push(_RECORD.pack(KIND_SEND, 0, session_id) + data)
+
+    def game_over(battle_id: int) -> None:
+        # The battle is a copy, its results only count once the master applies them
+        battle = BattleScheduler.get(battle_id)
+        results = battle.get_results() if hasattr(battle, 'get_results') else []
+        BattleScheduler.remove(battle_id)
+        record = _RECORD.pack(KIND_GAME_OVER, battle_id, 0) + pickle.dumps(results, protocol=pickle.HIGHEST_PROTOCOL)
+        deadline = time.monotonic() + RESULT_PUSH_TIMEOUT
+        while not outputs.push(record):
+            if time.monotonic() >= deadline:
+                Logger.error(f"Battle {battle_id} ended but its results could not be sent to the master")
+                return
+            time.sleep(0.001)
+
+    # Battles send through the gateway as usual (send_packet and send_to_session), here it forwards
+    # to the master
+    UDPGateway.set_outbox(send)
+    BattleScheduler.start(config.battle_tick_rate, config.battle_tick_workers,
+                          config.battle_input_queue_size, game_over)
+
+    pending = PendingInputs(config.battle_input_queue_size)
+    next_stats = time.monotonic()
+    idle = False
+    try:
+        while True:
+            if control.poll(0.001 if idle else 0):
+                message = control.recv()
+                command = message[0]
+                if command == "stop":
+                    break
+                if command == "add":
+                    BattleScheduler.add(message[1], pickle.loads(message[2]))
+                    for session_id, data in pending.take(message[1]):
+                        BattleScheduler.queue_input(message[1], session_id, data)
+                elif command == "remove":
+                    BattleScheduler.remove(message[1])
+                    pending.discard(message[1])
+                elif command == "remove_session":
+                    _remove_session(BattleScheduler.get(message[1]), message[2])
+
+            records = inputs.pop_all()
+            for record in records:
+                _, battle_id, session_id = _RECORD.unpack_from(record)
+                data = record[_RECORD.size:]
+                if not BattleScheduler.queue_input(battle_id, session_id, data):
+                    if BattleScheduler.get(battle_id) is None:
+                        pending.hold(battle_id, session_id, data)
+            idle = not records
+
+            if time.monotonic() >= next_stats:
+                next_stats = time.monotonic() + STATS_INTERVAL
+                expired = pending.expire()
+                if expired:
+                    Logger.error(f"Battle worker {index} dropped {expired} inputs for battles it never received")
+                metrics = BattleScheduler.get_metrics()
+                metrics.pop("workers", None)
+                metrics["output_drops"] = outputs.dropped
+                metrics["pending_inputs"] = len(pending)
+                metrics["unclaimed_inputs"] = pending.dropped
+                outputs.push(_RECORD.pack(KIND_STATS, 0, 0) + pickle.dumps(metrics))
+    except (EOFError, OSError, KeyboardInterrupt):
+        pass  # master went away
+    finally:
+        BattleScheduler.shutdown()
+        inputs.close()
+        outputs.close()
+
+
+def _remove_session(battle: Any, session_id: int) -> None:
+    """Remove the player of a disconnected session from a battle"""
+    if battle is None:
+        return
+    player = battle.get_player_by_session_id(session_id)
+    if player:
+        battle.remove_player(player)
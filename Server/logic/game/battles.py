@@ -4,74 +4,137 @@ Battle management system
 """
 
 import threading
-import time
-from typing import Dict, Optional
-from concurrent.futures import ThreadPoolExecutor
-from logic.battle.battle_mode import BattleMode
+from typing import Any, Dict, List, Optional, Union
+from logic.battle.battle_mode import BattleMode, BattleResult
+from logic.battle.object.game_object_manager import GameObjectManager
+from settings.configuration import Configuration
+from logger import Logger
+from .battle_scheduler import BattleScheduler
+from .battle_workers import BattleHandle, BattleWorkerPool
 
 class Battles:
     """Static class for managing battles"""
 
     _battle_id_counter: int = 0
-    _battles: Dict[int, BattleMode] = {}
-    _update_thread: Optional[threading.Thread] = None
-    _running: bool = False
+    _battles: Dict[int, Union[BattleMode, BattleHandle]] = {}
+    _lock = threading.Lock()  # handlers on every receive shard and the tick threads add and remove battles
 
     @classmethod
     def init(cls) -> None:
-        """Initialize battle manager"""
+        """Initialize battle manager and start the tick scheduler, plus the battle worker processes when
+        configured; finished battles are reported back to finish"""
+        from networking.udp.udp_gateway import UDPGateway
+
         cls._battles = {}
         cls._battle_id_counter = 0
-        cls._running = True
-
-        # Start update thread
-        cls._update_thread = threading.Thread(target=cls._update, daemon=True)
-        cls._update_thread.start()
-
-    @classmethod
-    def _update(cls) -> None:
-        """Update battles loop"""
-        while cls._running:
-            try:
-                # Get battles to check (copy to avoid modification during iteration)
-                battles_to_check = list(cls._battles.items())
-
-                for battle_id, battle in battles_to_check:
-                    if battle.is_game_over:
-                        cls._battles.pop(battle_id, None)
 
-                time.sleep(1)  # Sleep for 1 second
-
-            except Exception as e:
-                print(f"Error in battles update loop: {e}")
-                time.sleep(1)
+        config = Configuration.instance
+        GameObjectManager.default_backend = config.battle_object_backend
+        BattleScheduler.start(config.battle_tick_rate, config.battle_tick_workers,
+                              config.battle_input_queue_size, cls.finish)
+        BattleWorkerPool.start(config.battle_worker_processes, config.battle_ring_size,
+                               cls.finish, UDPGateway.send_to_session)
 
     @classmethod
     def add(cls, battle: BattleMode) -> int:
-        """Add battle and return ID"""
-        cls._battle_id_counter += 1
-        battle_id = cls._battle_id_counter
-        cls._battles[battle_id] = battle
+        """Add battle and return its ID; with worker processes it is placed on the least loaded one.
+        Nothing ticks it until start, once its players and objects are set up"""
+        with cls._lock:
+            cls._battle_id_counter += 1
+            battle_id = cls._battle_id_counter
+            cls._battles[battle_id] = battle
+        if BattleWorkerPool.is_running():
+            BattleWorkerPool.assign(battle_id)
         return battle_id
 
     @classmethod
-    def get(cls, battle_id: int) -> Optional[BattleMode]:
-        """Get battle by ID"""
+    def start(cls, battle: BattleMode) -> None:
+        """Start a set-up battle and schedule it; a battle placed on a worker is handed over and only its
+        handle kept, any other is ticked in this process from now on"""
+        battle.start()
+        if BattleWorkerPool.owns(battle.id):
+            worker_index = BattleWorkerPool.ship(battle.id, battle)
+            if worker_index is not None:
+                with cls._lock:
+                    cls._battles[battle.id] = BattleHandle(battle.id, worker_index)
+                return
+        BattleScheduler.add(battle.id, battle)
+
+    @classmethod
+    def get(cls, battle_id: int) -> Optional[Union[BattleMode, BattleHandle]]:
+        """Get battle by ID; a battle simulated in a worker process is only a handle here"""
         return cls._battles.get(battle_id)
 
+    @classmethod
+    def finish(cls, battle_id: int, results: Optional[List[BattleResult]] = None) -> None:
+        """Remove a finished battle and apply its results to the accounts; results come with the end record
+        of a worker process, or from the battle itself when it ran here. Called on a tick thread or the
+        worker output reader, so the account loads run on the database executor"""
+        from database.async_db import AsyncDatabase
+
+        if results is None:
+            battle = cls._battles.get(battle_id)
+            results = battle.get_results() if isinstance(battle, BattleMode) else []
+        cls.remove(battle_id)
+        if any(result.account_id > 0 for result in results):
+            AsyncDatabase.submit("battles.apply_results", cls.apply_results, results)
+
+    @staticmethod
+    def apply_results(results: List[BattleResult]) -> None:
+        """Apply battle outcomes to the players' accounts, loading any that are not cached"""
+        from database.accounts import Accounts
+
+        for result in results:
+            if result.account_id <= 0:
+                continue  # bot
+            try:
+                account = Accounts.load(result.account_id)
+                if account:
+                    result.apply(account)
+            except Exception as e:
+                Logger.error(f"Error applying battle result for account {result.account_id}: {e}")
+
     @classmethod
     def remove(cls, battle_id: int) -> None:
         """Remove battle by ID"""
-        cls._battles.pop(battle_id, None)
+        with cls._lock:
+            cls._battles.pop(battle_id, None)
+        BattleWorkerPool.release(battle_id)
+        BattleScheduler.remove(battle_id)
+
+    @classmethod
+    def remove_session(cls, battle_id: int, session_id: int) -> None:
+        """Remove the player of a disconnected session from its battle, wherever it runs"""
+        if BattleWorkerPool.owns(battle_id):
+            BattleWorkerPool.remove_session(battle_id, session_id)
+            return
+        battle = cls._battles.get(battle_id)
+        if battle:
+            player = battle.get_player_by_session_id(session_id)
+            if player:
+                battle.remove_player(player)
 
     @classmethod
     def get_count(cls) -> int:
         """Get active battle count"""
         return len(cls._battles)
 
+    @classmethod
+    def queue_input(cls, battle_id: int, session_id: int, data: bytes) -> bool:
+        """Queue client input for the battle's next tick, in whichever process simulates it"""
+        if BattleWorkerPool.owns(battle_id):
+            return BattleWorkerPool.queue_input(battle_id, session_id, data)
+        return BattleScheduler.queue_input(battle_id, session_id, data)
+
+    @classmethod
+    def get_metrics(cls) -> Dict[str, Any]:
+        """Tick scheduler metrics, with the worker process metrics under processes"""
+        metrics = BattleScheduler.get_metrics()
+        metrics["processes"] = BattleWorkerPool.get_metrics()
+        return metrics
+
     @classmethod
     def shutdown(cls) -> None:
         """Shutdown battle manager"""
-        cls._running = False
-        if cls._update_thread and cls._update_thread.is_alive():
-            cls._update_thread.join(timeout=5)
+        BattleWorkerPool.shutdown()
+        BattleScheduler.shutdown()
@@ -5,68 +5,202 @@ Leaderboard management system
 
 import threading
 import time
-from typing import List
+from typing import Any, Dict, List, Optional, Tuple
 
 from logic.club.alliance import Alliance
+from logic.game.ranked_board import LeaderboardEntry, RankedBoard
 from database.models.account import Account
-from database import accounts as Accounts
-from database import alliances as Alliances
+from database.accounts import Accounts
+from database.alliances import Alliances
+from database.cache.account_cache import AccountCache
+from database.cache.alliance_cache import AllianceCache
+from networking.ipc_broker import BrokerClient
+from settings.configuration import Configuration
+
+# (board, hero data id, entry id, score or None to remove, name, thumbnail id)
+LeaderboardDelta = Tuple[str, int, int, Optional[int], str, int]
 
 class Leaderboards:
-    """Static class for managing leaderboards"""
+    """Static class for managing leaderboards
+
+    Boards live in the memory of each process and only hold the best BOARD_CAPACITY entries, seeded
+    from indexed ORDER BY ... LIMIT queries. With TCP worker processes every worker only sees the saves
+    of the accounts it owns, so the changes it makes to a board are published through the broker and
+    applied by the other workers; every leaderboard_refresh_interval seconds the top rows are read again
+    to pick up writes nobody published"""
+
+    MAX_ENTRIES: int = 200
+    # Entries kept beyond MAX_ENTRIES, so players falling out of the top are replaced by known ones
+    BOARD_CAPACITY: int = MAX_ENTRIES * 2
 
-    _accounts: List[Account] = []
-    _alliances: List[Alliance] = []
-    _thread: threading.Thread = None
-    _running: bool = False
+    _global: RankedBoard = RankedBoard(BOARD_CAPACITY)
+    _brawlers: Dict[int, RankedBoard] = {}
+    _alliances: RankedBoard = RankedBoard(BOARD_CAPACITY)
+    _brawlers_lock: threading.Lock = threading.Lock()
+    _refresh_thread: Optional[threading.Thread] = None
+    _started: bool = False
 
     @classmethod
     def init(cls) -> None:
-        """Initialize leaderboards"""
-        cls._accounts = []
-        cls._alliances = []
-        cls._running = True
+        """Initialize leaderboards, seeded once from the database and then kept up to date incrementally"""
+        cls._global = RankedBoard(cls.BOARD_CAPACITY)
+        cls._brawlers = {}
+        cls._alliances = RankedBoard(cls.BOARD_CAPACITY)
+        cls.reseed()
 
-        # Start update thread
-        cls._thread = threading.Thread(target=cls._update, daemon=True)
-        cls._thread.start()
+        # Cached and persisted objects carry the latest trophies
+        AccountCache.add_save_listener(cls.update_account)
+        AllianceCache.add_save_listener(cls.update_alliance)
+        BrokerClient.on("leaderboard_deltas", cls.apply_deltas)
+
+        config = Configuration.instance
+        if config.tcp_worker_processes > 0 and config.leaderboard_refresh_interval > 0:
+            cls._started = True
+            cls._refresh_thread = threading.Thread(target=cls._refresh, args=(config.leaderboard_refresh_interval,),
+                                                   daemon=True)
+            cls._refresh_thread.start()
 
     @classmethod
-    def get_avatar_ranking_list(cls) -> List[Account]:
+    def reseed(cls) -> None:
+        """Set the best scores from the database columns; names are read when an entry is first served"""
+        accounts, heroes = Accounts.get_leaderboard_seed(cls.BOARD_CAPACITY)
+        for account_id, trophies in accounts:
+            cls._global.update(account_id, trophies)
+        for hero_data_id, rows in heroes.items():
+            board = cls._get_brawler_board(hero_data_id)
+            for account_id, hero_score in rows:
+                board.update(account_id, hero_score)
+
+        for alliance_id, trophies, name in Alliances.get_leaderboard_seed(cls.BOARD_CAPACITY):
+            cls._alliances.update(alliance_id, trophies, name)
+
+    @classmethod
+    def _refresh(cls, interval: float) -> None:
+        """Background thread re-reading the top rows, for writes no worker published"""
+        while cls._started:
+            time.sleep(interval)
+            try:
+                cls.reseed()
+            except Exception as e:
+                print(f"Error while refreshing leaderboards: {e}")
+
+    @classmethod
+    def _with_names(cls, entries: List[LeaderboardEntry]) -> List[LeaderboardEntry]:
+        """Fill in names and thumbnails of seeded entries, one query for all that are missing"""
+        missing = [entry for entry in entries if not entry.named]
+        if missing:
+            summaries = Accounts.get_summaries([entry.account_id for entry in missing])
+            for entry in missing:
+                entry.name, entry.thumbnail_id = summaries.get(entry.account_id, ("", 0))
+                entry.named = True
+        return entries
+
+    @classmethod
+    def _get_brawler_board(cls, hero_data_id: int) -> RankedBoard:
+        """Get or create the board of one brawler"""
+        board = cls._brawlers.get(hero_data_id)
+        if board is None:
+            with cls._brawlers_lock:
+                board = cls._brawlers.setdefault(hero_data_id, RankedBoard(cls.BOARD_CAPACITY))
+        return board
+
+    @classmethod
+    def update_account(cls, account: Account) -> None:
+        """Move account on the global and brawler boards"""
+        avatar = account.avatar
+        account_id = account.account_id
+        name = getattr(avatar, 'name', "")
+        thumbnail_id = getattr(avatar, 'thumbnail_id', 0)
+        deltas: List[LeaderboardDelta] = []
+        if cls._global.update(account_id, avatar.trophies, name, thumbnail_id):
+            deltas.append(("avatar", 0, account_id, avatar.trophies, name, thumbnail_id))
+
+        heroes = avatar.heroes.values() if isinstance(avatar.heroes, dict) else avatar.heroes
+        for hero in heroes:
+            if cls._get_brawler_board(hero.character_id).update(account_id, hero.trophies, name, thumbnail_id):
+                deltas.append(("brawler", hero.character_id, account_id, hero.trophies, name, thumbnail_id))
+
+        cls._publish(deltas)
+
+    @classmethod
+    def update_alliance(cls, alliance: Alliance) -> None:
+        """Move alliance on the club board"""
+        if cls._alliances.update(alliance.id, alliance.trophies, alliance.name):
+            cls._publish([("alliance", 0, alliance.id, alliance.trophies, alliance.name, 0)])
+
+    @classmethod
+    def remove_alliance(cls, alliance_id: int) -> None:
+        """Drop a deleted alliance from the club board"""
+        cls._alliances.remove(alliance_id)
+        cls._publish([("alliance", 0, alliance_id, None, "", 0)])
+
+    @classmethod
+    def _publish(cls, deltas: List[LeaderboardDelta]) -> None:
+        """Send board changes to the other worker processes; saves that leave every board send nothing"""
+        if deltas and BrokerClient.is_connected():
+            BrokerClient.notify("leaderboard_deltas", deltas)
+
+    @classmethod
+    def apply_deltas(cls, deltas: List[LeaderboardDelta]) -> None:
+        """Apply board changes published by another worker"""
+        for board_name, hero_data_id, entry_id, score, name, thumbnail_id in deltas:
+            if board_name == "avatar":
+                board = cls._global
+            elif board_name == "brawler":
+                board = cls._get_brawler_board(hero_data_id)
+            else:
+                board = cls._alliances
+
+            if score is None:
+                board.remove(entry_id)
+            else:
+                board.update(entry_id, score, name, thumbnail_id)
+
+    @classmethod
+    def get_avatar_ranking_list(cls, count: int = MAX_ENTRIES) -> List[LeaderboardEntry]:
         """Get avatar ranking list"""
-        return cls._accounts.copy()
+        return cls._with_names(cls._global.top(count))
 
     @classmethod
-    def get_brawler_ranking_list(cls, hero_data_id: int) -> List[Account]:
+    def get_brawler_ranking_list(cls, hero_data_id: int, count: int = MAX_ENTRIES) -> List[LeaderboardEntry]:
         """Get brawler ranking list"""
-        return Accounts.get_brawler_ranking_list(hero_data_id)
+        board = cls._brawlers.get(hero_data_id)
+        return cls._with_names(board.top(count)) if board else []
 
     @classmethod
-    def get_alliance_ranking_list(cls) -> List[Alliance]:
+    def get_alliance_ranking_list(cls, count: int = MAX_ENTRIES) -> List[LeaderboardEntry]:
         """Get alliance ranking list"""
-        return cls._alliances.copy()
+        return cls._alliances.top(count)
 
     @classmethod
-    def _update(cls) -> None:
-        """Update leaderboards in background"""
-        while cls._running:
-            try:
-                # Update account rankings
-                cls._accounts = Accounts.get_ranking_list()
+    def get_avatar_rank(cls, account_id: int) -> int:
+        """1-based global rank of account, 0 if unranked"""
+        return cls._global.get_rank(account_id)
 
-                # Update alliance rankings
-                cls._alliances = Alliances.get_ranking_list()
+    @classmethod
+    def get_brawler_rank(cls, hero_data_id: int, account_id: int) -> int:
+        """1-based rank of account on a brawler board, 0 if unranked"""
+        board = cls._brawlers.get(hero_data_id)
+        return board.get_rank(account_id) if board else 0
 
-                # Sleep for 20 seconds
-                time.sleep(20)
+    @classmethod
+    def get_alliance_rank(cls, alliance_id: int) -> int:
+        """1-based rank of alliance on the club board, 0 if unranked"""
+        return cls._alliances.get_rank(alliance_id)
 
-            except Exception as e:
-                print(f"Error updating leaderboards: {e}")
-                time.sleep(20)
+    @classmethod
+    def get_metrics(cls) -> Dict[str, Any]:
+        """Board sizes for the status command"""
+        return {
+            "global": len(cls._global),
+            "brawler_boards": len(cls._brawlers),
+            "alliances": len(cls._alliances),
+        }
 
     @classmethod
     def shutdown(cls) -> None:
         """Shutdown leaderboards"""
-        cls._running = False
-        if cls._thread and cls._thread.is_alive():
-            cls._thread.join(timeout=5)
+        cls._started = False
+        cls._global.clear()
+        cls._alliances.clear()
+        cls._brawlers = {}
@@ -25,8 +25,10 @@ from logic.team.team_member import TeamMember
 from logic.util.game_mode_util import GameModeUtil
 from logic.util.game_play_util import GamePlayUtil
 from networking.connection import Connection
+from networking.ipc_broker import BrokerClient
 from networking.udp_gateway import UDPGateway
 from networking.session.sessions import Sessions
+from message.processor import Processor
 from .events import Events
 from .battles import Battles
 from .teams import Teams
@@ -35,6 +37,10 @@ class Matchmaking:
     """Static class for managing matchmaking"""
 
     _slots: Dict[int, 'MatchmakingSlot'] = {}
+
+    # Requests come from every receive shard and cancelling touches the connections of a whole team;
+    # they and the slot updates run one at a time
+    _lock = threading.RLock()
     _update_thread: Optional[threading.Thread] = None
     _running: bool = False
 
@@ -56,30 +62,51 @@ class Matchmaking:
     @classmethod
     def _update(cls) -> None:
         """Update all matchmaking slots"""
+        ticks = 0
         while cls._running:
             try:
-                for slot in cls._slots.values():
-                    slot.update()
+                with cls._lock:
+                    for slot in cls._slots.values():
+                        slot.update()
+
+                # Report queue depth to the broker once a second in multi-process mode
+                ticks += 1
+                if ticks >= 4 and BrokerClient.is_connected():
+                    ticks = 0
+                    BrokerClient.notify("matchmaking_queued", cls.get_queued())
+
                 time.sleep(0.25)  # 250ms
             except Exception as e:
                 print(f"Error in matchmaking update: {e}")
                 time.sleep(0.25)
 
+    @classmethod
+    def get_queued(cls) -> Dict[int, int]:
+        """Players waiting per event slot in this process"""
+        return {slot_id: len(slot.queue) for slot_id, slot in cls._slots.items()}
+
     @classmethod
     def request_matchmake(cls, connection: Connection, slot: int, team: int = -1) -> None:
         """Request matchmaking for connection"""
         if slot not in cls._slots:
             return
 
-        connection.matchmake_slot = slot
-        entry = MatchmakingEntry(connection)
-        entry.player_team_id = team
-        connection.matchmaking_entry = entry
-        cls._slots[slot].add(entry)
+        with cls._lock:
+            connection.matchmake_slot = slot
+            entry = MatchmakingEntry(connection)
+            entry.player_team_id = team
+            connection.matchmaking_entry = entry
+            cls._slots[slot].add(entry)
 
     @classmethod
     def cancel_matchmake(cls, connection: Connection) -> None:
         """Cancel matchmaking for connection"""
+        with cls._lock:
+            cls._cancel(connection)
+
+    @classmethod
+    def _cancel(cls, connection: Connection) -> None:
+        """Cancel matchmaking for connection and its team, must hold the lock"""
         slot = connection.matchmake_slot
         if slot in cls._slots:
             connection.matchmake_slot = -1
@@ -94,9 +121,8 @@ class Matchmaking:
                         session = Sessions.get_session(member.account_id)
                         if session:
                             session.connection.matchmaking_entry.player_team_id = -1
-                            cls.cancel_matchmake(session.connection)
-                            cancelled_msg = MatchMakingCancelledMessage()
-                            session.connection.send(cancelled_msg)
+                            cls._cancel(session.connection)
+                    Sessions.broadcast_to_team(team, MatchMakingCancelledMessage())
                     team.team_updated()
 
 class MatchmakingSlot:
@@ -173,8 +199,7 @@ class MatchmakingSlot:
                 status_msg.max = self.players_required
                 status_msg.show_tips = True
 
-                for entry in self.queue:
-                    entry.connection.send(status_msg)
+                Processor.broadcast([entry.connection for entry in self.queue], status_msg)
 
         except Exception as e:
             print(f"Error in matchmaking slot update: {e}")
@@ -197,7 +222,7 @@ class MatchmakingSlot:
 
             # Start battle
             battle.add_game_objects()
-            battle.start()
+            Battles.start(battle)
 
         except Exception as e:
             print(f"Error starting game: {e}")
@@ -0,0 +1,114 @@
+"""
+In-memory sorted leaderboard
+Keeps entries ordered by score so top-N and rank lookups never touch the database
+"""
+
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+
+
+class LeaderboardEntry:
+    """Narrow leaderboard row (player or alliance)"""
+
+    def __init__(self, entry_id: int, score: int, name: str = "", thumbnail_id: int = 0, named: bool = True):
+        """Initialize entry; named is False while name and thumbnail are still unknown"""
+        self.account_id = entry_id
+        self.score = score
+        self.name = name
+        self.thumbnail_id = thumbnail_id
+        self.named = named
+
+    @property
+    def trophies(self) -> int:
+        """Score under the name encoders already read"""
+        return self.score
+
+    def __repr__(self) -> str:
+        """Developer representation"""
+        return f"LeaderboardEntry(id={self.account_id}, score={self.score}, name='{self.name}')"
+
+
+class RankedBoard:
+    """Entries sorted by score descending, ties broken by lower id first"""
+
+    def __init__(self, capacity: int = 0):
+        """Initialize empty board; with a capacity only the best capacity entries are kept"""
+        # Sorted (-score, id) keys; bisect gives O(log n) position lookups
+        self._keys: List[Tuple[int, int]] = []
+        self._entries: Dict[int, LeaderboardEntry] = {}
+        self._lock = threading.Lock()
+        self.capacity = capacity
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def update(self, entry_id: int, score: int, name: Optional[str] = None,
+               thumbnail_id: Optional[int] = None) -> bool:
+        """Insert entry or move it to its new score; True when the board changed"""
+        with self._lock:
+            entry = self._entries.get(entry_id)
+            if entry is None:
+                key = (-score, entry_id)
+                if self.capacity and len(self._keys) >= self.capacity and key > self._keys[-1]:
+                    return False
+                entry = LeaderboardEntry(entry_id, score, name or "", thumbnail_id or 0, name is not None)
+                self._entries[entry_id] = entry
+                insort(self._keys, key)
+                if self.capacity and len(self._keys) > self.capacity:
+                    # Make room by dropping the lowest entry
+                    _, dropped_id = self._keys.pop()
+                    del self._entries[dropped_id]
+                return True
+
+            changed = False
+            if entry.score != score:
+                self._remove_key(entry.score, entry_id)
+                entry.score = score
+                insort(self._keys, (-score, entry_id))
+                changed = True
+            if name is not None and (name != entry.name or not entry.named):
+                entry.name = name
+                entry.named = True
+                changed = True
+            if thumbnail_id is not None and thumbnail_id != entry.thumbnail_id:
+                entry.thumbnail_id = thumbnail_id
+                changed = True
+            return changed
+
+    def remove(self, entry_id: int) -> None:
+        """Remove entry from board"""
+        with self._lock:
+            entry = self._entries.pop(entry_id, None)
+            if entry is not None:
+                self._remove_key(entry.score, entry_id)
+
+    def _remove_key(self, score: int, entry_id: int) -> None:
+        """Delete a sort key, caller holds the lock"""
+        key = (-score, entry_id)
+        index = bisect_left(self._keys, key)
+        if index < len(self._keys) and self._keys[index] == key:
+            del self._keys[index]
+
+    def top(self, count: int) -> List[LeaderboardEntry]:
+        """Best count entries, highest score first"""
+        with self._lock:
+            return [self._entries[entry_id] for _, entry_id in self._keys[:count]]
+
+    def get_rank(self, entry_id: int) -> int:
+        """1-based rank of entry, 0 if it is not on the board"""
+        with self._lock:
+            entry = self._entries.get(entry_id)
+            if entry is None:
+                return 0
+            return bisect_left(self._keys, (-entry.score, entry_id)) + 1
+
+    def get(self, entry_id: int) -> Optional[LeaderboardEntry]:
+        """Get entry by id"""
+        return self._entries.get(entry_id)
+
+    def clear(self) -> None:
+        """Remove every entry"""
+        with self._lock:
+            self._keys.clear()
+            self._entries.clear()
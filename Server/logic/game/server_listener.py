@@ -34,5 +34,5 @@ class ServerListener(LogicServerListener):
         return None
 
     def is_player_online(self, account_id: int) -> bool:
-        """Check if player is online"""
-        return Sessions.is_session_active(account_id)
+        """Check if player is online, on any worker process"""
+        return Sessions.is_online_anywhere(account_id)
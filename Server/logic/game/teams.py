@@ -4,6 +4,7 @@ Team management system
 """
 
 import random
+import threading
 from typing import Dict, List, Optional
 from dataclasses import dataclass
 
@@ -22,7 +23,9 @@ from logic.team.team_entry import TeamEntry
 from logic.team.team_member import TeamMember
 from logic.util.game_mode_util import GameModeUtil
 from networking.connection import Connection
+from networking.ipc_broker import BrokerClient
 from networking.session.sessions import Sessions
+from message.processor import Processor
 from networking.udp_gateway import UDPGateway
 from .battles import Battles
 from .matchmaking import Matchmaking, MatchmakingSlot
@@ -33,11 +36,15 @@ class Teams:
     _entries: Dict[int, TeamEntry] = {}
     _team_id_counter: int = 0
 
+    # Members of one team may sit on different receive shards, so team changes are serialized here
+    _lock = threading.RLock()
+
     @classmethod
     def init(cls) -> None:
         """Initialize teams system"""
-        cls._entries = {}
-        cls._team_id_counter = 0
+        with cls._lock:
+            cls._entries = {}
+            cls._team_id_counter = 0
 
     @classmethod
     def get_count(cls) -> int:
@@ -48,43 +55,50 @@ class Teams:
     def create(cls) -> TeamEntry:
         """Create new team"""
         entry = TeamEntry()
-        cls._team_id_counter += 1
-        entry.id = cls._team_id_counter
-        cls._entries[entry.id] = entry
+        team_id = BrokerClient.call("next_team_id") if BrokerClient.is_connected() else None
+        with cls._lock:
+            if team_id is None:
+                cls._team_id_counter += 1
+                team_id = cls._team_id_counter
+            entry.id = team_id
+            cls._entries[entry.id] = entry
         return entry
 
     @classmethod
     def remove(cls, team_id: int) -> None:
         """Remove team by ID"""
-        cls._entries.pop(team_id, None)
+        with cls._lock:
+            cls._entries.pop(team_id, None)
 
     @classmethod
     def get(cls, team_id: int) -> Optional[TeamEntry]:
-        """Get team by ID"""
+        """Get team by ID; a single dict lookup needs no lock, and Matchmaking calls this while
+        holding its own lock, which start_game takes inside this one"""
         return cls._entries.get(team_id)
 
     @classmethod
     def start_game(cls, team: TeamEntry) -> None:
         """Start game for team"""
         try:
-            if team.type == 0:  # Matchmaking
-                cls._start_matchmaking_game(team)
-            elif team.type == 1:  # Friendly battle
-                cls._start_friendly_game(team)
+            with cls._lock:
+                if team.type == 0:  # Matchmaking
+                    cls._start_matchmaking_game(team)
+                elif team.type == 1:  # Friendly battle
+                    cls._start_friendly_game(team)
         except Exception as e:
             print(f"Error starting team game: {e}")
 
     @classmethod
     def _start_matchmaking_game(cls, team: TeamEntry) -> None:
         """Start matchmaking game for team"""
-        for member in team.members:
-            connection = Sessions.get_session(member.account_id).connection
-            if connection:
-                starting_msg = TeamGameStartingMessage()
-                starting_msg.location_id = team.location_id
-                connection.send(starting_msg)
+        starting_msg = TeamGameStartingMessage()
+        starting_msg.location_id = team.location_id
+        Sessions.broadcast_to_team(team, starting_msg)
 
-                Matchmaking.request_matchmake(connection, team.event_slot, team.id)
+        for member in team.members:
+            session = Sessions.get_session(member.account_id)
+            if session:
+                Matchmaking.request_matchmake(session.connection, team.event_slot, team.id)
                 member.is_ready = False
 
     @classmethod
@@ -102,10 +116,7 @@ class Teams:
             server_cmd_msg = AvailableServerCommandMessage()
             server_cmd_msg.command = notification_cmd
 
-            for member in team.members:
-                session = Sessions.get_session(member.account_id)
-                if session:
-                    session.connection.send(server_cmd_msg)
+            Sessions.broadcast_to_team(team, server_cmd_msg)
             return
 
         # Create battle
@@ -162,7 +173,7 @@ class Teams:
             battle.dummy = loading_msg
 
         battle.add_game_objects()
-        battle.start()
+        Battles.start(battle)
 
     @classmethod
     def _add_friendly_bots(cls, battle: BattleMode, team: TeamEntry, entries: List) -> None:
@@ -4,7 +4,7 @@ Helper class for byte stream operations
 """
 
 import struct
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 class ByteStreamHelper:
     """Helper class for byte stream operations"""
@@ -206,28 +206,46 @@ class ByteStreamHelper:
         data = stream.read(length)
         return data if len(data) == length else b""
 
+    @staticmethod
+    def write_v_int_array(stream, values: List[int]) -> None:
+        """Write count-prefixed variable-length integer array in one pass"""
+        stream.write_v_int_array(values)
+
+    @staticmethod
+    def read_v_int_array(stream) -> List[int]:
+        """Read count-prefixed variable-length integer array in one pass"""
+        return stream.read_v_int_array()
+
     @staticmethod
     def write_int_array(stream, values: List[int]) -> None:
         """Write integer array to stream"""
-        if values is None:
-            ByteStreamHelper.write_v_int(stream, 0)
-        else:
-            ByteStreamHelper.write_v_int(stream, len(values))
-            for value in values:
-                ByteStreamHelper.write_v_int(stream, value)
+        ByteStreamHelper.write_v_int_array(stream, values)
 
     @staticmethod
     def read_int_array(stream) -> List[int]:
         """Read integer array from stream"""
-        length = ByteStreamHelper.read_v_int(stream)
-        if length <= 0:
-            return []
+        return ByteStreamHelper.read_v_int_array(stream)
 
-        result = []
-        for i in range(length):
-            result.append(ByteStreamHelper.read_v_int(stream))
+    @staticmethod
+    def get_data_reference_values(data) -> Tuple[int, ...]:
+        """VInts of a data reference, for callers batching them with write_v_ints"""
+        global_id = data.get_global_id() if hasattr(data, 'get_global_id') else (data or 0)
+        if global_id <= 0:
+            return (0,)
+        return (global_id // 1000000, global_id % 1000000)
 
-        return result
+    @staticmethod
+    def write_data_reference(stream, data) -> None:
+        """Write a data reference: class id, then instance id unless empty; data is a LogicData or a global id"""
+        stream.write_v_ints(ByteStreamHelper.get_data_reference_values(data))
+
+    @staticmethod
+    def read_data_reference(stream) -> int:
+        """Read a data reference, returns its global id (0 for none)"""
+        class_id = stream.read_v_int()
+        if class_id <= 0:
+            return 0
+        return class_id * 1000000 + stream.read_v_int()
 
     @staticmethod
     def write_string_array(stream, values: List[str]) -> None:
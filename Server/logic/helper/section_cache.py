@@ -0,0 +1,71 @@
+"""
+Encoded-bytes cache for the sections of a home or avatar
+Re-sending OwnHomeData concatenates the cached sections instead of encoding them again
+"""
+
+from typing import Callable, Dict
+
+
+class SectionCache:
+    """Encoded bytes per named section of one object, dropped by invalidate"""
+
+    __slots__ = ("_sections", "_generation")
+
+    # Stats over all caches: section -> [hits, misses]
+    _counters: Dict[str, list] = {}
+    invalidations: int = 0
+
+    def __init__(self):
+        """Initialize empty cache"""
+        self._sections: Dict[str, bytes] = {}
+        self._generation = 0
+
+    def write(self, stream, section: str, encoder: Callable[[object], None]) -> None:
+        """Write the section to stream, running encoder(stream) only when it is not cached; the
+        encoder writes straight into stream and the bytes it appended are kept"""
+        counters = SectionCache._counters.get(section)
+        if counters is None:
+            counters = SectionCache._counters.setdefault(section, [0, 0])
+
+        data = self._sections.get(section)
+        if data is not None:
+            counters[0] += 1
+            stream.write(data)
+            return
+
+        counters[1] += 1
+        generation = self._generation
+        start = stream.get_length()
+        encoder(stream)
+        data = bytes(memoryview(stream.data)[start:stream.get_length()])
+
+        # A mutation while encoding may have raced the snapshot, keep it only if none happened
+        if generation == self._generation:
+            self._sections[section] = data
+
+    def invalidate(self, *sections: str) -> None:
+        """Drop the given sections, or every section when none are given"""
+        self._generation += 1
+        SectionCache.invalidations += 1
+        if not sections:
+            self._sections.clear()
+            return
+        for section in sections:
+            self._sections.pop(section, None)
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, object]:
+        """Hits, misses and hit rate overall and per section"""
+        hits = sum(counters[0] for counters in cls._counters.values())
+        misses = sum(counters[1] for counters in cls._counters.values())
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": (hits / total * 100) if total else 0.0,
+            "invalidations": cls.invalidations,
+            "sections": {
+                section: {"hits": counters[0], "misses": counters[1]}
+                for section, counters in sorted(cls._counters.items())
+            },
+        }
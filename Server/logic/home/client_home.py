@@ -7,10 +7,17 @@ from typing import Dict, List, Optional, Any
 from .structures.hero import Hero
 from .structures.player_map import PlayerMap
 from .structures.profile import Profile
+from ..helper.section_cache import SectionCache
 
 class ClientHome:
     """Client home class for home state management"""
 
+    # Encoded sections cached between OwnHomeData sends
+    SECTION_HEADER = "home.header"
+    SECTION_HEROES = "home.heroes"
+    SECTION_PROFILE = "home.profile"
+    SECTIONS = (SECTION_HEADER, SECTION_HEROES, SECTION_PROFILE)
+
     def __init__(self):
         """Initialize client home"""
         self.account_id = 0
@@ -83,6 +90,19 @@ class ClientHome:
         self.session_start_time = 0
         self.total_play_time = 0
 
+        # Set by mutations, cleared once the owning account is persisted
+        self.dirty = False
+        self.encode_cache = SectionCache()
+
+    def mark_dirty(self, *sections: str) -> None:
+        """Flag home as changed since the last save and drop the encoded sections (all when none given)"""
+        self.dirty = True
+        self.encode_cache.invalidate(*sections)
+
+    def clear_dirty(self) -> None:
+        """Clear changed flag after a save"""
+        self.dirty = False
+
     def get_account_id(self) -> int:
         """Get account ID"""
         return self.account_id
@@ -90,6 +110,7 @@ class ClientHome:
     def set_account_id(self, account_id: int) -> None:
         """Set account ID"""
         self.account_id = account_id
+        self.mark_dirty(self.SECTION_HEADER)
 
     def get_home_id(self) -> int:
         """Get home ID"""
@@ -98,6 +119,7 @@ class ClientHome:
     def set_home_id(self, home_id: int) -> None:
         """Set home ID"""
         self.home_id = home_id
+        self.mark_dirty(self.SECTION_HEADER)
 
     def get_player_name(self) -> str:
         """Get player name"""
@@ -106,6 +128,7 @@ class ClientHome:
     def set_player_name(self, name: str) -> None:
         """Set player name"""
         self.player_name = name
+        self.mark_dirty(self.SECTION_HEADER)
 
     def get_experience_level(self) -> int:
         """Get experience level"""
@@ -114,6 +137,7 @@ class ClientHome:
     def set_experience_level(self, level: int) -> None:
         """Set experience level"""
         self.experience_level = max(1, level)
+        self.mark_dirty(self.SECTION_HEADER)
 
     def get_trophies(self) -> int:
         """Get current trophies"""
@@ -124,12 +148,14 @@ class ClientHome:
         self.trophies = max(0, trophies)
         if self.trophies > self.highest_trophies:
             self.highest_trophies = self.trophies
+        self.mark_dirty(self.SECTION_HEADER)
 
     def add_hero(self, hero: Hero) -> None:
         """Add hero to collection"""
         self.heroes[hero.get_hero_id()] = hero
         if hero.get_hero_id() not in self.unlocked_heroes:
             self.unlocked_heroes.append(hero.get_hero_id())
+        self.mark_dirty(self.SECTION_HEROES)
 
     def get_hero(self, hero_id: int) -> Optional[Hero]:
         """Get hero by ID"""
@@ -151,12 +177,14 @@ class ClientHome:
         """Set selected hero"""
         if self.is_hero_unlocked(hero_id):
             self.selected_hero = hero_id
+            self.mark_dirty(self.SECTION_HEADER)
 
     def add_resources(self, gold: int = 0, diamonds: int = 0, tokens: int = 0) -> None:
         """Add resources"""
         self.gold += gold
         self.diamonds += diamonds
         self.big_box_tokens += tokens
+        self.mark_dirty(self.SECTION_HEADER)
 
     def spend_resources(self, gold: int = 0, diamonds: int = 0, tokens: int = 0) -> bool:
         """Spend resources if available"""
@@ -167,6 +195,7 @@ class ClientHome:
             self.gold -= gold
             self.diamonds -= diamonds
             self.big_box_tokens -= tokens
+            self.mark_dirty(self.SECTION_HEADER)
             return True
         return False
 
@@ -184,6 +213,7 @@ class ClientHome:
         else:
             self.defeats += 1
         self.total_damage_dealt += damage_dealt
+        self.mark_dirty()
 
     def get_battle_statistics(self) -> Dict[str, Any]:
         """Get battle statistics"""
@@ -205,12 +235,14 @@ class ClientHome:
         self.alliance_id = alliance_id
         self.alliance_name = alliance_name
         self.alliance_role = role
+        self.mark_dirty()
 
     def leave_alliance(self) -> None:
         """Leave alliance"""
         self.alliance_id = 0
         self.alliance_name = ""
         self.alliance_role = 0
+        self.mark_dirty()
 
     def update_session_time(self, current_time: int) -> None:
         """Update session and play time"""
@@ -220,36 +252,31 @@ class ClientHome:
         self.session_start_time = current_time
 
     def encode(self, stream) -> None:
-        """Encode client home to stream"""
+        """Encode client home to stream, reusing the sections encoded by a previous send"""
+        self.encode_cache.write(stream, self.SECTION_HEADER, self._encode_header)
+        self.encode_cache.write(stream, self.SECTION_HEROES, self._encode_heroes)
+        self.encode_cache.write(stream, self.SECTION_PROFILE, self.profile.encode)
+
+    def _encode_header(self, stream) -> None:
+        """Encode ids, name, progression and resources"""
         stream.write_v_long(self.account_id)
         stream.write_v_int(self.home_id)
         stream.write_string(self.player_name)
-        stream.write_v_int(self.experience_level)
-        stream.write_v_int(self.trophies)
-        stream.write_v_int(self.highest_trophies)
-        stream.write_v_int(self.gold)
-        stream.write_v_int(self.diamonds)
-        stream.write_v_int(self.selected_hero)
-
-        # Encode heroes
-        stream.write_v_int(len(self.heroes))
-        for hero in self.heroes.values():
-            hero.encode(stream)
+        stream.write_v_ints((self.experience_level, self.trophies, self.highest_trophies,
+                             self.gold, self.diamonds, self.selected_hero))
 
-        # Encode profile
-        self.profile.encode(stream)
+    def _encode_heroes(self, stream) -> None:
+        """Encode heroes in one pass"""
+        stream.write_v_int(len(self.heroes))
+        stream.write_v_ints([value for hero in self.heroes.values() for value in hero.get_encoding_values()])
 
     def decode(self, stream) -> None:
         """Decode client home from stream"""
         self.account_id = stream.read_v_long()
         self.home_id = stream.read_v_int()
         self.player_name = stream.read_string()
-        self.experience_level = stream.read_v_int()
-        self.trophies = stream.read_v_int()
-        self.highest_trophies = stream.read_v_int()
-        self.gold = stream.read_v_int()
-        self.diamonds = stream.read_v_int()
-        self.selected_hero = stream.read_v_int()
+        (self.experience_level, self.trophies, self.highest_trophies,
+         self.gold, self.diamonds, self.selected_hero) = stream.read_v_ints(6)
 
         # Decode heroes
         hero_count = stream.read_v_int()
@@ -261,6 +288,7 @@ class ClientHome:
 
         # Decode profile
         self.profile.decode(stream)
+        self.encode_cache.invalidate()
 
     def __str__(self) -> str:
         """String representation"""
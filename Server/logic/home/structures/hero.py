@@ -3,7 +3,7 @@ Python conversion of Supercell.Laser.Logic.Home.Structures.Hero.cs
 Hero class for character progression
 """
 
-from typing import Optional, TYPE_CHECKING
+from typing import Optional, Tuple, TYPE_CHECKING
 from ...helper.byte_stream_helper import ByteStreamHelper
 
 if TYPE_CHECKING:
@@ -172,15 +172,15 @@ class Hero:
         """Get total power points needed to max out"""
         return sum(self.UPGRADE_POWER_POINTS_TABLE)
 
+    def get_encoding_values(self) -> Tuple[int, ...]:
+        """VInts written by encode, so lists of heroes can be written in one pass"""
+        return (*ByteStreamHelper.get_data_reference_values(self.get_character_data()),
+                0,  # empty data reference
+                self.trophies, self.highest_trophies, self.power_level)
+
     def encode(self, stream) -> None:
         """Encode hero to stream"""
-        character_data = self.get_character_data()
-        ByteStreamHelper.write_data_reference(stream, character_data)
-        ByteStreamHelper.write_data_reference(stream, None)
-
-        stream.write_v_int(self.trophies)
-        stream.write_v_int(self.highest_trophies)
-        stream.write_v_int(self.power_level)
+        stream.write_v_ints(self.get_encoding_values())
 
     def decode(self, stream) -> None:
         """Decode hero from stream"""
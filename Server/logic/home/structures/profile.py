@@ -156,15 +156,12 @@ class Profile:
         # Selected hero
         ByteStreamHelper.write_data_reference(stream, self.hero)
 
-        # Heroes
+        # Heroes and stats, each written in one pass
         stream.write_v_int(len(self.heroes))
-        for hero in self.heroes:
-            hero.encode(stream)
+        stream.write_v_ints([value for hero in self.heroes for value in hero.get_encoding_values()])
 
-        # Stats
         stream.write_v_int(len(self.stats))
-        for stat in self.stats:
-            stat.encode(stream)
+        stream.write_v_ints([value for stat in self.stats for value in (stat.x, stat.y)])
 
         # Display data
         if self.display_data:
@@ -179,9 +176,9 @@ class Profile:
 
         # Profile string and values
         stream.write_string("str")   # Profile string
-        stream.write_v_int(100)      # Unknown value 1
-        stream.write_v_int(200)      # Unknown value 2
-        stream.write_v_int(0)        # v53 value
+        stream.write_v_ints((100,    # Unknown value 1
+                             200,    # Unknown value 2
+                             0))     # v53 value
 
         # Cosmetics
         ByteStreamHelper.write_data_reference(stream, self.hero_skin)
@@ -208,12 +205,8 @@ class Profile:
 
         # Stats
         stat_count = stream.read_v_int()
-        self.stats = []
-        for _ in range(stat_count):
-            stat = LogicVector2()
-            stat.x = stream.read_v_int()
-            stat.y = stream.read_v_int()
-            self.stats.append(stat)
+        values = stream.read_v_ints(stat_count * 2)
+        self.stats = [LogicVector2(values[i], values[i + 1]) for i in range(0, len(values), 2)]
 
         # Display data would be decoded here
         # For now, skip
@@ -4,15 +4,14 @@ Base game message class for all network messages
 """
 
 from abc import ABC, abstractmethod
-from typing import Optional
-from ..titan.datastream.byte_stream import ByteStream
+from titan.data_stream.byte_stream import ByteStream
 
 class GameMessage(ABC):
     """Base class for all game messages"""
 
     def __init__(self):
         """Initialize game message"""
-        self.stream = ByteStream(10)
+        self.stream = ByteStream()
         self._version = 0
 
     def encode(self) -> None:
@@ -53,15 +52,15 @@ class GameMessage(ABC):
 
     def get_encoding_length(self) -> int:
         """Get encoded message length"""
-        return self.stream.get_offset()
+        return self.stream.get_length()
 
     def reset_stream(self) -> None:
         """Reset the byte stream"""
-        self.stream = ByteStream(10)
+        self.stream = ByteStream()
 
     def is_encoded(self) -> bool:
         """Check if message has been encoded"""
-        return self.stream.get_offset() > 0
+        return self.get_encoding_length() > 0
 
     def __str__(self) -> str:
         """String representation"""
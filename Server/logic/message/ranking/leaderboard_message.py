@@ -17,12 +17,13 @@ class LeaderboardMessage(GameMessage):
     def __init__(self):
         """Initialize leaderboard message"""
         super().__init__()
-        self.leaderboard_type = 1  # 0=hero, 1=global
+        self.leaderboard_type = 1  # 0=hero, 1=global, 2=club
         self.avatars = []  # List of (home, avatar) pairs
         self.alliance_list = []  # List of alliances
         self.own_avatar_id = 0
         self.region = ""
         self.hero_data_id = 0
+        self.own_rank = 0  # Rank of own avatar when it is outside the sent list
 
     def get_message_type(self) -> int:
         """Get message type ID"""
@@ -56,6 +57,10 @@ class LeaderboardMessage(GameMessage):
         """Set hero data ID for hero leaderboards"""
         self.hero_data_id = hero_id
 
+    def set_own_rank(self, rank: int) -> None:
+        """Set own rank from the leaderboard index"""
+        self.own_rank = rank
+
     def get_player_index(self) -> int:
         """Get own player index in leaderboard"""
         for i, (home, avatar) in enumerate(self.avatars):
@@ -68,10 +73,8 @@ class LeaderboardMessage(GameMessage):
         player_index = 0
 
         # Write header
-        self.stream.write_v_int(self.leaderboard_type)
-        self.stream.write_v_int(0)  # Unknown field
-        # ByteStreamHelper.WriteDataReference(Stream, HeroDataId)
-        self.stream.write_v_int(self.hero_data_id)  # Simplified
+        # ByteStreamHelper.WriteDataReference(Stream, HeroDataId) is simplified to the raw id
+        self.stream.write_v_ints((self.leaderboard_type, 0, self.hero_data_id))
         self.stream.write_string(self.region)
 
         if self.leaderboard_type == 1:  # Global leaderboard
@@ -84,16 +87,16 @@ class LeaderboardMessage(GameMessage):
 
                 # Write avatar data (simplified)
                 self.stream.write_v_long(getattr(avatar, 'account_id', 0))
-                self.stream.write_v_int(1)  # Status
-                self.stream.write_v_int(i)  # Rank
+                self.stream.write_v_ints((1,   # Status
+                                          i))  # Rank
 
                 self.stream.write_boolean(True)
                 self.stream.write_string("")  # Empty string
                 self.stream.write_string(getattr(avatar, 'name', 'NoName'))
-                self.stream.write_v_int(100)  # Experience level
-                self.stream.write_v_int(getattr(home, 'thumbnail_id', 43000000))
-                self.stream.write_v_int(43000000)  # Default thumbnail
-                self.stream.write_v_int(0)
+                self.stream.write_v_ints((100,  # Experience level
+                                          getattr(home, 'thumbnail_id', 43000000),
+                                          43000000,  # Default thumbnail
+                                          0))
                 self.stream.write_boolean(False)
 
         elif self.leaderboard_type == 0:  # Hero leaderboard
@@ -113,36 +116,43 @@ class LeaderboardMessage(GameMessage):
                     hero = avatar.get_hero(self.hero_data_id)
                     if hero:
                         hero_trophies = getattr(hero, 'trophies', 0)
+                elif hasattr(avatar, 'score'):
+                    # Leaderboard entries already carry the brawler score
+                    hero_trophies = avatar.score
 
                 self.stream.write_v_int(hero_trophies)
 
                 self.stream.write_boolean(True)
                 self.stream.write_string("")
                 self.stream.write_string(getattr(avatar, 'name', 'NoName'))
-                self.stream.write_v_int(100)
-                self.stream.write_v_int(getattr(home, 'thumbnail_id', 43000000))
-                self.stream.write_v_int(43000000)
-                self.stream.write_v_int(0)
+                self.stream.write_v_ints((100, getattr(home, 'thumbnail_id', 43000000), 43000000, 0))
                 self.stream.write_boolean(False)
 
+        elif self.leaderboard_type == 2:  # Club leaderboard
+            self.stream.write_v_int(len(self.alliance_list))
+
+            for i, alliance in enumerate(self.alliance_list):
+                self.stream.write_v_long(getattr(alliance, 'account_id', getattr(alliance, 'id', 0)))
+                self.stream.write_v_ints((1, getattr(alliance, 'trophies', 0)))
+
+                self.stream.write_boolean(True)
+                self.stream.write_string(getattr(alliance, 'name', ''))
+                self.stream.write_v_ints((0,  # Member count
+                                          getattr(alliance, 'badge_id', 8000000)))
+
         # Write footer
-        self.stream.write_v_int(0)
-        self.stream.write_v_int(player_index)
-        self.stream.write_v_int(0)
-        self.stream.write_v_int(0)
+        self.stream.write_v_ints((0, player_index or self.own_rank, 0, 0))
         self.stream.write_string("BS")
 
     def decode(self) -> None:
         """Decode message from stream"""
         # Simplified decoding
-        self.leaderboard_type = self.stream.read_v_int()
-        self.stream.read_v_int()  # Skip unknown
-        self.hero_data_id = self.stream.read_v_int()
+        self.leaderboard_type, _, self.hero_data_id = self.stream.read_v_ints(3)
         self.region = self.stream.read_string()
 
         # Skip rest of data for now
 
     def __str__(self) -> str:
         """String representation"""
-        lb_type = "hero" if self.leaderboard_type == 0 else "global"
+        lb_type = {0: "hero", 1: "global", 2: "club"}.get(self.leaderboard_type, "global")
         return f"LeaderboardMessage({lb_type}, {len(self.avatars)} players, region='{self.region}')"
@@ -34,6 +34,7 @@ from logic.time.game_time import GameTime
 from logic.data.data_tables import DataTables
 from logic.avatar.client_avatar import ClientAvatar
 from logic.home.client_home import ClientHome
+from logic.helper.section_cache import SectionCache
 from logic.battle.battle_mode import BattleMode
 from logic.club.alliance import Alliance
 from logic.message.server_message_factory import ServerMessageFactory
@@ -41,6 +42,15 @@ from logic.command.command_manager import CommandManager
 from logic.listener.logic_game_listener import LogicGameListener
 from logic.listener.logic_server_listener import LogicServerListener
 
+from database.connection_pool import DatabasePool
+from database.async_db import AsyncDatabase
+from database.cache.account_cache import AccountCache
+from database.cache.alliance_cache import AllianceCache
+from database.batch_writer import BatchWriter
+from logic.game.leaderboards import Leaderboards
+from logic.game.battles import Battles
+from logic.battle.object.game_object_factory import GameObjectFactory
+
 class Configuration:
     """Configuration manager using Titan JSON system"""
     _config = None
@@ -156,6 +166,8 @@ class DatabaseManager:
     @classmethod
     def shutdown(cls):
         """Shutdown database"""
+        AsyncDatabase.shutdown()
+        DatabasePool.shutdown()
         Debugger.info("Database connections closed")
 
 class GameLogicManager:
@@ -497,6 +509,57 @@ class CommandHandler:
             network_status = "Running" if self.program.network_manager.running else "Stopped"
             print(f"Network Status: {network_status}")
 
+        pool = DatabasePool.get_metrics()
+        if pool:
+            print(f"DB Pool: {pool['in_use']}/{pool['size']} in use, {pool['idle']} idle, "
+                  f"{pool['checkouts']} checkouts, {pool['timeouts']} timeouts, {pool['reconnects']} reconnects")
+            print(f"DB Pool Wait: avg {pool['avg_wait_ms']:.2f} ms, max {pool['max_wait_ms']:.2f} ms")
+
+        print(f"Account Cache: {AccountCache.count} cached, {AccountCache.get_dirty_count()} dirty")
+        for name, cache in (("Account", AccountCache.get_cache_metrics()), ("Alliance", AllianceCache.get_cache_metrics())):
+            print(f"{name} Cache: {cache['size']}/{cache['max_size']} entries, {cache['hits']} hits, "
+                  f"{cache['misses']} misses ({cache['hit_rate']:.1f}% hit rate), {cache['evictions']} evictions")
+        print(f"Account Flush: last {AccountCache.last_flush_count} accounts ({AccountCache.last_flush_bytes} bytes), "
+              f"total {AccountCache.total_flush_count} accounts ({AccountCache.total_flush_bytes} bytes)")
+        print(f"Batch Writes: {BatchWriter.batches_written} batches, {BatchWriter.batches_retried} retries, "
+              f"{BatchWriter.rows_failed} failed rows")
+
+        sections = SectionCache.get_stats()
+        print(f"Home Encode Cache: {sections['hits']} hits, {sections['misses']} misses "
+              f"({sections['hit_rate']:.1f}% hit rate), {sections['invalidations']} invalidations")
+
+        ticks = Battles.get_metrics()
+        print(f"Battle Ticks: {ticks['battles']} battles at {ticks['tick_rate']} Hz on {len(ticks['workers'])} threads, "
+              f"{ticks['frames']} frames, avg {ticks['avg_frame_ms']:.2f} ms, max {ticks['max_frame_ms']:.2f} ms, "
+              f"{ticks['overruns']} overruns, {ticks['skipped_ticks']} skipped ticks, "
+              f"max lateness {ticks['max_lateness_ms']:.2f} ms, {ticks['dropped_inputs']} dropped inputs, "
+              f"{ticks['unhandled_inputs']} inputs for battles without input handling")
+        processes = ticks['processes']
+        if processes['processes']:
+            loads = ", ".join(f"{worker['battles']}@{worker['avg_frame_ms']:.2f}ms" for worker in processes['workers'])
+            print(f"Battle Workers: {processes['battles']} battles on {processes['processes']} processes ({loads}), "
+                  f"{processes['shipped']} shipped, {processes['ship_failures']} kept in-process, "
+                  f"{processes['dropped_inputs']} dropped inputs, {processes['output_drops']} dropped sends, "
+                  f"{processes['worker_deaths']} worker deaths")
+
+        pool = GameObjectFactory.get_pool_stats()
+        print(f"Object Pool: {pool['allocated']} built, {pool['reused']} reused, {pool['recycled']} recycled, "
+              f"{pool['pooled']} waiting")
+
+        boards = Leaderboards.get_metrics()
+        print(f"Leaderboards: {boards['global']} players, {boards['brawler_boards']} brawler boards, "
+              f"{boards['alliances']} clubs")
+
+        queue = AccountCache.get_write_queue_metrics()
+        if queue:
+            print(f"Write Queue: depth {queue['depth']} (max {queue['max_depth']}), {queue['enqueued']} enqueued, "
+                  f"{queue['coalesced']} coalesced, {queue['rejected']} rejected, {queue['written']} written")
+
+        for name, latency in AsyncDatabase.get_metrics().items():
+            print(f"DB {name}: {latency['count']} calls, {latency['errors']} errors, avg {latency['avg_ms']:.2f} ms, "
+                  f"p50 {latency['p50_ms']:.1f} ms, p95 {latency['p95_ms']:.1f} ms, p99 {latency['p99_ms']:.1f} ms, "
+                  f"max {latency['max_ms']:.2f} ms")
+
     def show_version(self, *args):
         """Show version information"""
         try:
@@ -0,0 +1,46 @@
+"""
+Pre-encoded message shared by every recipient of a broadcast
+"""
+
+from logic.message.game_message import GameMessage
+from networking.frame_buffer import encode_header
+
+
+class EncodedMessage:
+    """Immutable snapshot of an encoded GameMessage; stands in for it in send queues"""
+
+    __slots__ = ("message_type", "version", "payload", "header", "name")
+
+    def __init__(self, message: GameMessage):
+        """Encode message once and keep its payload and plaintext frame header"""
+        if message.get_encoding_length() == 0:
+            message.encode()
+
+        self.message_type = message.get_message_type()
+        self.version = message.get_version()
+        self.payload = bytes(message.get_message_bytes())
+        self.header = encode_header(self.message_type, len(self.payload), self.version)
+        self.name = message.__class__.__name__
+
+    def encode(self) -> None:
+        """Already encoded"""
+
+    def get_message_type(self) -> int:
+        """Get message type ID"""
+        return self.message_type
+
+    def get_version(self) -> int:
+        """Get message version"""
+        return self.version
+
+    def get_message_bytes(self) -> bytes:
+        """Encoded payload, shared between recipients"""
+        return self.payload
+
+    def get_encoding_length(self) -> int:
+        """Payload length"""
+        return len(self.payload)
+
+    def __str__(self) -> str:
+        """String representation"""
+        return f"EncodedMessage({self.name}, type={self.message_type}, {len(self.payload)} bytes)"
@@ -25,14 +25,19 @@ from logic.message.battle.match_making_cancelled_message import MatchMakingCance
 from logic.message.home.go_home_message import GoHomeMessage
 from logic.message.home.change_avatar_name_message import ChangeAvatarNameMessage
 from logic.message.home.available_server_command_message import AvailableServerCommandMessage
+from logic.message.home.get_player_profile_message import GetPlayerProfileMessage
+from logic.message.home.player_profile_message import PlayerProfileMessage
+from logic.message.ranking.get_leaderboard_message import GetLeaderboardMessage
+from logic.message.ranking.leaderboard_message import LeaderboardMessage
 from logic.command.avatar.logic_change_avatar_name_command import LogicChangeAvatarNameCommand
+from logic.command.command_manager import CommandManager
 from database.accounts import Accounts
 from database.alliances import Alliances
-from database.cache.account_cache import AccountCache
 from logic.game.events import Events
 from logic.game.matchmaking import Matchmaking
 from logic.game.battles import Battles
 from logic.game.teams import Teams
+from logic.game.leaderboards import Leaderboards
 from networking.session.sessions import Sessions
 from settings.configuration import Configuration
 from utils.helpers import Helpers
@@ -45,6 +50,7 @@ class MessageManager:
         """Initialize message manager"""
         self.connection = connection
         self.home_mode: Optional[HomeMode] = None
+        self.command_manager = CommandManager()
         self.last_keep_alive = datetime.utcnow()
 
     def is_alive(self) -> bool:
@@ -78,6 +84,10 @@ class MessageManager:
                 self._matchmake_request_received(message)
             elif message_type == 14106:
                 self._cancel_matchmaking_received(message)
+            elif message_type == 14403:
+                self._get_leaderboard_received(message)
+            elif message_type == 14113:
+                self._get_player_profile_received(message)
             # Add more message handlers as needed
             else:
                 Logger.print_log(f"MessageManager::ReceiveMessage - no case for {message.__class__.__name__} ({message_type})")
@@ -132,10 +142,14 @@ class MessageManager:
             # Load or create account
             account = None
             if message.account_id == 0:
+                # create() already inserted the new row, nothing else to flush
                 account = Accounts.create()
-                AccountCache.save_all()
-            else:
+            elif Sessions.claim(message.account_id):
                 account = Accounts.load(message.account_id)
+            else:
+                # Another worker still holds unwritten changes of this account
+                self.connection.send(AuthenticationFailedMessage(error_code=10))
+                return
 
             if not account:
                 self.connection.send(AuthenticationFailedMessage(
@@ -204,10 +218,13 @@ class MessageManager:
             if not self.home_mode:
                 return
 
+            avatar = self.home_mode.avatar
             command = LogicChangeAvatarNameCommand()
-            command.name = message.name
-            command.change_name_cost = 0
-            command.execute(self.home_mode)
+            command.set_new_name(message.name)
+            command.set_account_id(avatar.account_id)
+            # Flags the avatar and home for the next flush, dropping only the sections the command lists
+            if not self.command_manager.execute_command(command, avatar, self.home_mode.home):
+                return
 
             server_command = AvailableServerCommandMessage()
             server_command.command = command
@@ -248,6 +265,55 @@ class MessageManager:
         except Exception as e:
             Logger.error(f"Error canceling matchmaking: {e}")
 
+    def _get_leaderboard_received(self, message: GetLeaderboardMessage) -> None:
+        """Handle leaderboard request from the in-memory boards"""
+        try:
+            own_id = self.home_mode.avatar.account_id if self.home_mode else 0
+
+            response = LeaderboardMessage()
+            response.set_own_avatar_id(own_id)
+            response.set_region(message.get_country_code())
+
+            if message.is_club_leaderboard():
+                response.set_leaderboard_type(2)
+                for entry in Leaderboards.get_alliance_ranking_list():
+                    response.add_alliance(entry)
+            elif message.get_character_id() > 0:
+                hero_data_id = message.get_character_id()
+                response.set_leaderboard_type(0)
+                response.set_hero_data_id(hero_data_id)
+                for entry in Leaderboards.get_brawler_ranking_list(hero_data_id):
+                    response.add_avatar(entry, entry)
+                response.set_own_rank(Leaderboards.get_brawler_rank(hero_data_id, own_id))
+            else:
+                response.set_leaderboard_type(1)
+                for entry in Leaderboards.get_avatar_ranking_list():
+                    response.add_avatar(entry, entry)
+                response.set_own_rank(Leaderboards.get_avatar_rank(own_id))
+
+            self.connection.send(response)
+
+        except Exception as e:
+            Logger.error(f"Error getting leaderboard: {e}")
+
+    def _get_player_profile_received(self, message: GetPlayerProfileMessage) -> None:
+        """Handle profile request, the viewed account's home is never decoded"""
+        try:
+            if not message.is_valid_request():
+                return
+
+            account = Accounts.load_view(message.get_player_id())
+            if not account:
+                return
+
+            response = PlayerProfileMessage()
+            response.set_player_id(account.account_id)
+            response.set_player_avatar(account.avatar)
+            self.connection.send(response)
+
+        except Exception as e:
+            Logger.error(f"Error getting player profile: {e}")
+
     # Add more message handlers as needed...
 
     def _handle_team_messages(self, message_type: int, message: GameMessage) -> None:
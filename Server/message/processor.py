@@ -5,12 +5,16 @@ Message processing queue system
 
 import threading
 import time
-from queue import Queue
-from typing import NamedTuple
+from collections import deque
+from queue import Empty, Full, Queue
+from typing import Any, Deque, Dict, Iterable, List, NamedTuple, Optional
 from dataclasses import dataclass
 
 from networking.connection import Connection
 from logic.message.game_message import GameMessage
+from message.encoded_message import EncodedMessage
+from message.send_queue import SendQueue
+from settings.configuration import Configuration
 from logger import Logger
 
 @dataclass
@@ -19,35 +23,115 @@ class QueueItem:
     connection: Connection
     message: GameMessage
 
+class ReceiveShard:
+    """One message-handling thread; every message of a connection lands on the same shard, in order"""
+
+    def __init__(self, index: int, capacity: int):
+        """Initialize queue and counters"""
+        self.index = index
+        self.queue: Queue = Queue(maxsize=capacity)
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self._run, name=f"Processor-{index}", daemon=True)
+
+        # Stats
+        self.processed: int = 0
+        self.dropped: int = 0
+        self.peak_depth: int = 0
+        self.max_handle_ms: float = 0.0
+
+    def put(self, item: QueueItem) -> bool:
+        """Queue an item; False when the shard is full"""
+        try:
+            self.queue.put_nowait(item)
+        except Full:
+            self.dropped += 1
+            return False
+        depth = self.queue.qsize()
+        if depth > self.peak_depth:
+            self.peak_depth = depth
+        return True
+
+    def stop(self) -> None:
+        """Ask the thread to finish the queued messages and exit; never blocks on a full queue"""
+        self.stopping.set()
+        try:
+            self.queue.put_nowait(None)
+        except Full:
+            pass  # _run exits once the queue runs dry
+
+    def _run(self) -> None:
+        """Handle messages until a None sentinel arrives, or the queue is empty after stop()"""
+        while True:
+            try:
+                item: Optional[QueueItem] = self.queue.get(timeout=0.5)
+            except Empty:
+                if self.stopping.is_set():
+                    return
+                continue
+            if item is None:
+                return
+
+            started = time.perf_counter()
+            try:
+                if item.connection and item.connection.message_manager:
+                    item.connection.message_manager.receive_message(item.message)
+            except Exception as e:
+                Logger.error(f"Error processing incoming message: {e}")
+
+            self.processed += 1
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if elapsed_ms > self.max_handle_ms:
+                self.max_handle_ms = elapsed_ms
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Depth and counters of this shard"""
+        return {
+            "depth": self.queue.qsize(),
+            "peak_depth": self.peak_depth,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "max_handle_ms": self.max_handle_ms,
+        }
+
 class Processor:
     """Static class for processing messages"""
 
-    _incoming_queue: Queue = Queue(maxsize=1024)
-    _outgoing_queue: Queue = Queue(maxsize=1024)
+    # Messages one connection may send before the next connection gets its turn
+    SEND_QUANTUM = 32
+
+    # Incoming messages are sharded by connection so one player's slow handler only delays that shard
+    _shards: List[ReceiveShard] = []
+
+    # Connections with queued output; urgent ones have realtime messages waiting
+    _send_lock: threading.Lock = threading.Lock()
+    _ready: Deque[Connection] = deque()
+    _urgent: Deque[Connection] = deque()
+    _dropped: List[int] = [0, 0, 0]
 
-    _receive_event: threading.Event = threading.Event()
     _send_event: threading.Event = threading.Event()
 
-    _receive_thread: threading.Thread = None
     _send_thread: threading.Thread = None
     _running: bool = False
 
     @classmethod
     def init(cls) -> None:
         """Initialize message processor"""
-        cls._incoming_queue = Queue(maxsize=1024)
-        cls._outgoing_queue = Queue(maxsize=1024)
+        config = Configuration.instance
+        cls._shards = [ReceiveShard(index, config.message_worker_queue_size)
+                       for index in range(max(1, config.message_worker_threads))]
+        cls._ready = deque()
+        cls._urgent = deque()
+        cls._dropped = [0, 0, 0]
 
-        cls._receive_event = threading.Event()
         cls._send_event = threading.Event()
 
         cls._running = True
 
         # Start processing threads
-        cls._receive_thread = threading.Thread(target=cls._update_receive, daemon=True)
         cls._send_thread = threading.Thread(target=cls._update_send, daemon=True)
 
-        cls._receive_thread.start()
+        for shard in cls._shards:
+            shard.thread.start()
         cls._send_thread.start()
 
     @classmethod
@@ -57,12 +141,10 @@ class Processor:
             return False
 
         try:
-            if cls._incoming_queue.full():
-                Logger.print_log(f"Processor: Incoming message queue full. Message of type {message.get_message_type()} discarded.")
+            shard = cls._shards[connection.connection_id % len(cls._shards)]
+            if not shard.put(QueueItem(connection, message)):
+                Logger.print_log(f"Processor: Incoming queue of shard {shard.index} full. Message of type {message.get_message_type()} discarded.")
                 return False
-
-            cls._incoming_queue.put_nowait(QueueItem(connection, message))
-            cls._receive_event.set()
             return True
 
         except Exception as e:
@@ -71,71 +153,154 @@ class Processor:
 
     @classmethod
     def send(cls, connection: Connection, message: GameMessage) -> None:
-        """Queue outgoing message for sending"""
-        if not message:
+        """Queue outgoing message in the connection's send queue"""
+        if not message or not connection:
             return
 
         try:
-            if cls._outgoing_queue.full():
-                Logger.print_log(f"Processor: Outgoing message queue full. Message of type {message.get_message_type()} discarded.")
-                return
+            lane = SendQueue.get_lane(message)
+            with cls._send_lock:
+                if not cls._enqueue(connection, lane, message):
+                    return
 
-            cls._outgoing_queue.put_nowait(QueueItem(connection, message))
             cls._send_event.set()
 
         except Exception as e:
             Logger.error(f"Error queuing outgoing message: {e}")
 
     @classmethod
-    def _update_receive(cls) -> None:
-        """Process incoming messages"""
-        while cls._running:
-            try:
-                cls._receive_event.wait()
+    def broadcast(cls, connections: Iterable[Connection], message: GameMessage) -> int:
+        """Send one message to many connections; it is encoded once and every recipient shares the bytes.
+        Returns the number of connections it was queued for"""
+        if not message:
+            return 0
 
-                while not cls._incoming_queue.empty():
-                    try:
-                        item = cls._incoming_queue.get_nowait()
-                        if item.connection and item.connection.message_manager:
-                            item.connection.message_manager.receive_message(item.message)
-                    except Exception as e:
-                        Logger.error(f"Error processing incoming message: {e}")
+        try:
+            encoded = EncodedMessage(message)
+            lane = SendQueue.get_lane(encoded)
+            queued = 0
+            with cls._send_lock:
+                for connection in connections:
+                    if connection and connection.is_open and cls._enqueue(connection, lane, encoded):
+                        queued += 1
 
-                cls._receive_event.clear()
+            if queued:
+                cls._send_event.set()
+            return queued
 
-            except Exception as e:
-                Logger.error(f"Error in receive thread: {e}")
-                time.sleep(0.1)
+        except Exception as e:
+            Logger.error(f"Error broadcasting message: {e}")
+            return 0
+
+    @classmethod
+    def _enqueue(cls, connection: Connection, lane: int, message: Any) -> bool:
+        """Push to a connection's send queue and schedule it; caller holds _send_lock"""
+        queue = connection.send_queue
+        if not queue.push(lane, message):
+            cls._dropped[lane] += 1
+            Logger.print_log(f"Processor: {SendQueue.LANE_NAMES[lane]} send queue of {connection} full. "
+                             f"Message of type {message.get_message_type()} discarded.")
+            return False
+
+        if lane == SendQueue.LANE_REALTIME and not queue.urgent_scheduled:
+            queue.urgent_scheduled = True
+            cls._urgent.append(connection)
+        if not queue.scheduled:
+            queue.scheduled = True
+            cls._ready.append(connection)
+        return True
+
+    @classmethod
+    def _next_send_batch(cls):
+        """Pick the next connection round-robin, urgent ones first, and take its batch"""
+        with cls._send_lock:
+            if cls._urgent:
+                connection = cls._urgent.popleft()
+                queue = connection.send_queue
+                queue.urgent_scheduled = False
+                batch = queue.pop_batch(cls.SEND_QUANTUM, realtime_only=True)
+                if queue.has_realtime():
+                    queue.urgent_scheduled = True
+                    cls._urgent.append(connection)
+            elif cls._ready:
+                connection = cls._ready.popleft()
+                queue = connection.send_queue
+                queue.scheduled = False
+                batch = queue.pop_batch(cls.SEND_QUANTUM)
+            else:
+                return None, None
+
+            # Rest waits for the next turn, behind everyone else
+            if len(queue) and not queue.scheduled:
+                queue.scheduled = True
+                cls._ready.append(connection)
+            return connection, batch
 
     @classmethod
     def _update_send(cls) -> None:
-        """Process outgoing messages"""
+        """Serve connections round-robin; one turn's messages leave in one write"""
         while cls._running:
             try:
                 cls._send_event.wait()
+                cls._send_event.clear()
+
+                while cls._running:
+                    connection, batch = cls._next_send_batch()
+                    if connection is None:
+                        break
+                    if not connection.is_open:
+                        with cls._send_lock:
+                            connection.send_queue.clear()
+                        continue
 
-                while not cls._outgoing_queue.empty():
                     try:
-                        item = cls._outgoing_queue.get_nowait()
-                        if item.connection and item.connection.messaging:
-                            item.connection.messaging.encrypt_and_write(item.message)
+                        for message in batch:
+                            connection.messaging.encrypt_and_write(message, flush=False)
                     except Exception as e:
                         Logger.error(f"Error processing outgoing message: {e}")
-
-                cls._send_event.clear()
+                    connection.flush()
 
             except Exception as e:
                 Logger.error(f"Error in send thread: {e}")
                 time.sleep(0.1)
 
+    @classmethod
+    def get_send_metrics(cls) -> Dict[str, Any]:
+        """Queued connections, depth per lane and drops since init"""
+        with cls._send_lock:
+            connections = list(cls._ready)
+            depth = [0, 0, 0]
+            deepest = 0
+            for connection in connections:
+                stats = connection.send_queue.get_stats()
+                for lane, name in enumerate(SendQueue.LANE_NAMES):
+                    depth[lane] += stats[name]["depth"]
+                deepest = max(deepest, len(connection.send_queue))
+
+            return {
+                "queued_connections": len(connections),
+                "urgent_connections": len(cls._urgent),
+                "max_queue_depth": deepest,
+                "depth": dict(zip(SendQueue.LANE_NAMES, depth)),
+                "dropped": dict(zip(SendQueue.LANE_NAMES, cls._dropped)),
+            }
+
+    @classmethod
+    def get_receive_metrics(cls) -> List[Dict[str, Any]]:
+        """Per-shard depth, processed/dropped counts and slowest handler"""
+        return [shard.get_stats() for shard in cls._shards]
+
     @classmethod
     def shutdown(cls) -> None:
         """Shutdown processor"""
         cls._running = False
-        cls._receive_event.set()
         cls._send_event.set()
 
-        if cls._receive_thread and cls._receive_thread.is_alive():
-            cls._receive_thread.join(timeout=5)
+        # Sentinels go behind queued messages so the shards finish what they have
+        for shard in cls._shards:
+            shard.stop()
+        for shard in cls._shards:
+            if shard.thread.is_alive():
+                shard.thread.join(timeout=5)
         if cls._send_thread and cls._send_thread.is_alive():
             cls._send_thread.join(timeout=5)
@@ -0,0 +1,110 @@
+"""
+Per-connection outgoing message queue
+Messages are split into priority lanes so keep-alives and battle traffic overtake bulk data
+"""
+
+from collections import deque
+from typing import Deque, Dict, List, Tuple
+
+from logic.message.game_message import GameMessage
+
+
+class SendQueue:
+    """Bounded FIFO per priority lane for one connection; guarded by the Processor send lock"""
+
+    LANE_REALTIME = 0  # keep-alive, login, matchmaking and battle
+    LANE_NORMAL = 1    # home, commands, teams
+    LANE_BULK = 2      # leaderboards, club and team streams, friend lists
+    LANE_NAMES: Tuple[str, ...] = ("realtime", "normal", "bulk")
+
+    _LANE_BY_TYPE: Dict[int, int] = {
+        20100: LANE_REALTIME,  # ServerHello
+        20103: LANE_REALTIME,  # AuthenticationFailed
+        20104: LANE_REALTIME,  # AuthenticationOk
+        20108: LANE_REALTIME,  # KeepAliveServer
+        20161: LANE_REALTIME,  # ShutdownStarted
+        20405: LANE_REALTIME,  # MatchMakingStatus
+        20406: LANE_REALTIME,  # MatchMakingCancelled
+        20559: LANE_REALTIME,  # StartLoading
+        23456: LANE_REALTIME,  # BattleEnd
+        24001: LANE_REALTIME,  # UdpConnectionInfo
+        24109: LANE_REALTIME,  # VisionUpdate
+        24360: LANE_REALTIME,  # TeamGameStarting
+        25892: LANE_REALTIME,  # Disconnected
+        20105: LANE_BULK,      # FriendList
+        24301: LANE_BULK,      # AllianceData
+        24303: LANE_BULK,      # JoinableAllianceList
+        24308: LANE_BULK,      # AllianceMember
+        24309: LANE_BULK,      # AllianceOnlineStatusUpdate
+        24311: LANE_BULK,      # AllianceStreamEntry
+        24368: LANE_BULK,      # TeamStream
+        24403: LANE_BULK,      # Leaderboard
+    }
+
+    def __init__(self, capacity: int = 256):
+        """Initialize empty lanes; the bulk lane holds a quarter of capacity"""
+        self._lanes: List[Deque[GameMessage]] = [deque(), deque(), deque()]
+        self._capacity: Tuple[int, ...] = (capacity, capacity, max(1, capacity // 4))
+
+        # Scheduling flags owned by the Processor
+        self.scheduled = False
+        self.urgent_scheduled = False
+
+        # Stats
+        self.enqueued: List[int] = [0, 0, 0]
+        self.dropped: List[int] = [0, 0, 0]
+        self.peak_depth: int = 0
+
+    @classmethod
+    def get_lane(cls, message: GameMessage) -> int:
+        """Lane for a message, by message type"""
+        return cls._LANE_BY_TYPE.get(message.get_message_type(), cls.LANE_NORMAL)
+
+    def __len__(self) -> int:
+        """Messages waiting in all lanes"""
+        return len(self._lanes[0]) + len(self._lanes[1]) + len(self._lanes[2])
+
+    def has_realtime(self) -> bool:
+        """True when the realtime lane is not empty"""
+        return bool(self._lanes[self.LANE_REALTIME])
+
+    def push(self, lane: int, message: GameMessage) -> bool:
+        """Queue a message; False (and counted as dropped) when its lane is full"""
+        queue = self._lanes[lane]
+        if len(queue) >= self._capacity[lane]:
+            self.dropped[lane] += 1
+            return False
+
+        queue.append(message)
+        self.enqueued[lane] += 1
+        depth = len(self)
+        if depth > self.peak_depth:
+            self.peak_depth = depth
+        return True
+
+    def pop_batch(self, limit: int, realtime_only: bool = False) -> List[GameMessage]:
+        """Take up to limit messages, higher priority lanes first"""
+        batch: List[GameMessage] = []
+        for queue in (self._lanes[:1] if realtime_only else self._lanes):
+            while queue and len(batch) < limit:
+                batch.append(queue.popleft())
+            if len(batch) >= limit:
+                break
+        return batch
+
+    def clear(self) -> None:
+        """Drop everything still queued"""
+        for queue in self._lanes:
+            queue.clear()
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """Depth, enqueued and dropped counts per lane"""
+        return {
+            name: {
+                "depth": len(self._lanes[lane]),
+                "capacity": self._capacity[lane],
+                "enqueued": self.enqueued[lane],
+                "dropped": self.dropped[lane],
+            }
+            for lane, name in enumerate(self.LANE_NAMES)
+        }
@@ -11,6 +11,8 @@ from logic.game import Events, Sessions, Leaderboards, Battles, Matchmaking, Tea
 from message import Processor
 from networking import Connections, UDPGateway, TCPGateway
 from networking.session import Session
+from networking.worker_cluster import WorkerCluster
+from handler.exit_handler import ExitHandler
 from settings import Configuration
 
 class Resources:
@@ -46,6 +48,36 @@ class Resources:
         """
         Initializes the network part of server
         """
+        config = Configuration.instance
+        if config.tcp_worker_processes > 0:
+            if WorkerCluster.is_supported():
+                # Workers own all client connections, this process keeps the broker and the console
+                WorkerCluster.start(config.tcp_worker_processes, Resources.run_worker)
+                return
+            print("SO_REUSEPORT is not supported here, running a single TCP process")
+
+        Resources.init_gateways(reuse_port=False)
+
+    @staticmethod
+    def run_worker(index: int):
+        """
+        Entry point of a TCP worker process
+        """
+        # Battles live in the worker owning their players, so each worker answers on its own UDP port
+        Configuration.instance.udp_port += index
+
+        Resources.init_database()
+        Resources.init_logic()
+        Resources.init_gateways(reuse_port=True)
+
+        ExitHandler.init()
+        WorkerCluster.serve_forever()
+
+    @staticmethod
+    def init_gateways(reuse_port: bool):
+        """
+        Starts the message processor and the client gateways
+        """
         Processor.init()
         Connections.init()
 
@@ -55,7 +87,7 @@ class Resources:
         # Initialize gateways
         config = Configuration.instance
         UDPGateway.init("0.0.0.0", config.udp_port)
-        TCPGateway.init("0.0.0.0", 9339)
+        TCPGateway.init("0.0.0.0", 9339, reuse_port)
 
 class ServerListener:
     """Server listener implementation"""
@@ -3,25 +3,36 @@ Python conversion of Supercell.Laser.Server.Networking.Connection.cs
 Real connection class for client connections
 """
 
+import itertools
 import socket
-from io import BytesIO
-from typing import Optional, Any
+import threading
+from typing import Dict, Optional, Any
 
 from logic.avatar.client_avatar import ClientAvatar
 from logic.home.client_home import ClientHome
 from logic.message.game_message import GameMessage
+from networking.frame_buffer import FrameBuffer
 from networking.messaging import Messaging
+from networking.outbound_buffer import OutboundBuffer, SlowConsumerError
 from message.message_manager import MessageManager
+from message.send_queue import SendQueue
+from settings.configuration import Configuration
+from logger import Logger
 
 class Connection:
     """Connection class for client connections"""
 
+    _ids = itertools.count(1)
+
     def __init__(self, client_socket: socket.socket, address: tuple):
         """Initialize connection"""
+        self.connection_id = next(Connection._ids)  # stable key for sharding work per connection
         self.socket = client_socket
         self.address = address
-        self.read_buffer = bytearray(1024)
-        self.memory = BytesIO()
+        self.frames = FrameBuffer()
+        self.outbound = OutboundBuffer(Configuration.instance.tcp_send_high_water)
+        self.send_queue = SendQueue(Configuration.instance.send_queue_capacity)
+        self._write_lock = threading.Lock()
         self.is_open = True
         self.ping = 0
 
@@ -30,6 +41,7 @@ class Connection:
         self.matchmaking_entry: Optional[Any] = None
         self.udp_session_id = -1
         self.nonce = ""
+        self.gateway_loop: Optional[Any] = None  # TCPGateway selector loop watching this socket
 
         # Initialize messaging and message manager
         self.messaging = Messaging(self)
@@ -49,6 +61,16 @@ class Connection:
             return self.message_manager.home_mode.avatar
         return None
 
+    def get_receive_stats(self) -> Dict[str, int]:
+        """Receive buffer stats (bytes buffered, largest frame, ...)"""
+        return self.frames.get_stats()
+
+    def get_send_stats(self) -> Dict[str, Any]:
+        """Send buffer stats (bytes pending, send calls, partial writes, ...) and queue depth per lane"""
+        stats: Dict[str, Any] = self.outbound.get_stats()
+        stats["lanes"] = self.send_queue.get_stats()
+        return stats
+
     def ping_updated(self, value: int) -> None:
         """Update ping value"""
         self.ping = value
@@ -59,16 +81,40 @@ class Connection:
 
     def write(self, data: bytes) -> None:
         """Write raw data to socket"""
+        self.queue_write(data)
+        self.flush()
+
+    def queue_write(self, *chunks: bytes) -> None:
+        """Append data to the send buffer without writing; flush() sends everything queued in one call"""
+        try:
+            with self._write_lock:
+                if self.is_open:
+                    for chunk in chunks:
+                        self.outbound.append(chunk)
+        except SlowConsumerError as e:
+            Logger.print_log(f"Disconnecting slow client {self.address}: {e}")
+            self.close()
+
+    def flush(self) -> bool:
+        """Send queued data; what the socket does not take is sent when it becomes writable"""
         try:
-            if self.is_open:
-                self.socket.send(data)
+            with self._write_lock:
+                if not self.is_open:
+                    return True
+                if self.outbound.flush(self.socket):
+                    return True
+            if self.gateway_loop:
+                self.gateway_loop.want_write(self)
+            return False
         except Exception:
             self.close()
+            return True
 
     def close(self) -> None:
         """Close connection"""
         try:
             self.is_open = False
+            self.outbound.clear()
             if self.socket:
                 self.socket.close()
         except Exception:
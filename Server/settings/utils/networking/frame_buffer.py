@@ -0,0 +1,123 @@
+"""
+Receive buffer and frame decoder for the TCP protocol
+Frames are a 7-byte header (u16 type, u24 length, u16 version) followed by the payload
+"""
+
+import struct
+from typing import Dict, Iterator, Tuple
+
+HEADER_SIZE = 7
+_HEADER = struct.Struct('>HBHH')  # type, length high byte, length low 16 bits, version
+
+
+def encode_header(message_type: int, length: int, version: int) -> bytes:
+    """7-byte frame header for a payload of length bytes"""
+    return _HEADER.pack(message_type, (length >> 16) & 0xFF, length & 0xFFFF, version)
+
+
+class FrameTooLargeError(ValueError):
+    """Raised when a header announces a payload larger than the connection allows"""
+
+
+class FrameBuffer:
+    """Growable bytearray receive buffer; complete frames are handed out as memoryview slices"""
+
+    def __init__(self, capacity: int = 4096, max_frame_size: int = 0x100000):
+        """Initialize buffer; max_frame_size bounds how much a single header may make us buffer"""
+        self._buffer = bytearray(capacity)
+        self._start: int = 0  # first unread byte
+        self._end: int = 0    # one past the last received byte
+        self.max_frame_size = max_frame_size
+
+        # Stats
+        self.bytes_received: int = 0
+        self.frames_decoded: int = 0
+        self.largest_frame: int = 0
+        self.peak_buffered: int = 0
+        self.compactions: int = 0
+
+    @property
+    def buffered(self) -> int:
+        """Bytes received but not yet consumed as frames"""
+        return self._end - self._start
+
+    def writable(self, size: int) -> memoryview:
+        """Free tail of at least size bytes for socket.recv_into; call commit with the count received"""
+        self._reserve(size)
+        return memoryview(self._buffer)[self._end:]
+
+    def commit(self, count: int) -> None:
+        """Mark count bytes written through writable() as received"""
+        self._end += count
+        self._received(count)
+
+    def feed(self, data: bytes) -> None:
+        """Copy received bytes into the buffer"""
+        count = len(data)
+        self._reserve(count)
+        self._buffer[self._end:self._end + count] = data
+        self._end += count
+        self._received(count)
+
+    def frames(self) -> Iterator[Tuple[int, int, memoryview]]:
+        """Yield (type, version, payload) for every complete frame, oldest first.
+
+        The payload views the receive buffer and is only valid until the next
+        feed/writable call; release it or copy what must outlive the callback.
+        """
+        buffer = self._buffer
+        while self._end - self._start >= HEADER_SIZE:
+            message_type, length_high, length_low, version = _HEADER.unpack_from(buffer, self._start)
+            length = (length_high << 16) | length_low
+            if length > self.max_frame_size:
+                raise FrameTooLargeError(f"Frame of {length} bytes exceeds limit of {self.max_frame_size}")
+
+            payload_start = self._start + HEADER_SIZE
+            if self._end - payload_start < length:
+                break
+
+            self._start = payload_start + length
+            self.frames_decoded += 1
+            if length > self.largest_frame:
+                self.largest_frame = length
+            yield message_type, version, memoryview(buffer)[payload_start:self._start]
+
+        # Fully consumed, next data starts at the front without moving anything
+        if self._start == self._end:
+            self._start = self._end = 0
+
+    def _reserve(self, size: int) -> None:
+        """Make room for size more bytes, compacting before growing"""
+        if len(self._buffer) - self._end >= size:
+            return
+
+        pending = self._end - self._start
+        if self._start:
+            view = memoryview(self._buffer)
+            view[:pending] = view[self._start:self._end]
+            view.release()
+            self._start, self._end = 0, pending
+            self.compactions += 1
+
+        missing = pending + size - len(self._buffer)
+        if missing > 0:
+            self._buffer.extend(bytes(max(missing, len(self._buffer))))
+
+    def _received(self, count: int) -> None:
+        """Update receive stats"""
+        self.bytes_received += count
+        if self._end - self._start > self.peak_buffered:
+            self.peak_buffered = self._end - self._start
+
+    def get_stats(self) -> Dict[str, int]:
+        """Snapshot of receive counters"""
+        return {
+            "buffered": self.buffered,
+            "peak_buffered": self.peak_buffered,
+            "capacity": len(self._buffer),
+            "bytes_received": self.bytes_received,
+            "frames_decoded": self.frames_decoded,
+            "largest_frame": self.largest_frame,
+            "max_frame_size": self.max_frame_size,
+            "compactions": self.compactions,
+        }
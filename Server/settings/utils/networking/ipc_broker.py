@@ -0,0 +1,426 @@
+"""
+Local IPC broker for multi-process TCP workers
+The master process owns the cluster-wide directory (online accounts, alliance owners, team,
+account and alliance ids, matchmaking queue depth) and relays leaderboard changes; each worker
+keeps one connection to it
+"""
+
+import itertools
+import os
+import socket
+import threading
+from multiprocessing.connection import Client, Listener
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from logger import Logger
+
+
+class IPCBroker:
+    """Static broker running in the master process, one serving thread per worker"""
+
+    _listener: Optional[Listener] = None
+    _accept_thread: Optional[threading.Thread] = None
+    _running: bool = False
+    _lock = threading.RLock()
+
+    address: Any = None
+    authkey: bytes = b""
+
+    # worker index -> (pipe, send lock)
+    _workers: Dict[int, Tuple[Any, threading.Lock]] = {}
+
+    # How long a login waits for the previous owner to flush the account
+    RELEASE_TIMEOUT: float = 10.0
+
+    # Cluster-wide state
+    _sessions: Dict[int, int] = {}                # account id -> owning worker
+    _alliances: Dict[int, int] = {}               # alliance id -> worker caching (and writing) it
+    _releases: Dict[Tuple[str, int], List[Any]] = {}  # (kind, id) -> [event, flushed, releasing worker]
+    _team_id_counter: int = 0
+    _id_counters: Dict[str, int] = {}             # "account" / "alliance" -> last id handed out
+    _matchmaking: Dict[int, Dict[int, int]] = {}  # worker -> event slot -> queued players
+
+    @classmethod
+    def init(cls) -> None:
+        """Open the listener; workers receive address and authkey when they are spawned"""
+        cls.authkey = os.urandom(16)
+        family = 'AF_UNIX' if hasattr(socket, 'AF_UNIX') else 'AF_INET'
+        cls._listener = Listener(family=family, authkey=cls.authkey)
+        cls.address = cls._listener.address
+        cls._workers = {}
+        cls._sessions = {}
+        cls._alliances = {}
+        cls._releases = {}
+        cls._team_id_counter = 0
+        cls._id_counters = {}
+        cls._matchmaking = {}
+        cls._running = True
+
+        cls._accept_thread = threading.Thread(target=cls._accept, name="IPCBroker", daemon=True)
+        cls._accept_thread.start()
+        Logger.print_log(f"IPC broker listening on {cls.address}")
+
+    @classmethod
+    def _accept(cls) -> None:
+        """Accept worker connections; the first message is the worker index"""
+        while cls._running:
+            try:
+                pipe = cls._listener.accept()
+                worker = pipe.recv()
+            except Exception as e:
+                if cls._running:
+                    Logger.error(f"IPC broker accept failed: {e}")
+                continue
+
+            with cls._lock:
+                cls._workers[worker] = (pipe, threading.Lock())
+            threading.Thread(target=cls._serve, args=(worker, pipe), name=f"IPCBroker-{worker}", daemon=True).start()
+
+    @classmethod
+    def _serve(cls, worker: int, pipe: Any) -> None:
+        """Answer one worker's requests until it goes away"""
+        while cls._running:
+            try:
+                op, request_id, args = pipe.recv()
+            except (EOFError, OSError):
+                break
+
+            if op in cls._WAITING:
+                # Answered on its own thread so the worker's other requests are not held up
+                threading.Thread(target=cls._answer, args=(worker, op, request_id, args),
+                                 name=f"IPCBroker-{worker}-{op}", daemon=True).start()
+            else:
+                cls._answer(worker, op, request_id, args)
+
+        cls._drop_worker(worker, pipe)
+
+    @classmethod
+    def _answer(cls, worker: int, op: str, request_id: int, args: tuple) -> None:
+        """Run a request handler and reply when the worker waits for the result"""
+        handler = cls._HANDLERS.get(op)
+        try:
+            result = handler(cls, worker, *args) if handler else None
+        except Exception as e:
+            Logger.error(f"IPC broker {op} failed: {e}")
+            result = None
+
+        if request_id:
+            cls._send(worker, ("reply", request_id, result))
+
+    @classmethod
+    def _send(cls, worker: int, message: tuple) -> None:
+        """Send to a worker, ignoring workers that already left"""
+        with cls._lock:
+            entry = cls._workers.get(worker)
+        if not entry:
+            return
+        pipe, send_lock = entry
+        try:
+            with send_lock:
+                pipe.send(message)
+        except (EOFError, OSError):
+            pass
+
+    @classmethod
+    def _drop_worker(cls, worker: int, pipe: Any) -> None:
+        """Forget everything a dead worker owned"""
+        with cls._lock:
+            entry = cls._workers.get(worker)
+            if entry and entry[0] is pipe:
+                del cls._workers[worker]
+                for owners in (cls._sessions, cls._alliances):
+                    for key in [key for key, owner in owners.items() if owner == worker]:
+                        del owners[key]
+                cls._matchmaking.pop(worker, None)
+                # A dead worker cannot flush any more; the database row is all there is
+                for release in cls._releases.values():
+                    if release[2] == worker:
+                        release[1] = True
+                        release[0].set()
+        try:
+            pipe.close()
+        except OSError:
+            pass
+        if cls._running:
+            Logger.print_log(f"IPC broker: worker {worker} disconnected")
+
+    @classmethod
+    def _claim(cls, owners: Dict[int, int], kind: str, push: str, worker: int, key: int) -> bool:
+        """Make worker the owner of a row before it loads it. A previous owner is pushed a release,
+        has to drop and write its copy, and the answer waits for its acknowledgement, so the new
+        owner never reads a row older than the last owner's changes"""
+        with cls._lock:
+            previous = owners.get(key)
+            owners[key] = worker
+            if previous is None or previous == worker or previous not in cls._workers:
+                return True
+            release = cls._releases[(kind, key)] = [threading.Event(), False, previous]
+
+        cls._send(previous, ("push", push, (key,)))
+        released = release[0].wait(cls.RELEASE_TIMEOUT) and release[1]
+
+        with cls._lock:
+            if cls._releases.get((kind, key)) is release:
+                del cls._releases[(kind, key)]
+            if not released and owners.get(key) == worker:
+                # The load fails; the previous owner has dropped its copy either way
+                del owners[key]
+        if not released:
+            Logger.error(f"IPC broker: worker {previous} did not release {kind} {key}")
+        return released
+
+    @classmethod
+    def _released(cls, kind: str, worker: int, key: int, flushed: bool) -> None:
+        """The previous owner dropped a row and wrote it (or failed to)"""
+        with cls._lock:
+            release = cls._releases.get((kind, key))
+        if release and release[2] == worker:
+            release[1] = flushed
+            release[0].set()
+
+    # Request handlers, called as handler(cls, worker, *args)
+
+    def _session_claim(cls, worker: int, account_id: int) -> bool:
+        """Make worker the owner of an account before it loads it; the previous owner drops its
+        session and writes the account first"""
+        return cls._claim(cls._sessions, "account", "release", worker, account_id)
+
+    def _session_released(cls, worker: int, account_id: int, flushed: bool) -> None:
+        """The previous owner dropped an account and wrote it (or failed to)"""
+        cls._released("account", worker, account_id, flushed)
+
+    def _session_register(cls, worker: int, account_id: int) -> None:
+        """Record the worker owning an account; a previous owner drops its session"""
+        with cls._lock:
+            previous = cls._sessions.get(account_id)
+            cls._sessions[account_id] = worker
+        if previous is not None and previous != worker:
+            cls._send(previous, ("push", "release", (account_id,)))
+
+    def _session_unregister(cls, worker: int, account_id: int) -> None:
+        """Remove an account, unless another worker has taken it over meanwhile"""
+        with cls._lock:
+            if cls._sessions.get(account_id) == worker:
+                del cls._sessions[account_id]
+
+    def _session_owner(cls, worker: int, account_id: int) -> int:
+        """Worker index holding the account, -1 when offline"""
+        with cls._lock:
+            return cls._sessions.get(account_id, -1)
+
+    def _alliance_claim(cls, worker: int, alliance_id: int) -> bool:
+        """Make worker the only one caching and writing an alliance; the previous one drops and
+        writes its copy first"""
+        return cls._claim(cls._alliances, "alliance", "alliance_release", worker, alliance_id)
+
+    def _alliance_released(cls, worker: int, alliance_id: int, flushed: bool) -> None:
+        """The previous owner dropped an alliance and wrote it (or failed to)"""
+        cls._released("alliance", worker, alliance_id, flushed)
+
+    def _alliance_unregister(cls, worker: int, alliance_id: int) -> None:
+        """A worker wrote and dropped an alliance, unless another worker has taken it over meanwhile"""
+        with cls._lock:
+            if cls._alliances.get(alliance_id) == worker:
+                del cls._alliances[alliance_id]
+
+    def _session_count(cls, worker: int) -> int:
+        """Online accounts across all workers"""
+        with cls._lock:
+            return len(cls._sessions)
+
+    def _next_team_id(cls, worker: int) -> int:
+        """Allocate a cluster-unique team id"""
+        with cls._lock:
+            cls._team_id_counter += 1
+            return cls._team_id_counter
+
+    def _next_row_id(cls, worker: int, kind: str, floor: int) -> int:
+        """Allocate a cluster-unique database id; floor is the highest id the worker saw in the
+        table, so ids keep growing past rows written before the broker started"""
+        with cls._lock:
+            row_id = max(cls._id_counters.get(kind, 0), floor) + 1
+            cls._id_counters[kind] = row_id
+            return row_id
+
+    def _leaderboard_deltas(cls, worker: int, deltas: list) -> None:
+        """Forward a worker's leaderboard changes to every other worker"""
+        with cls._lock:
+            others = [index for index in cls._workers if index != worker]
+        for index in others:
+            cls._send(index, ("push", "leaderboard_deltas", (deltas,)))
+
+    def _matchmaking_queued(cls, worker: int, queued: Dict[int, int]) -> None:
+        """Store a worker's queue depth per event slot"""
+        with cls._lock:
+            cls._matchmaking[worker] = dict(queued)
+
+    def _matchmaking_totals(cls, worker: int) -> Dict[int, int]:
+        """Queued players per event slot across all workers"""
+        return cls.get_matchmaking_totals()
+
+    _HANDLERS: Dict[str, Callable] = {
+        "session_claim": _session_claim,
+        "session_released": _session_released,
+        "session_register": _session_register,
+        "session_unregister": _session_unregister,
+        "session_owner": _session_owner,
+        "session_count": _session_count,
+        "alliance_claim": _alliance_claim,
+        "alliance_released": _alliance_released,
+        "alliance_unregister": _alliance_unregister,
+        "next_team_id": _next_team_id,
+        "next_row_id": _next_row_id,
+        "leaderboard_deltas": _leaderboard_deltas,
+        "matchmaking_queued": _matchmaking_queued,
+        "matchmaking_totals": _matchmaking_totals,
+    }
+
+    # Requests that wait on another worker
+    _WAITING = frozenset(("session_claim", "alliance_claim"))
+
+    @classmethod
+    def get_matchmaking_totals(cls) -> Dict[int, int]:
+        """Queued players per event slot across all workers"""
+        totals: Dict[int, int] = {}
+        with cls._lock:
+            for queued in cls._matchmaking.values():
+                for slot, count in queued.items():
+                    totals[slot] = totals.get(slot, 0) + count
+        return totals
+
+    @classmethod
+    def get_metrics(cls) -> Dict[str, Any]:
+        """Connected workers, online accounts and matchmaking queue depth"""
+        with cls._lock:
+            return {
+                "workers": sorted(cls._workers),
+                "sessions": len(cls._sessions),
+                "alliances": len(cls._alliances),
+                "teams_allocated": cls._team_id_counter,
+                "row_ids": dict(cls._id_counters),
+                "matchmaking": cls.get_matchmaking_totals(),
+            }
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """Close the listener and all worker pipes"""
+        cls._running = False
+        with cls._lock:
+            workers = list(cls._workers.values())
+            cls._workers.clear()
+        for pipe, _ in workers:
+            try:
+                pipe.close()
+            except OSError:
+                pass
+        if cls._listener:
+            try:
+                cls._listener.close()
+            except OSError:
+                pass
+            cls._listener = None
+
+
+class BrokerClient:
+    """Static connection from a worker process to the IPCBroker"""
+
+    _pipe: Optional[Any] = None
+    _send_lock = threading.Lock()
+    _reader: Optional[threading.Thread] = None
+    _ids = itertools.count(1)
+    _pending: Dict[int, List[Any]] = {}  # request id -> [event, result]
+    _handlers: Dict[str, Callable[..., None]] = {}
+
+    worker_index: int = -1
+
+    @classmethod
+    def connect(cls, address: Any, authkey: bytes, worker_index: int) -> None:
+        """Connect and announce the worker index"""
+        cls._pipe = Client(address, authkey=authkey)
+        cls.worker_index = worker_index
+        cls._pipe.send(worker_index)
+        cls._reader = threading.Thread(target=cls._read, name="BrokerClient", daemon=True)
+        cls._reader.start()
+
+    @classmethod
+    def is_connected(cls) -> bool:
+        """True inside a worker process with a live broker connection"""
+        return cls._pipe is not None
+
+    @classmethod
+    def on(cls, op: str, handler: Callable[..., None]) -> None:
+        """Register a handler for messages pushed by the broker"""
+        cls._handlers[op] = handler
+
+    @classmethod
+    def notify(cls, op: str, *args: Any) -> None:
+        """Fire-and-forget request"""
+        cls._send((op, 0, args))
+
+    @classmethod
+    def call(cls, op: str, *args: Any, timeout: float = 5.0) -> Any:
+        """Request and wait for the broker's answer; None on timeout or disconnect"""
+        request_id = next(cls._ids)
+        waiter = [threading.Event(), None]
+        cls._pending[request_id] = waiter
+        try:
+            if not cls._send((op, request_id, args)):
+                return None
+            if not waiter[0].wait(timeout):
+                Logger.error(f"Broker call {op} timed out")
+                return None
+            return waiter[1]
+        finally:
+            cls._pending.pop(request_id, None)
+
+    @classmethod
+    def _send(cls, message: tuple) -> bool:
+        """Send to the broker; False when not connected"""
+        pipe = cls._pipe
+        if pipe is None:
+            return False
+        try:
+            with cls._send_lock:
+                pipe.send(message)
+            return True
+        except (EOFError, OSError) as e:
+            Logger.error(f"Broker connection lost: {e}")
+            cls._pipe = None
+            return False
+
+    @classmethod
+    def _read(cls) -> None:
+        """Dispatch replies and pushes"""
+        while cls._pipe is not None:
+            try:
+                kind, key, payload = cls._pipe.recv()
+            except (EOFError, OSError, AttributeError):
+                cls._pipe = None
+                break
+
+            if kind == "reply":
+                waiter = cls._pending.get(key)
+                if waiter:
+                    waiter[1] = payload
+                    waiter[0].set()
+            elif kind == "push":
+                handler = cls._handlers.get(key)
+                if handler:
+                    try:
+                        handler(*payload)
+                    except Exception as e:
+                        Logger.error(f"Broker push {key} failed: {e}")
+
+        # Wake callers still waiting so they see None instead of the full timeout
+        for waiter in list(cls._pending.values()):
+            waiter[0].set()
+
+    @classmethod
+    def close(cls) -> None:
+        """Disconnect from the broker"""
+        pipe, cls._pipe = cls._pipe, None
+        if pipe:
+            try:
+                pipe.close()
+            except OSError:
+                pass
@@ -6,12 +6,12 @@ Message encryption and processing
 import secrets
 import hashlib
 from typing import Optional
-import struct
 
 from logic.message.game_message import GameMessage
 from logic.message.account.auth.authentication_failed_message import AuthenticationFailedMessage
 from message.processor import Processor
 from message.message_factory import MessageFactory
+from networking.frame_buffer import FrameTooLargeError, encode_header
 from titan.debug.debugger import Debugger
 from logger import Logger
 
@@ -107,12 +107,12 @@ class Messaging:
         else:
             Processor.send(self.connection, message)
 
-    def encrypt_and_write(self, message: GameMessage) -> None:
-        """Encrypt and write message"""
+    def encrypt_and_write(self, message: GameMessage, flush: bool = True) -> None:
+        """Encrypt and write message; with flush=False it is only queued for the next Connection.flush"""
         if message.get_encoding_length() == 0:
             message.encode()
 
-        payload = message.get_message_bytes()
+        plaintext = payload = message.get_message_bytes()
         message_type = message.get_message_type()
         version = message.get_version()
 
@@ -125,59 +125,39 @@ class Messaging:
                 self.encrypter.encrypt(payload, encrypted, len(payload))
                 payload = bytes(encrypted)
 
-        # Create stream with header
-        length = len(payload)
-        stream = bytearray(length + 7)
+        # Broadcasts carry a prebuilt header, valid as long as the payload went out unencrypted
+        header = getattr(message, "header", None) if payload is plaintext else None
+        if header is None:
+            header = encode_header(message_type, len(payload), version)
 
-        # Pack header
-        struct.pack_into('>HHH', stream, 0, message_type, length, version)
-        stream[7:] = payload
-
-        self.connection.write(bytes(stream))
+        # Header and payload go out as separate iovecs, no copy into a combined frame
+        self.connection.queue_write(header, payload)
+        if flush:
+            self.connection.flush()
 
     def on_receive(self) -> int:
-        """Handle received data"""
+        """Handle every complete frame in the receive buffer"""
         try:
-            memory = self.connection.memory
-            if len(memory.getvalue()) < 7:
-                return 0
-
-            position = memory.tell()
-            memory.seek(0)
-
-            # Read header
-            header = memory.read(7)
-            message_type, length, version = struct.unpack('>HHH', header)
-
-            # Check if full message received
-            if len(memory.getvalue()) - 7 < length:
-                memory.seek(position)
-                return 0
-
-            # Read payload
-            payload = memory.read(length)
+            for message_type, version, payload in self.connection.frames.frames():
+                try:
+                    result = self._read_new_message(message_type, len(payload), version, payload)
+                finally:
+                    payload.release()
 
-            # Process message
-            result = self._read_new_message(message_type, length, version, payload)
+                if result != 0:
+                    return result
 
-            # Update memory stream
-            remaining = memory.read()
-            memory.close()
-            from io import BytesIO
-            self.connection.memory = BytesIO(remaining)
-
-            # Process more messages if available
-            if len(remaining) >= 7:
-                self.on_receive()
-
-            return result
+            return 0
 
+        except FrameTooLargeError as e:
+            Logger.error(f"Dropping connection: {e}")
+            return -1
         except Exception as e:
             Logger.error(f"Error in on_receive: {e}")
             return -1
 
-    def _read_new_message(self, message_type: int, length: int, version: int, payload: bytes) -> int:
-        """Process new message"""
+    def _read_new_message(self, message_type: int, length: int, version: int, payload: memoryview) -> int:
+        """Process new message; payload views the receive buffer and is released afterwards"""
         try:
             if message_type != 10504:  # Not friend list request
                 Debugger.print_log(f"{message_type} received! (version {version})")
@@ -212,6 +192,7 @@ class Messaging:
             # Create message and process
             message = self.message_factory.create_message_by_type(message_type)
             if message:
+                # Message streams outlive the receive buffer, set_byte_array takes the one copy
                 message.get_byte_stream().set_byte_array(payload, len(payload))
                 message.decode()
 
@@ -0,0 +1,110 @@
+"""
+Per-connection send buffer
+Frames queued during one processor pass leave in a single sendmsg call; whatever the
+kernel does not take stays queued until the socket is writable again
+"""
+
+import socket
+from collections import deque
+from typing import Deque, Dict, Union
+
+# Linux and the BSDs cap one sendmsg at 1024 iovecs
+_IOV_MAX = 1024
+
+Chunk = Union[bytes, memoryview]
+
+
+class SlowConsumerError(Exception):
+    """Raised when a peer lets more than the high-water mark pile up unsent"""
+
+
+class OutboundBuffer:
+    """Queue of unsent chunks with gather writes and partial-write bookkeeping; not thread-safe"""
+
+    def __init__(self, high_water: int = 0x100000):
+        """Initialize empty buffer; high_water bounds the bytes a peer may leave unread"""
+        self._chunks: Deque[Chunk] = deque()
+        self.pending: int = 0
+        self.high_water = high_water
+
+        # Stats
+        self.bytes_sent: int = 0
+        self.chunks_queued: int = 0
+        self.send_calls: int = 0
+        self.partial_writes: int = 0
+        self.peak_pending: int = 0
+
+    def __len__(self) -> int:
+        """Number of queued chunks"""
+        return len(self._chunks)
+
+    def append(self, data: Chunk) -> None:
+        """Queue one chunk; raises SlowConsumerError past the high-water mark"""
+        if not data:
+            return
+        self._chunks.append(data)
+        self.pending += len(data)
+        self.chunks_queued += 1
+        if self.pending > self.peak_pending:
+            self.peak_pending = self.pending
+        if self.pending > self.high_water:
+            raise SlowConsumerError(f"{self.pending} bytes unsent (high-water mark {self.high_water})")
+
+    def flush(self, sock: socket.socket) -> bool:
+        """Write as much as the socket takes; True once everything is sent"""
+        chunks = self._chunks
+        while chunks:
+            try:
+                if len(chunks) == 1:
+                    sent = sock.send(chunks[0])
+                elif hasattr(sock, "sendmsg"):
+                    sent = sock.sendmsg(list(chunks) if len(chunks) <= _IOV_MAX
+                                        else [chunks[i] for i in range(_IOV_MAX)])
+                else:
+                    # No gather write on this platform, coalesce into one buffer instead
+                    joined = b"".join(chunks)
+                    chunks.clear()
+                    chunks.append(joined)
+                    sent = sock.send(joined)
+            except (BlockingIOError, InterruptedError):
+                return False
+
+            self.send_calls += 1
+            self.bytes_sent += sent
+            self.pending -= sent
+            self._consume(sent)
+            if chunks:
+                # The kernel buffer is full, wait for write-readiness
+                self.partial_writes += 1
+                return False
+
+        return True
+
+    def _consume(self, sent: int) -> None:
+        """Drop fully written chunks and trim a partially written one"""
+        chunks = self._chunks
+        while sent:
+            head = chunks[0]
+            if len(head) <= sent:
+                sent -= len(head)
+                chunks.popleft()
+            else:
+                chunks[0] = memoryview(head)[sent:]
+                sent = 0
+
+    def clear(self) -> None:
+        """Drop everything still queued"""
+        self._chunks.clear()
+        self.pending = 0
+
+    def get_stats(self) -> Dict[str, int]:
+        """Snapshot of send counters"""
+        return {
+            "pending": self.pending,
+            "peak_pending": self.peak_pending,
+            "high_water": self.high_water,
+            "bytes_sent": self.bytes_sent,
+            "chunks_queued": self.chunks_queued,
+            "send_calls": self.send_calls,
+            "partial_writes": self.partial_writes,
+        }
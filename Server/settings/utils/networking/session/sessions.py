@@ -4,14 +4,21 @@ Session management system
 """
 
 import threading
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, TYPE_CHECKING
 from datetime import datetime
 
+from database.cache.account_cache import AccountCache
 from networking.connection import Connection
+from networking.ipc_broker import BrokerClient
+from logic.message.game_message import GameMessage
+from message.processor import Processor
 from logic.home.home_mode import HomeMode
 from logic.message.team.team_chat_message import TeamChatMessage
 from logger import Logger
 
+if TYPE_CHECKING:
+    from logic.team.team_entry import TeamEntry
+
 class Session:
     """Individual session class"""
 
@@ -26,10 +33,14 @@ class Sessions:
     """Static session management class"""
 
     _sessions: Dict[int, Session] = {}
+    _releasing: Dict[int, threading.Event] = {}  # account id -> set once its disconnect release finished
     _lock = threading.RLock()
     _maintenance: bool = False
     _shutting_down: bool = False
 
+    # Longer than IPCBroker.RELEASE_TIMEOUT so the broker answers first
+    CLAIM_TIMEOUT: float = 15.0
+
     @classmethod
     @property
     def count(cls) -> int:
@@ -54,8 +65,13 @@ class Sessions:
         """Initialize sessions"""
         with cls._lock:
             cls._sessions = {}
+            cls._releasing = {}
             cls._maintenance = False
             cls._shutting_down = False
+
+        # In a worker process another worker may take over an account; drop and write our copy then
+        if BrokerClient.is_connected():
+            BrokerClient.on("release", cls._release_requested)
         Logger.print_log("Sessions initialized")
 
     @classmethod
@@ -79,20 +95,105 @@ class Sessions:
             session = Session(home_mode, connection)
             cls._sessions[account_id] = session
 
+        if BrokerClient.is_connected():
+            BrokerClient.notify("session_register", account_id)
+
         Logger.print_log(f"Session created for account {account_id}")
         return session
 
+    @classmethod
+    def claim(cls, account_id: int) -> bool:
+        """Take ownership of an account before loading it. In a worker process the broker first has
+        the previous owner write the account; False if it did not, and the login must fail"""
+        if not BrokerClient.is_connected():
+            return True
+        with cls._lock:
+            releasing = cls._releasing.get(account_id)
+        if releasing is not None and not releasing.wait(cls.CLAIM_TIMEOUT):
+            # Our own disconnect release of this account has not finished writing it
+            return False
+        return BrokerClient.call("session_claim", account_id, timeout=cls.CLAIM_TIMEOUT) is True
+
     @classmethod
     def remove(cls, account_id: int) -> None:
-        """Remove session"""
+        """Remove session; called from the gateway loop, so the release to the database runs on
+        its own thread"""
+        session = cls._drop(account_id)
+        if session is None:
+            return
+        if BrokerClient.is_connected():
+            # The next login may land on another worker, hand the account back to the database first
+            released = threading.Event()
+            with cls._lock:
+                cls._releasing[account_id] = released
+            threading.Thread(target=cls._release_and_unregister, args=(account_id, released),
+                             name=f"Release-{account_id}", daemon=True).start()
+        Logger.print_log(f"Session removed for account {account_id}")
+
+    @classmethod
+    def _release_and_unregister(cls, account_id: int, released: threading.Event) -> None:
+        """Write the account, then give up its ownership at the broker"""
+        try:
+            cls._release(account_id)
+            BrokerClient.notify("session_unregister", account_id)
+        finally:
+            with cls._lock:
+                if cls._releasing.get(account_id) is released:
+                    del cls._releasing[account_id]
+            released.set()
+
+    @classmethod
+    def _drop(cls, account_id: int) -> Optional[Session]:
+        """Forget a session and close its connection"""
         with cls._lock:
-            if account_id in cls._sessions:
-                session = cls._sessions.pop(account_id)
-                try:
-                    session.connection.close()
-                except Exception:
-                    pass
-                Logger.print_log(f"Session removed for account {account_id}")
+            session = cls._sessions.pop(account_id, None)
+        if session is not None:
+            try:
+                session.connection.close()
+            except Exception:
+                pass
+        return session
+
+    @classmethod
+    def _release(cls, account_id: int) -> bool:
+        """Write the account and drop it from the cache, True once the database has it"""
+        if cls._shutting_down:
+            # AccountCache.shutdown drains the write queue
+            AccountCache.remove(account_id)
+            return True
+        return AccountCache.release(account_id)
+
+    @classmethod
+    def _release_requested(cls, account_id: int) -> None:
+        """The account is logging in on another worker; runs off the broker reader thread"""
+        threading.Thread(target=cls._release_to_broker, args=(account_id,),
+                         name=f"Release-{account_id}", daemon=True).start()
+
+    @classmethod
+    def _release_to_broker(cls, account_id: int) -> None:
+        """Drop the session, write the account and acknowledge, even when there was no session"""
+        Logger.print_log(f"Account {account_id} logged in on another worker")
+        cls._drop(account_id)
+        BrokerClient.notify("session_released", account_id, cls._release(account_id))
+
+    @classmethod
+    def get_global_count(cls) -> int:
+        """Online accounts across all worker processes"""
+        if BrokerClient.is_connected():
+            count = BrokerClient.call("session_count")
+            if count is not None:
+                return count
+        return cls.count
+
+    @classmethod
+    def is_online_anywhere(cls, account_id: int) -> bool:
+        """Check if an account has a session in this or any other worker process"""
+        if cls.is_session_active(account_id):
+            return True
+        if BrokerClient.is_connected():
+            owner = BrokerClient.call("session_owner", account_id)
+            return owner is not None and owner >= 0
+        return False
 
     @classmethod
     def get_session(cls, account_id: int) -> Optional[Session]:
@@ -115,16 +216,21 @@ class Sessions:
     @classmethod
     def send_global_message(cls, sender_id: int, sender_name: str, message: str) -> None:
         """Send global chat message to all sessions"""
+        chat_msg = TeamChatMessage()
+        chat_msg.message = f"[Global] {sender_name}: {message}"
+        cls.broadcast(chat_msg)
+
+    @classmethod
+    def broadcast(cls, message: GameMessage) -> int:
+        """Send one message to every session, encoded once"""
+        return Processor.broadcast([session.connection for session in cls.get_all_sessions()], message)
+
+    @classmethod
+    def broadcast_to_team(cls, team: 'TeamEntry', message: GameMessage) -> int:
+        """Send one message to every online member of a team, encoded once"""
         with cls._lock:
-            for session in cls._sessions.values():
-                try:
-                    if session.connection and session.connection.is_open:
-                        # Create team chat message
-                        chat_msg = TeamChatMessage()
-                        chat_msg.message = f"[Global] {sender_name}: {message}"
-                        session.connection.send(chat_msg)
-                except Exception as e:
-                    Logger.error(f"Error sending global message: {e}")
+            sessions = [cls._sessions.get(member.account_id) for member in team.members]
+        return Processor.broadcast([session.connection for session in sessions if session], message)
 
     @classmethod
     def start_shutdown(cls) -> None:
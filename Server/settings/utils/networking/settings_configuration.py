@@ -19,6 +19,34 @@ class Configuration:
     update_sha: str = ""
     content_url: str = ""
     fingerprint: str = ""
+    database_pool_size: int = 8
+    database_pool_timeout: float = 5.0
+    database_pool_health_check_interval: float = 30.0
+    database_batch_size: int = 500
+    database_batch_retries: int = 2
+    database_write_queue_size: int = 10000
+    database_write_queue_timeout: float = 0.5
+    account_cache_size: int = 10000
+    account_cache_idle_ttl: float = 600.0
+    alliance_cache_size: int = 2000
+    alliance_cache_idle_ttl: float = 1800.0
+    database_account_format: str = "binary"
+    database_account_compression: bool = True
+    database_async_workers: int = 8
+    tcp_gateway_loops: int = 1
+    tcp_receive_buffer_size: int = 65536
+    tcp_worker_processes: int = 0
+    tcp_send_high_water: int = 1048576
+    send_queue_capacity: int = 256
+    message_worker_threads: int = 4
+    message_worker_queue_size: int = 1024
+    battle_tick_rate: int = 20
+    battle_tick_workers: int = 2
+    battle_input_queue_size: int = 256
+    battle_worker_processes: int = 0
+    battle_ring_size: int = 1048576
+    battle_object_backend: str = "objects"
+    leaderboard_refresh_interval: float = 60.0
 
     # Singleton instance
     instance: Optional['Configuration'] = None
@@ -39,6 +67,34 @@ class Configuration:
             config.update_sha = data.get("update_sha", "")
             config.content_url = data.get("ContentUrl", "")
             config.fingerprint = data.get("Fingerprint", "")
+            config.database_pool_size = data.get("database_pool_size", 8)
+            config.database_pool_timeout = data.get("database_pool_timeout", 5.0)
+            config.database_pool_health_check_interval = data.get("database_pool_health_check_interval", 30.0)
+            config.database_batch_size = data.get("database_batch_size", 500)
+            config.database_batch_retries = data.get("database_batch_retries", 2)
+            config.database_write_queue_size = data.get("database_write_queue_size", 10000)
+            config.database_write_queue_timeout = data.get("database_write_queue_timeout", 0.5)
+            config.account_cache_size = data.get("account_cache_size", 10000)
+            config.account_cache_idle_ttl = data.get("account_cache_idle_ttl", 600.0)
+            config.alliance_cache_size = data.get("alliance_cache_size", 2000)
+            config.alliance_cache_idle_ttl = data.get("alliance_cache_idle_ttl", 1800.0)
+            config.database_account_format = data.get("database_account_format", "binary")
+            config.database_account_compression = data.get("database_account_compression", True)
+            config.database_async_workers = data.get("database_async_workers", 8)
+            config.tcp_gateway_loops = data.get("tcp_gateway_loops", 1)
+            config.tcp_receive_buffer_size = data.get("tcp_receive_buffer_size", 65536)
+            config.tcp_worker_processes = data.get("tcp_worker_processes", 0)
+            config.tcp_send_high_water = data.get("tcp_send_high_water", 1048576)
+            config.send_queue_capacity = data.get("send_queue_capacity", 256)
+            config.message_worker_threads = data.get("message_worker_threads", 4)
+            config.message_worker_queue_size = data.get("message_worker_queue_size", 1024)
+            config.battle_tick_rate = data.get("battle_tick_rate", 20)
+            config.battle_tick_workers = data.get("battle_tick_workers", 2)
+            config.battle_input_queue_size = data.get("battle_input_queue_size", 256)
+            config.battle_worker_processes = data.get("battle_worker_processes", 0)
+            config.battle_ring_size = data.get("battle_ring_size", 1048576)
+            config.battle_object_backend = data.get("battle_object_backend", "objects")
+            config.leaderboard_refresh_interval = data.get("leaderboard_refresh_interval", 60.0)
 
             return config
 
@@ -56,7 +112,35 @@ class Configuration:
             "database_name": self.database_name,
             "update_sha": self.update_sha,
             "ContentUrl": self.content_url,
-            "Fingerprint": self.fingerprint
+            "Fingerprint": self.fingerprint,
+            "database_pool_size": self.database_pool_size,
+            "database_pool_timeout": self.database_pool_timeout,
+            "database_pool_health_check_interval": self.database_pool_health_check_interval,
+            "database_batch_size": self.database_batch_size,
+            "database_batch_retries": self.database_batch_retries,
+            "database_write_queue_size": self.database_write_queue_size,
+            "database_write_queue_timeout": self.database_write_queue_timeout,
+            "account_cache_size": self.account_cache_size,
+            "account_cache_idle_ttl": self.account_cache_idle_ttl,
+            "alliance_cache_size": self.alliance_cache_size,
+            "alliance_cache_idle_ttl": self.alliance_cache_idle_ttl,
+            "database_account_format": self.database_account_format,
+            "database_account_compression": self.database_account_compression,
+            "database_async_workers": self.database_async_workers,
+            "tcp_gateway_loops": self.tcp_gateway_loops,
+            "tcp_receive_buffer_size": self.tcp_receive_buffer_size,
+            "tcp_worker_processes": self.tcp_worker_processes,
+            "tcp_send_high_water": self.tcp_send_high_water,
+            "send_queue_capacity": self.send_queue_capacity,
+            "message_worker_threads": self.message_worker_threads,
+            "message_worker_queue_size": self.message_worker_queue_size,
+            "battle_tick_rate": self.battle_tick_rate,
+            "battle_tick_workers": self.battle_tick_workers,
+            "battle_input_queue_size": self.battle_input_queue_size,
+            "battle_worker_processes": self.battle_worker_processes,
+            "battle_ring_size": self.battle_ring_size,
+            "battle_object_backend": self.battle_object_backend,
+            "leaderboard_refresh_interval": self.leaderboard_refresh_interval
         }
 
         try:
@@ -0,0 +1,110 @@
+"""
+Shared-memory byte ring between two processes
+One producer process appends length-prefixed records, one consumer process pops them;
+head and tail live in the shared header so neither side needs a lock across processes
+"""
+
+import struct
+import threading
+from multiprocessing import shared_memory
+from typing import List, Optional
+
+_HEAD, _TAIL = 0, 1  # header words: bytes ever written, bytes ever read
+_HEADER_SIZE = 64    # keep the records off the header's cache line
+_LENGTH = struct.Struct("<I")
+
+
+class ShmRing:
+    """Single-producer single-consumer ring of byte records in a SharedMemory block"""
+
+    def __init__(self, capacity: int = 0x100000, name: Optional[str] = None):
+        """Create a ring of capacity bytes, or attach to the existing one called name"""
+        if name is None:
+            self._shm = shared_memory.SharedMemory(create=True, size=_HEADER_SIZE + capacity)
+            self._owner = True
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            # Spawned children report to the creator's resource tracker, which unlinks only once
+            self._owner = False
+        self.name = self._shm.name
+        self.capacity = self._shm.size - _HEADER_SIZE
+        self._buf = self._shm.buf
+        # Aligned native words are stored in one instruction, so the other side never sees half of one
+        self._header = self._buf[:16].cast("Q")
+        # Threads of the producer process share one ring, the lock serialises them
+        self._push_lock = threading.Lock()
+
+        # Stats
+        self.pushed: int = 0
+        self.dropped: int = 0
+
+    def push(self, data: bytes) -> bool:
+        """Append one record; False when the ring has no room for it"""
+        size = _LENGTH.size + len(data)
+        with self._push_lock:
+            header = self._header
+            head = header[_HEAD]
+            if self.capacity - (head - header[_TAIL]) < size:
+                self.dropped += 1
+                return False
+            self._copy_in(head, _LENGTH.pack(len(data)))
+            self._copy_in(head + _LENGTH.size, data)
+            # Publish the record only after its bytes are in place
+            header[_HEAD] = head + size
+            self.pushed += 1
+        return True
+
+    def pop(self) -> Optional[bytes]:
+        """Remove and return the oldest record, None when the ring is empty"""
+        header = self._header
+        tail = header[_TAIL]
+        if header[_HEAD] == tail:
+            return None
+        length = _LENGTH.unpack(self._copy_out(tail, _LENGTH.size))[0]
+        data = self._copy_out(tail + _LENGTH.size, length)
+        header[_TAIL] = tail + _LENGTH.size + length
+        return data
+
+    def pop_all(self, limit: int = 1024) -> List[bytes]:
+        """Pop up to limit records"""
+        records = []
+        while len(records) < limit:
+            data = self.pop()
+            if data is None:
+                break
+            records.append(data)
+        return records
+
+    def get_used(self) -> int:
+        """Bytes written but not yet read"""
+        return self._header[_HEAD] - self._header[_TAIL]
+
+    def _copy_in(self, position: int, data: bytes) -> None:
+        """Write data at a ring position, splitting it at the end of the buffer"""
+        offset = _HEADER_SIZE + position % self.capacity
+        first = min(len(data), _HEADER_SIZE + self.capacity - offset)
+        self._buf[offset:offset + first] = data[:first]
+        if first < len(data):
+            self._buf[_HEADER_SIZE:_HEADER_SIZE + len(data) - first] = data[first:]
+
+    def _copy_out(self, position: int, length: int) -> bytes:
+        """Read length bytes at a ring position, joining the two halves of a wrapped record"""
+        offset = _HEADER_SIZE + position % self.capacity
+        first = min(length, _HEADER_SIZE + self.capacity - offset)
+        data = bytes(self._buf[offset:offset + first])
+        if first < length:
+            data += bytes(self._buf[_HEADER_SIZE:_HEADER_SIZE + length - first])
+        return data
+
+    def close(self) -> None:
+        """Detach from the ring; the creating side also frees it"""
+        self._header.release()
+        self._header = None
+        self._buf = None
+        try:
+            self._shm.close()
+            if self._owner:
+                self._shm.unlink()
+        except (BufferError, FileNotFoundError):
+            pass
+
@@ -3,16 +3,18 @@ Python conversion of Supercell.Laser.Server.Networking.TCPGateway.cs
 TCP server gateway for client connections
 """
 
+import selectors
 import socket
 import threading
-import select
-from typing import List, Optional
 import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set
 
 from networking.connection import Connection
 from networking.connections import Connections
 from logic.game.battles import Battles
 from networking.session.sessions import Sessions
+from settings.configuration import Configuration
 from logger import Logger
 
 class ContentServer:
@@ -26,70 +28,178 @@ class ContentServer:
         # Placeholder implementation
         Logger.print_log(f"Content server initialized at {host}:{port}")
 
+class _GatewayLoop:
+    """One selector thread multiplexing a share of the client sockets"""
+
+    def __init__(self, index: int):
+        """Initialize selector and the wakeup pair used to hand over new connections"""
+        self.index = index
+        self.selector = selectors.DefaultSelector()
+        self.connections: Set[Connection] = set()
+        self._pending: Deque[Connection] = deque()
+        self._want_write: Deque[Connection] = deque()
+        self._wake_reader, self._wake_writer = socket.socketpair()
+        self._wake_reader.setblocking(False)
+        self._wake_writer.setblocking(False)
+        self.selector.register(self._wake_reader, selectors.EVENT_READ, None)
+        self.thread = threading.Thread(target=self._run, name=f"TCPGatewayLoop-{index}", daemon=True)
+
+    def add(self, connection: Connection) -> None:
+        """Hand a connection to this loop (any thread)"""
+        self._pending.append(connection)
+        self.wake()
+
+    def want_write(self, connection: Connection) -> None:
+        """Watch a connection for write-readiness until its send buffer drains (any thread)"""
+        self._want_write.append(connection)
+        self.wake()
+
+    def wake(self) -> None:
+        """Interrupt select so pending work is picked up"""
+        try:
+            self._wake_writer.send(b"\0")
+        except (BlockingIOError, OSError):
+            pass  # A wakeup is already pending or the loop is closing
+
+    def remove(self, connection: Connection) -> None:
+        """Stop watching a connection"""
+        if connection in self.connections:
+            self.connections.discard(connection)
+            try:
+                self.selector.unregister(connection.socket)
+            except (KeyError, ValueError):
+                pass
+
+    def _register_pending(self) -> None:
+        """Register connections handed over by the accept path"""
+        while self._pending:
+            connection = self._pending.popleft()
+            try:
+                self.selector.register(connection.socket, selectors.EVENT_READ, connection)
+            except KeyError:
+                # fd number reused while a closed connection was still registered
+                stale = self.selector.get_key(connection.socket).data
+                self.remove(stale)
+                self.selector.register(connection.socket, selectors.EVENT_READ, connection)
+            self.connections.add(connection)
+
+        while self._want_write:
+            connection = self._want_write.popleft()
+            if connection in self.connections and connection.is_open:
+                self.selector.modify(connection.socket, selectors.EVENT_READ | selectors.EVENT_WRITE, connection)
+
+    def _on_writable(self, connection: Connection) -> None:
+        """Continue a partial write; stop watching for writability once drained"""
+        if connection.flush() and connection.is_open and connection in self.connections:
+            self.selector.modify(connection.socket, selectors.EVENT_READ, connection)
+
+    def _run(self) -> None:
+        """Select loop"""
+        last_sweep = time.monotonic()
+        while TCPGateway._running:
+            try:
+                for key, mask in self.selector.select(1.0):
+                    if key.data is None:
+                        self._drain_wakeups()
+                    elif key.data is TCPGateway:
+                        TCPGateway._accept_all()
+                    else:
+                        if mask & selectors.EVENT_WRITE:
+                            self._on_writable(key.data)
+                        if mask & selectors.EVENT_READ:
+                            TCPGateway._on_readable(key.data)
+
+                self._register_pending()
+
+                # Connections closed from other threads produce no events, drop them here
+                now = time.monotonic()
+                if now - last_sweep >= 1.0:
+                    last_sweep = now
+                    for connection in [c for c in self.connections if not c.is_open]:
+                        TCPGateway._disconnect_client(connection)
+
+            except Exception as e:
+                if TCPGateway._running:
+                    Logger.error(f"Error in TCP gateway loop {self.index}: {e}")
+                time.sleep(0.1)
+
+        self.selector.close()
+        self._wake_reader.close()
+        self._wake_writer.close()
+
+    def _drain_wakeups(self) -> None:
+        """Empty the wakeup socket"""
+        try:
+            while self._wake_reader.recv(4096):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+
+
 class TCPGateway:
-    """TCP gateway for handling client connections"""
+    """TCP gateway multiplexing all client sockets on a fixed number of selector loops"""
 
     _active_connections: List[Connection] = []
     _socket: Optional[socket.socket] = None
-    _thread: Optional[threading.Thread] = None
+    _loops: List[_GatewayLoop] = []
     _running: bool = False
-    _accept_event: Optional[threading.Event] = None
+    _receive_size: int = 65536
 
     @classmethod
-    def init(cls, host: str, port: int) -> None:
-        """Initialize TCP gateway"""
+    def init(cls, host: str, port: int, reuse_port: bool = False) -> None:
+        """Initialize TCP gateway; reuse_port lets several worker processes bind the same port"""
+        config = Configuration.instance
         cls._active_connections = []
+        cls._receive_size = config.tcp_receive_buffer_size
         cls._running = True
 
         # Create server socket
         cls._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         cls._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port:
+            cls._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
         cls._socket.bind((host, port))
-        cls._socket.listen(100)
+        cls._socket.listen(1024)
         cls._socket.setblocking(False)
 
-        cls._accept_event = threading.Event()
+        # Loop 0 also accepts; new connections go to the least loaded loop
+        cls._loops = [_GatewayLoop(index) for index in range(max(1, config.tcp_gateway_loops))]
+        cls._loops[0].selector.register(cls._socket, selectors.EVENT_READ, cls)
+        for loop in cls._loops:
+            loop.thread.start()
 
-        # Start accept thread
-        cls._thread = threading.Thread(target=cls._update, daemon=True)
-        cls._thread.start()
-
-        Logger.print_log(f"TCP Server started at {host}:{port}")
+        Logger.print_log(f"TCP Server started at {host}:{port} ({len(cls._loops)} loops)")
 
     @classmethod
-    def _update(cls) -> None:
-        """Main server loop"""
+    def _accept_all(cls) -> None:
+        """Accept every queued connection"""
         while cls._running:
             try:
-                # Use select to check for incoming connections
-                ready_sockets, _, _ = select.select([cls._socket], [], [], 1.0)
-
-                if ready_sockets:
-                    try:
-                        client_socket, address = cls._socket.accept()
-                        cls._on_accept(client_socket, address)
-                    except socket.error as e:
-                        if cls._running:  # Only log if we're still supposed to be running
-                            Logger.error(f"Error accepting connection: {e}")
-
-            except Exception as e:
-                if cls._running:
-                    Logger.error(f"Error in TCP gateway update: {e}")
-                time.sleep(0.1)
+                client_socket, address = cls._socket.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            except socket.error as e:
+                if cls._running:  # Only log if we're still supposed to be running
+                    Logger.error(f"Error accepting connection: {e}")
+                return
+            cls._on_accept(client_socket, address)
 
     @classmethod
     def _on_accept(cls, client_socket: socket.socket, address: tuple) -> None:
         """Handle new client connection"""
         try:
+            # Partial writes wait for write-readiness on the loop instead of blocking the sender
             client_socket.setblocking(False)
+            client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
             connection = Connection(client_socket, address)
             cls._active_connections.append(connection)
 
             Logger.print_log(f"New connection from {address}")
             Connections.add_connection(connection)
 
-            # Start receiving data for this connection
-            threading.Thread(target=cls._handle_connection, args=(connection,), daemon=True).start()
+            loop = min(cls._loops, key=lambda candidate: len(candidate.connections) + len(candidate._pending))
+            connection.gateway_loop = loop
+            loop.add(connection)
 
         except Exception as e:
             Logger.error(f"Error handling new connection: {e}")
@@ -99,55 +209,43 @@ class TCPGateway:
                 pass
 
     @classmethod
-    def _handle_connection(cls, connection: Connection) -> None:
-        """Handle individual connection"""
+    def _on_readable(cls, connection: Connection) -> None:
+        """Read what the socket has into the frame buffer and process complete messages"""
         try:
-            while connection.is_open and cls._running:
-                try:
-                    # Use select to check for data
-                    ready_sockets, _, error_sockets = select.select([connection.socket], [], [connection.socket], 1.0)
-
-                    if error_sockets:
-                        Logger.print_log("Client disconnected (socket error)")
-                        cls._disconnect_client(connection)
-                        break
-
-                    if ready_sockets:
-                        # Receive data
-                        data = connection.socket.recv(1024)
-
-                        if not data:
-                            Logger.print_log("Client disconnected")
-                            cls._disconnect_client(connection)
-                            break
-
-                        # Write to connection memory
-                        connection.memory.write(data)
-
-                        # Process messages
-                        if connection.messaging.on_receive() != 0:
-                            Logger.print_log("Client disconnected (message processing error)")
-                            cls._disconnect_client(connection)
-                            break
-
-                except socket.error:
-                    Logger.print_log("Client disconnected (socket error)")
-                    cls._disconnect_client(connection)
-                    break
-                except Exception as e:
-                    Logger.error(f"Error handling connection: {e}")
-                    cls._disconnect_client(connection)
-                    break
+            target = connection.frames.writable(cls._receive_size)
+            try:
+                received = connection.socket.recv_into(target)
+            finally:
+                target.release()
+        except (BlockingIOError, InterruptedError):
+            return
+        except socket.error:
+            Logger.print_log("Client disconnected (socket error)")
+            cls._disconnect_client(connection)
+            return
 
+        if not received:
+            Logger.print_log("Client disconnected")
+            cls._disconnect_client(connection)
+            return
+
+        connection.frames.commit(received)
+
+        try:
+            if connection.messaging.on_receive() != 0:
+                Logger.print_log("Client disconnected (message processing error)")
+                cls._disconnect_client(connection)
         except Exception as e:
-            Logger.error(f"Unhandled exception in connection handler: {e}")
+            Logger.error(f"Error handling connection: {e}")
             cls._disconnect_client(connection)
 
     @classmethod
     def _disconnect_client(cls, connection: Connection) -> None:
         """Handle client disconnection"""
         try:
-            # Remove from active connections
+            # Stop watching the socket and remove from active connections
+            if connection.gateway_loop:
+                connection.gateway_loop.remove(connection)
             if connection in cls._active_connections:
                 cls._active_connections.remove(connection)
 
@@ -157,11 +255,7 @@ class TCPGateway:
 
                 # Remove from battle if in one
                 if connection.home and connection.home.home_mode.avatar.battle_id > 0:
-                    battle = Battles.get(connection.home.home_mode.avatar.battle_id)
-                    if battle:
-                        player = battle.get_player_by_session_id(connection.udp_session_id)
-                        if player:
-                            battle.remove_player(player)
+                    Battles.remove_session(connection.home.home_mode.avatar.battle_id, connection.udp_session_id)
 
             # Close connection
             connection.close()
@@ -175,17 +269,29 @@ class TCPGateway:
         # Placeholder for send completion handling
         pass
 
+    @classmethod
+    def get_metrics(cls) -> Dict[str, Any]:
+        """Connections per loop"""
+        return {
+            "loops": len(cls._loops),
+            "connections": len(cls._active_connections),
+            "per_loop": [len(loop.connections) for loop in cls._loops],
+        }
+
     @classmethod
     def shutdown(cls) -> None:
         """Shutdown TCP gateway"""
         cls._running = False
 
+        for loop in cls._loops:
+            loop.wake()
+        for loop in cls._loops:
+            if loop.thread.is_alive():
+                loop.thread.join(timeout=5)
+
         if cls._socket:
             cls._socket.close()
 
-        if cls._thread and cls._thread.is_alive():
-            cls._thread.join(timeout=5)
-
         # Close all connections
         for connection in cls._active_connections[:]:
             connection.close()
@@ -18,6 +18,13 @@ class UDPGameListener(LogicGameListener):
         self.socket = udp_socket
         self.tcp_connection = tcp_connection
 
+    def __getstate__(self) -> dict:
+        """Pickled with its battle for a worker process, without the TCP connection; results reach
+        the player's home through the battle's end record instead"""
+        state = self.__dict__.copy()
+        state["tcp_connection"] = None
+        return state
+
     def send_message(self, message: GameMessage) -> None:
         """Send message via UDP"""
         try:
@@ -6,7 +6,7 @@ UDP gateway for battle communications
 import socket
 import threading
 import time
-from typing import Dict, Optional
+from typing import Callable, Dict, Optional
 import struct
 
 from networking.udp.udp_socket import UDPSocket
@@ -21,6 +21,7 @@ class UDPGateway:
     _thread: Optional[threading.Thread] = None
     _running: bool = False
     _lock = threading.RLock()
+    _outbox: Optional[Callable[[int, bytes], None]] = None
 
     @classmethod
     def init(cls, host: str, port: int) -> None:
@@ -100,7 +101,11 @@ class UDPGateway:
 
     @classmethod
     def send_packet(cls, session_id: int, data: bytes, address: tuple) -> None:
-        """Send UDP packet"""
+        """Send UDP packet; in a battle worker process it goes to the master, which sends it to the
+        session's current address"""
+        if cls._outbox:
+            cls._outbox(session_id, data)
+            return
         try:
             if cls._socket and cls._running:
                 # Prepend session ID to packet
@@ -109,6 +114,23 @@ class UDPGateway:
         except Exception as e:
             Logger.error(f"Error sending UDP packet: {e}")
 
+    @classmethod
+    def send_to_session(cls, session_id: int, data: bytes) -> None:
+        """Send a packet to a session's client; in a battle worker process it goes to the master instead"""
+        if cls._outbox:
+            cls._outbox(session_id, data)
+            return
+
+        with cls._lock:
+            udp_socket = cls._sockets.get(session_id)
+        if udp_socket and udp_socket.is_active and udp_socket.client_address:
+            cls.send_packet(session_id, data, udp_socket.client_address)
+
+    @classmethod
+    def set_outbox(cls, outbox: Optional[Callable[[int, bytes], None]]) -> None:
+        """Route send_to_session through outbox(session_id, data); used inside battle worker processes"""
+        cls._outbox = outbox
+
     @classmethod
     def get_socket_count(cls) -> int:
         """Get active socket count"""
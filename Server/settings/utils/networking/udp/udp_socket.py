@@ -9,6 +9,7 @@ from typing import Optional, Any
 from logic.message.game_message import GameMessage
 from networking.connection import Connection
 from logic.battle.battle_mode import BattleMode
+from logic.game.battles import Battles
 from logger import Logger
 
 class UDPSocket:
@@ -24,10 +25,17 @@ class UDPSocket:
         self.client_address: Optional[tuple] = None
         self.is_active = True
 
+    def __getstate__(self) -> dict:
+        """Pickled with its battle for a worker process, without the gateway socket and TCP connection"""
+        state = self.__dict__.copy()
+        state["gateway_socket"] = None
+        state["tcp_connection"] = None
+        return state
+
     def send_message(self, message: GameMessage) -> None:
         """Send message via UDP"""
         try:
-            if not self.is_active or not self.client_address:
+            if not self.is_active:
                 return
 
             # Encode message
@@ -36,9 +44,10 @@ class UDPSocket:
 
             data = message.get_message_bytes()
 
-            # Send via UDP gateway
+            # Send via UDP gateway, which knows the session's address, or forwards to the master
+            # when this is a copy in a battle worker process
             from networking.udp.udp_gateway import UDPGateway
-            UDPGateway.send_packet(self.session_id, data, self.client_address)
+            UDPGateway.send_to_session(self.session_id, data)
 
         except Exception as e:
             Logger.error(f"Error sending UDP message: {e}")
@@ -54,11 +63,9 @@ class UDPSocket:
             if len(data) < 7:  # Minimum message header size
                 return
 
-            # Extract message type and process
-            # This would normally decode the UDP battle message
-            # For now, just forward to battle if available
+            # Queue for the battle's tick thread; applied at the start of its next tick
             if self.battle:
-                self.battle.process_udp_message(self.session_id, data)
+                Battles.queue_input(self.battle.id, self.session_id, data)
 
         except Exception as e:
             Logger.error(f"Error processing UDP data: {e}")
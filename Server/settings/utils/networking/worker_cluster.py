@@ -0,0 +1,116 @@
+"""
+Multi-process TCP front end
+Spawns worker processes that each bind the game port with SO_REUSEPORT and own their connections
+"""
+
+import multiprocessing
+import os
+import socket
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from networking.ipc_broker import BrokerClient, IPCBroker
+from settings.configuration import Configuration
+from logger import Logger
+
+
+class WorkerCluster:
+    """Static supervisor of the TCP worker processes (master side) and worker identity (worker side)"""
+
+    _processes: Dict[int, multiprocessing.Process] = {}
+    _target: Optional[Callable[[int], None]] = None
+    _supervisor: Optional[threading.Thread] = None
+    _running: bool = False
+    _restarts: int = 0
+
+    worker_index: int = -1
+
+    @staticmethod
+    def is_supported() -> bool:
+        """SO_REUSEPORT is needed so every worker can bind the same port"""
+        return hasattr(socket, "SO_REUSEPORT")
+
+    @classmethod
+    def is_worker(cls) -> bool:
+        """True inside a spawned worker process"""
+        return cls.worker_index >= 0
+
+    @classmethod
+    def start(cls, count: int, target: Callable[[int], None]) -> None:
+        """Start the broker and count workers; target(index) runs inside each worker and must not return early"""
+        IPCBroker.init()
+        cls._target = target
+        cls._processes = {}
+        cls._running = True
+
+        for index in range(count):
+            cls._spawn(index)
+
+        cls._supervisor = threading.Thread(target=cls._supervise, name="WorkerCluster", daemon=True)
+        cls._supervisor.start()
+        Logger.print_log(f"Started {count} TCP worker processes")
+
+    @classmethod
+    def _spawn(cls, index: int) -> None:
+        """Start one worker; spawn (not fork) so no lock or thread state is inherited"""
+        context = multiprocessing.get_context("spawn")
+        process = context.Process(
+            target=_worker_main,
+            args=(index, Configuration.instance, IPCBroker.address, IPCBroker.authkey, cls._target),
+            name=f"TCPWorker-{index}",
+            daemon=True
+        )
+        process.start()
+        cls._processes[index] = process
+
+    @classmethod
+    def _supervise(cls) -> None:
+        """Restart workers that died"""
+        while cls._running:
+            time.sleep(1.0)
+            for index, process in list(cls._processes.items()):
+                if cls._running and not process.is_alive():
+                    Logger.error(f"TCP worker {index} exited with code {process.exitcode}, restarting")
+                    cls._restarts += 1
+                    cls._spawn(index)
+
+    @staticmethod
+    def serve_forever() -> None:
+        """Block a worker's main thread until it is signalled or the master goes away"""
+        master = os.getppid()
+        while os.getppid() == master:
+            time.sleep(1.0)
+        Logger.print_log("Master process is gone, worker exiting")
+
+    @classmethod
+    def get_metrics(cls) -> Dict[str, Any]:
+        """Worker liveness and broker state"""
+        metrics = IPCBroker.get_metrics()
+        metrics["processes"] = {index: process.pid for index, process in cls._processes.items() if process.is_alive()}
+        metrics["restarts"] = cls._restarts
+        return metrics
+
+    @classmethod
+    def shutdown(cls, timeout: float = 10.0) -> None:
+        """Ask workers to shut down gracefully, then stop the broker"""
+        cls._running = False
+        processes: List[multiprocessing.Process] = list(cls._processes.values())
+        for process in processes:
+            if process.is_alive():
+                process.terminate()  # SIGTERM runs the worker's ExitHandler
+        deadline = time.monotonic() + timeout
+        for process in processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.kill()
+        cls._processes.clear()
+        IPCBroker.shutdown()
+
+
+def _worker_main(index: int, config: Any, address: Any, authkey: bytes, target: Callable[[int], None]) -> None:
+    """Entry point of a spawned worker process"""
+    Configuration.instance = config
+    WorkerCluster.worker_index = index
+    BrokerClient.connect(address, authkey, index)
+    target(index)
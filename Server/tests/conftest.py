@@ -0,0 +1,19 @@
+"""
+Test setup: the server runs from the Server directory with settings/utils on the import path
+"""
+
+import importlib
+import os
+import sys
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (SERVER_DIR, os.path.join(SERVER_DIR, "settings", "utils")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+# settings.configuration is the name the database layer imports networking.settings_configuration by
+if "settings.configuration" not in sys.modules:
+    try:
+        importlib.import_module("settings.configuration")
+    except ImportError:
+        sys.modules["settings.configuration"] = importlib.import_module("networking.settings_configuration")
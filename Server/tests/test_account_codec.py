@@ -0,0 +1,121 @@
+"""
+AccountCodec round trips: every attribute of a populated account survives the binary and JSON rows
+"""
+
+import json
+
+import pytest
+
+from database.account_codec import AccountCodec, AVATAR_FIELDS, HOME_FIELDS, INT, LONG, STRING, BOOL, INT_LIST
+from database.account_model import Account
+from logic.avatar.structures.player_display_data import PlayerDisplayData
+from logic.home.structures.hero import Hero
+from logic.home.structures.player_map import PlayerMap
+from logic.home.structures.profile import Profile
+
+
+def _fill(obj, fields, seed):
+    """Give every field-table attribute a value different from its default"""
+    for index, (name, kind, _) in enumerate(fields):
+        value = seed + index
+        if kind == INT:
+            setattr(obj, name, value)
+        elif kind == LONG:
+            setattr(obj, name, value << 33)
+        elif kind == STRING:
+            setattr(obj, name, f"{name}-{value}")
+        elif kind == BOOL:
+            setattr(obj, name, True)
+        elif kind == INT_LIST:
+            setattr(obj, name, [value, value + 1, -value])
+        else:
+            setattr(obj, name, {value: value + 1, value + 2: value + 3})
+
+
+def _hero(character_id):
+    hero = Hero(character_id)
+    hero.card_id = character_id + 1
+    hero.trophies = 300 + character_id
+    hero.highest_trophies = 500 + character_id
+    hero.power_level = 9
+    hero.selected_skin_id = 29000000 + character_id
+    return hero
+
+
+def _populated_account():
+    account = Account()
+    account.account_id = 42
+    account.pass_token = "token-ü"
+
+    avatar = account.avatar
+    _fill(avatar, AVATAR_FIELDS, 10)
+    avatar.heroes = {character_id: _hero(character_id) for character_id in (16000000, 16000001)}
+    avatar.player_display_data.name = "Ümlaut"
+    avatar.player_display_data.thumbnail_id = 28000005
+    avatar.player_display_data.profile_icon_id = 7
+
+    home = account.home
+    _fill(home, HOME_FIELDS, 1000)
+    home.heroes = {16000002: _hero(16000002)}
+    home.daily_quests = [{"id": 1, "progress": 3, "goal": 5}]
+    home.weekly_quests = [{"id": 2, "progress": 0, "goal": 10}]
+    home.special_quests = [{"id": 3, "rewards": [1, 2]}]
+    home.shop_offers = [{"type": 4, "count": 100, "cost": 30}]
+    home.featured_offers = [{"type": 5, "count": 1, "cost": 0}]
+
+    player_map = PlayerMap()
+    player_map.map_id = 77
+    player_map.map_name = "arena"
+    player_map.map_data = b"\x00\x01\xff"
+    player_map.likes = 12
+    home.player_maps = [player_map]
+
+    profile = Profile()
+    profile.account_id = 42
+    profile.display_data = PlayerDisplayData()
+    profile.display_data.name = "Ümlaut"
+    profile.heroes = [_hero(16000003)]
+    profile.add_stat(3, 1234)
+    profile.set_cosmetics(1, 2, 3, 4)
+    home.profile = profile
+
+    home.notification_settings = {"push": True, "mail": False}
+    home.privacy_settings = {1: "friends", 2: "nobody"}
+    home.session_start_time = 1700000000
+    account.clear_dirty()
+    return account
+
+
+def _state(value):
+    """Comparable form of a value: objects become their class and attributes, caches are skipped"""
+    if isinstance(value, (list, tuple)):
+        return [_state(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _state(item) for key, item in value.items()}
+    if hasattr(value, '__dict__'):
+        return (type(value).__name__,
+                {name: _state(item) for name, item in vars(value).items() if name not in ("dirty", "encode_cache")})
+    return value
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_binary_round_trip_keeps_every_attribute(compress):
+    account = _populated_account()
+    decoded = AccountCodec.decode(AccountCodec.encode(account, compress))
+    assert _state(decoded) == _state(account)
+
+
+def test_json_round_trip_keeps_every_attribute():
+    account = _populated_account()
+    row = json.dumps(AccountCodec.to_plain_dict(account), ensure_ascii=False)
+    assert _state(AccountCodec.decode(row)) == _state(account)
+
+
+def test_view_reads_summary_and_avatar_extras():
+    account = _populated_account()
+    data = AccountCodec.encode(account)
+    assert AccountCodec.read_summary(data) == (account.avatar.name, account.avatar.thumbnail_id,
+                                              account.avatar.trophies)
+    view = AccountCodec.decode_view(data)
+    assert view.avatar.player_display_data.name == "Ümlaut"
+    assert view.home.player_maps[0].map_data == b"\x00\x01\xff"
@@ -0,0 +1,77 @@
+"""
+BoundedCache eviction: on_evict runs outside the lock, vetoed entries come back
+"""
+
+import threading
+import time
+
+from database.bounded_cache import BoundedCache
+
+
+def test_lookups_do_not_wait_for_slow_on_evict():
+    started = threading.Event()
+    release = threading.Event()
+
+    def on_evict(value):
+        started.set()
+        release.wait(2.0)
+        return True
+
+    cache = BoundedCache(max_size=2, on_evict=on_evict)
+    cache.put(1, "a")
+    cache.put(2, "b")
+    writer = threading.Thread(target=cache.put, args=(3, "c"))
+    writer.start()
+    assert started.wait(1.0)
+
+    begun = time.monotonic()
+    assert cache.get(2) == "b"
+    assert time.monotonic() - begun < 0.5
+
+    release.set()
+    writer.join()
+    assert 1 not in cache
+    assert cache.get_metrics()["evictions"] == 1
+
+
+def test_vetoed_eviction_keeps_entry():
+    cache = BoundedCache(max_size=1, on_evict=lambda value: False)
+    cache.put(1, "a")
+    cache.put(2, "b")
+    assert cache.get(1) == "a"
+    assert cache.get(2) == "b"
+    assert cache.get_metrics()["evictions"] == 0
+
+
+def test_lookup_during_eviction_keeps_entry():
+    cache = BoundedCache(max_size=1)
+    seen = []
+
+    def on_evict(value):
+        seen.append(cache.get(1))
+        return True
+
+    cache._on_evict = on_evict
+    cache.put(1, "a")
+    cache.put(2, "b")
+    assert seen == ["a"]
+    assert cache.get(1) == "a"
+    assert cache.get_metrics()["evictions"] == 0
+
+
+def test_pinned_entries_are_not_evicted():
+    cache = BoundedCache(max_size=1, is_pinned=lambda key: key == 1)
+    cache.put(1, "a")
+    cache.put(2, "b")
+    assert cache.get(1) == "a"
+    assert 2 not in cache
+
+
+def test_evict_expired_skips_fresh_entries():
+    cache = BoundedCache(max_size=10, idle_ttl=0.05)
+    cache.put(1, "a")
+    time.sleep(0.1)
+    cache.put(2, "b")
+    assert cache.evict_expired() == 1
+    assert 1 not in cache
+    assert cache.get(2) == "b"
@@ -0,0 +1,100 @@
+"""
+ByteStream encoding, reads over received bytes and the bulk varint fast paths
+"""
+
+from titan.data_stream.byte_stream import ByteStream
+
+
+def test_round_trip():
+    stream = ByteStream()
+    stream.write_v_int(300)
+    stream.write_int(-5)
+    stream.write_string("hé")
+    stream.write_v_long(1 << 40)
+    stream.write_float(1.5)
+
+    stream.set_offset(0)
+    assert stream.read_v_int() == 300
+    assert stream.read_int() == -5
+    assert stream.read_string() == "hé"
+    assert stream.read_v_long() == 1 << 40
+    assert stream.read_float() == 1.5
+    assert stream.get_remaining_bytes() == 0
+
+
+def test_set_byte_array_copies_received_bytes():
+    payload = ByteStream()
+    payload.write_v_int(7)
+    payload.write_string("name")
+    received = bytearray(payload.get_bytes() + b"trailing")
+    length = payload.get_length()
+
+    stream = ByteStream()
+    stream.set_byte_array(memoryview(received), length)
+    received[:] = bytes(len(received))  # the receive buffer is reused for the next frame
+    assert stream.read_v_int() == 7
+    assert stream.read_string() == "name"
+    assert stream.get_remaining_bytes() == 0
+    assert stream.get_byte_array() == payload.get_bytes()
+
+
+SMALL = [0, 1, 5, 0x7F, 42]
+MIXED = [0, 0x7F, 0x80, 300, 0x3FFF, 0x4000, 0x0FFFFFFF, 0x10000000, 0x7FFFFFFF, -1, -300, -(1 << 31)]
+
+
+def _per_value(values):
+    stream = ByteStream()
+    for value in values:
+        stream.write_v_int(value)
+    return stream.get_bytes()
+
+
+def _unsigned(values):
+    # read_v_int returns the 32-bit pattern written for negative values
+    return [value & 0xFFFFFFFF for value in values]
+
+
+def test_write_v_ints_matches_per_value_writes():
+    for values in (SMALL, MIXED, []):
+        stream = ByteStream()
+        stream.write_v_ints(values)
+        assert stream.get_bytes() == _per_value(values)
+
+
+def test_five_byte_and_negative_values_take_five_bytes():
+    for value in (0x10000000, 0x7FFFFFFF, -1, -(1 << 31)):
+        assert len(_per_value([value])) == 5
+
+
+def test_read_v_ints_round_trip():
+    for values in (SMALL, MIXED, SMALL + MIXED):
+        stream = ByteStream(_per_value(values))
+        assert stream.read_v_ints(len(values)) == _unsigned(values)
+        assert stream.get_remaining_bytes() == 0
+
+
+def test_read_v_ints_matches_per_value_reads():
+    data = _per_value(MIXED + SMALL)
+    bulk = ByteStream(data)
+    single = ByteStream(data)
+    assert bulk.read_v_ints(len(MIXED) + len(SMALL)) == [single.read_v_int() for _ in range(len(MIXED) + len(SMALL))]
+
+
+def test_v_int_array_round_trip():
+    for values in (SMALL, MIXED, []):
+        stream = ByteStream()
+        stream.write_v_int_array(values)
+        assert stream.get_bytes() == _per_value([len(values)] + list(values))
+
+        stream.set_offset(0)
+        assert stream.read_v_int_array() == _unsigned(values)
+        assert stream.get_remaining_bytes() == 0
+
+
+def test_v_int_array_fast_path_stops_at_count():
+    stream = ByteStream()
+    stream.write_v_int_array(SMALL)
+    stream.write_v_int(300)
+    stream.set_offset(0)
+    assert stream.read_v_int_array() == SMALL
+    assert stream.read_v_int() == 300
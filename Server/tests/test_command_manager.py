@@ -0,0 +1,42 @@
+"""
+CommandManager drops only the encoded sections a command lists
+"""
+
+from logic.avatar.client_avatar import ClientAvatar
+from logic.command.avatar.logic_change_avatar_name_command import LogicChangeAvatarNameCommand
+from logic.command.command_manager import CommandManager
+from logic.home.client_home import ClientHome
+from titan.data_stream.byte_stream import ByteStream
+
+
+def _cache(owner, *sections):
+    stream = ByteStream()
+    for section in sections:
+        owner.encode_cache.write(stream, section, lambda s: s.write_v_int(1))
+
+
+def test_change_name_keeps_unrelated_sections():
+    avatar = ClientAvatar()
+    home = ClientHome()
+    _cache(avatar, *ClientAvatar.SECTIONS)
+    _cache(home, *ClientHome.SECTIONS)
+
+    command = LogicChangeAvatarNameCommand()
+    command.set_new_name("Renamed")
+    assert CommandManager().execute_command(command, avatar, home)
+
+    assert avatar.name == "Renamed"
+    assert avatar.dirty and home.dirty
+    assert set(avatar.encode_cache._sections) == set(ClientAvatar.SECTIONS) - {ClientAvatar.SECTION_HEADER}
+    assert set(home.encode_cache._sections) == set(ClientHome.SECTIONS) - {ClientHome.SECTION_HEADER}
+
+
+def test_rejected_command_changes_nothing():
+    avatar = ClientAvatar()
+    _cache(avatar, *ClientAvatar.SECTIONS)
+
+    command = LogicChangeAvatarNameCommand()
+    command.set_new_name("x")
+    assert not CommandManager().execute_command(command, avatar, ClientHome())
+    assert not avatar.dirty
+    assert set(avatar.encode_cache._sections) == set(ClientAvatar.SECTIONS)
@@ -0,0 +1,60 @@
+"""
+Handlers on different receive shards run at the same time: shared game state stays consistent
+"""
+
+import sys
+import threading
+
+import pytest
+
+# The game layer logs through colorama
+pytest.importorskip("colorama")
+
+from logic.game.battles import Battles
+
+
+def _run_concurrently(target, threads: int = 8) -> None:
+    """Run target on several threads at once, like handlers on different shards"""
+    start = threading.Barrier(threads)
+
+    def run():
+        start.wait()
+        target()
+
+    # Switch threads as often as possible so unguarded read-modify-writes would interleave
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        workers = [threading.Thread(target=run) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+
+class _Battle:
+    """Bare battle, Battles.add only files it"""
+    id = 0
+
+
+def test_battle_ids_are_unique_across_shards():
+    Battles._battles = {}
+    Battles._battle_id_counter = 0
+    ids = []
+
+    def add_battles():
+        for _ in range(500):
+            ids.append(Battles.add(_Battle()))
+
+    _run_concurrently(add_battles)
+    assert len(set(ids)) == len(ids) == 8 * 500
+    assert Battles.get_count() == len(ids)
+
+    def remove_battles():
+        for battle_id in ids:
+            Battles.remove(battle_id)
+
+    _run_concurrently(remove_battles)
+    assert Battles.get_count() == 0
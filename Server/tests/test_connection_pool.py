@@ -0,0 +1,109 @@
+"""
+ConnectionPool checkout and return, health-ping reconnects and exhaustion timeouts
+"""
+
+import pytest
+
+pytest.importorskip("mysql.connector")
+
+from database.connection_pool import ConnectionPool, PoolTimeoutError
+
+
+class FakeConnection:
+    """DB-API connection that only records pings and closes"""
+
+    def __init__(self):
+        self.alive = True
+        self.closed = False
+        self.pings = 0
+
+    def ping(self, reconnect: bool = False) -> None:
+        self.pings += 1
+        if not self.alive:
+            raise ConnectionError("server has gone away")
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def make_pool(**kwargs):
+    opened = []
+
+    def connect():
+        connection = FakeConnection()
+        opened.append(connection)
+        return connection
+
+    return ConnectionPool(connect, **kwargs), opened
+
+
+def test_checkout_and_return_reuses_connection():
+    pool, opened = make_pool(size=2)
+    with pool.connection() as first:
+        assert pool.get_metrics()["in_use"] == 1
+    with pool.connection() as second:
+        assert second is first
+
+    metrics = pool.get_metrics()
+    assert len(opened) == 1
+    assert metrics["in_use"] == 0
+    assert metrics["idle"] == 1
+    assert metrics["checkouts"] == 2
+
+
+def test_error_inside_block_discards_connection():
+    pool, opened = make_pool(size=1)
+    with pytest.raises(RuntimeError):
+        with pool.connection():
+            raise RuntimeError("query failed")
+
+    assert opened[0].closed
+    with pool.connection() as connection:
+        assert connection is opened[1]
+    assert pool.get_metrics()["opened"] == 1
+
+
+def test_health_ping_replaces_dead_connection():
+    pool, opened = make_pool(size=1, health_check_interval=0.0)
+    with pool.connection():
+        pass
+    opened[0].alive = False
+
+    with pool.connection() as connection:
+        assert connection is opened[1]
+    assert opened[0].pings == 1
+    assert opened[0].closed
+    assert pool.get_metrics()["reconnects"] == 1
+
+
+def test_health_ping_keeps_live_connection():
+    pool, opened = make_pool(size=1, health_check_interval=0.0)
+    with pool.connection():
+        pass
+    with pool.connection() as connection:
+        assert connection is opened[0]
+    assert opened[0].pings == 1
+    assert pool.get_metrics()["reconnects"] == 0
+
+
+def test_exhausted_pool_times_out():
+    pool, opened = make_pool(size=1, checkout_timeout=0.05)
+    with pool.connection():
+        with pytest.raises(PoolTimeoutError):
+            with pool.connection():
+                pass
+
+    assert pool.get_metrics()["timeouts"] == 1
+    with pool.connection() as connection:
+        assert connection is opened[0]
+
+
+def test_closed_pool_refuses_checkout():
+    pool, opened = make_pool(size=1)
+    with pool.connection():
+        pass
+    pool.close()
+    assert opened[0].closed
+    with pytest.raises(PoolTimeoutError):
+        with pool.connection():
+            pass
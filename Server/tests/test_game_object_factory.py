@@ -0,0 +1,43 @@
+"""
+GameObjectFactory free lists shared by several battle tick threads
+"""
+
+import sys
+import threading
+
+from logic.battle.object.game_object_factory import GameObjectFactory
+
+
+def test_concurrent_create_and_recycle():
+    GameObjectFactory.reset_pool()
+    errors = []
+    ids = []
+
+    def churn():
+        try:
+            for _ in range(2000):
+                projectiles = [GameObjectFactory.create_projectile(1) for _ in range(4)]
+                ids.extend(projectile.object_id for projectile in projectiles)
+                for projectile in projectiles:
+                    GameObjectFactory.recycle(projectile)
+        except Exception as e:
+            errors.append(e)
+
+    # Switch threads as often as possible so unguarded pops and counters would interleave
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=churn) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert errors == []
+    assert len(set(ids)) == len(ids)
+    stats = GameObjectFactory.get_pool_stats()
+    assert stats["allocated"] + stats["reused"] == len(ids)
+    assert stats["pooled"] == stats["allocated"]
+    GameObjectFactory.reset_pool()
@@ -0,0 +1,30 @@
+"""
+Battle worker input that arrives before its battle
+"""
+
+import pytest
+
+pytest.importorskip("colorama")
+
+from logic.game.battle_workers import PendingInputs
+
+
+def test_held_input_is_taken_in_order():
+    pending = PendingInputs(capacity=2)
+    assert pending.hold(1, 10, b"a")
+    assert pending.hold(1, 11, b"b")
+    assert not pending.hold(1, 12, b"c")
+    assert pending.dropped == 1
+    assert pending.take(1) == [(10, b"a"), (11, b"b")]
+    assert pending.take(1) == []
+    assert len(pending) == 0
+
+
+def test_expire_and_discard_count_drops():
+    pending = PendingInputs(capacity=4, timeout=-1.0)
+    pending.hold(1, 10, b"a")
+    pending.hold(2, 10, b"b")
+    pending.discard(2)
+    assert pending.expire() == 1
+    assert pending.dropped == 2
+    assert len(pending) == 0
@@ -0,0 +1,63 @@
+"""
+RankedBoard ordering, ranks and entries seeded without names
+"""
+
+from logic.game.ranked_board import RankedBoard
+
+
+def test_orders_by_score_then_id():
+    board = RankedBoard()
+    board.update(3, 100, "c")
+    board.update(1, 200, "a")
+    board.update(2, 100, "b")
+    assert [entry.account_id for entry in board.top(10)] == [1, 2, 3]
+    assert board.get_rank(3) == 3
+    assert board.get_rank(99) == 0
+
+
+def test_update_moves_entry():
+    board = RankedBoard()
+    board.update(1, 100, "a")
+    board.update(2, 50, "b")
+    board.update(2, 150)
+    assert [entry.account_id for entry in board.top(2)] == [2, 1]
+    assert board.get(2).name == "b"
+
+
+def test_seeded_entry_is_named_by_later_update():
+    board = RankedBoard()
+    board.update(1, 100)
+    assert not board.get(1).named
+    board.update(1, 100, "a", 28000000)
+    entry = board.get(1)
+    assert entry.named and entry.name == "a" and entry.thumbnail_id == 28000000
+
+
+def test_remove():
+    board = RankedBoard()
+    board.update(1, 100, "a")
+    board.update(2, 90, "b")
+    board.remove(1)
+    assert len(board) == 1
+    assert board.get_rank(2) == 1
+
+
+def test_capacity_keeps_best_entries():
+    board = RankedBoard(capacity=2)
+    assert board.update(1, 100, "a")
+    assert board.update(2, 300, "b")
+    assert board.update(3, 200, "c")
+    assert [entry.account_id for entry in board.top(10)] == [2, 3]
+    assert board.get(1) is None and board.get_rank(1) == 0
+
+    # Below the lowest kept score nothing changes
+    assert not board.update(4, 50, "d")
+    assert len(board) == 2
+
+
+def test_update_reports_changes_only():
+    board = RankedBoard()
+    board.update(1, 100, "a", 28000000)
+    assert not board.update(1, 100, "a", 28000000)
+    assert board.update(1, 120, "a", 28000000)
+    assert board.update(1, 120, "b")
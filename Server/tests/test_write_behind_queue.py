@@ -0,0 +1,53 @@
+"""
+WriteBehindQueue coalescing and waiting for one key
+"""
+
+import threading
+
+from database.write_behind_queue import WriteBehindQueue
+
+
+def test_pending_writes_coalesce_by_key():
+    gate = threading.Event()
+    written = []
+
+    def writer(batch):
+        gate.wait(5)
+        written.extend(batch)
+
+    queue = WriteBehindQueue(writer)
+    queue.start()
+    try:
+        queue.put(1, "first")
+        # The writer holds "first", so both puts for key 2 stay pending
+        while queue.depth or not queue.peek(1):
+            pass
+        queue.put(2, "old")
+        queue.put(2, "new")
+        gate.set()
+        assert queue.drain(timeout=5)
+    finally:
+        queue.stop(timeout=5)
+    assert written == ["first", "new"]
+    assert queue.coalesced == 1
+
+
+def test_wait_for_returns_once_key_is_written():
+    gate = threading.Event()
+    written = []
+
+    def writer(batch):
+        gate.wait(5)
+        written.extend(batch)
+
+    queue = WriteBehindQueue(writer)
+    queue.start()
+    try:
+        queue.put(7, "item")
+        assert not queue.wait_for(7, timeout=0.05)
+        gate.set()
+        assert queue.wait_for(7, timeout=5)
+        assert written == ["item"]
+        assert queue.wait_for(8, timeout=0)
+    finally:
+        queue.stop(timeout=5)
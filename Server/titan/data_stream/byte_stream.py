@@ -4,7 +4,16 @@ Byte-level data stream operations for network protocols
 """
 
 import struct
-from typing import Union
+from typing import Dict, Iterable, List, Sequence, Tuple, Union
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+# Precompiled codecs per byte order: short, int, long, float
+_STRUCTS: Dict[bool, Tuple[struct.Struct, ...]] = {
+    True: (struct.Struct('>h'), struct.Struct('>i'), struct.Struct('>q'), struct.Struct('>f')),
+    False: (struct.Struct('<h'), struct.Struct('<i'), struct.Struct('<q'), struct.Struct('<f')),
+}
+
 
 class ByteStream:
     """Byte stream for network protocol serialization"""
@@ -15,6 +24,7 @@ class ByteStream:
         self.offset = 0
         self.big_endian = big_endian
         self.endian_prefix = '>' if big_endian else '<'
+        self._short, self._int, self._long, self._float = _STRUCTS[big_endian]
 
     def write_byte(self, value: int) -> None:
         """Write single byte"""
@@ -38,65 +48,93 @@ class ByteStream:
 
     def write_short(self, value: int) -> None:
         """Write 16-bit short"""
-        self.data.extend(struct.pack(f'{self.endian_prefix}h', value))
+        self.data += self._short.pack(value)
 
     def read_short(self) -> int:
         """Read 16-bit short"""
         if self.offset + 2 > len(self.data):
             return 0
-        value = struct.unpack(f'{self.endian_prefix}h', self.data[self.offset:self.offset+2])[0]
+        value = self._short.unpack_from(self.data, self.offset)[0]
         self.offset += 2
         return value
 
     def write_int(self, value: int) -> None:
         """Write 32-bit integer"""
-        self.data.extend(struct.pack(f'{self.endian_prefix}i', value))
+        self.data += self._int.pack(value)
 
     def read_int(self) -> int:
         """Read 32-bit integer"""
         if self.offset + 4 > len(self.data):
             return 0
-        value = struct.unpack(f'{self.endian_prefix}i', self.data[self.offset:self.offset+4])[0]
+        value = self._int.unpack_from(self.data, self.offset)[0]
         self.offset += 4
         return value
 
     def write_long(self, value: int) -> None:
         """Write 64-bit long"""
-        self.data.extend(struct.pack(f'{self.endian_prefix}q', value))
+        self.data += self._long.pack(value)
 
     def read_long(self) -> int:
         """Read 64-bit long"""
         if self.offset + 8 > len(self.data):
             return 0
-        value = struct.unpack(f'{self.endian_prefix}q', self.data[self.offset:self.offset+8])[0]
+        value = self._long.unpack_from(self.data, self.offset)[0]
         self.offset += 8
         return value
 
-    def write_v_int(self, value: int) -> None:
-        """Write variable-length integer"""
-        value = value & 0xFFFFFFFF  # Ensure 32-bit
+    def write_float(self, value: float) -> None:
+        """Write 32-bit float"""
+        self.data += self._float.pack(value)
 
-        while value >= 0x80:
-            self.write_byte((value & 0x7F) | 0x80)
-            value >>= 7
+    def read_float(self) -> float:
+        """Read 32-bit float"""
+        if self.offset + 4 > len(self.data):
+            return 0.0
+        value = self._float.unpack_from(self.data, self.offset)[0]
+        self.offset += 4
+        return value
 
-        self.write_byte(value & 0x7F)
+    def write_v_int(self, value: int) -> None:
+        """Write variable-length integer"""
+        self.data += _encode_varint(value & 0xFFFFFFFF)
 
     def read_v_int(self) -> int:
         """Read variable-length integer"""
-        result = 0
-        shift = 0
+        value, self.offset = _decode_varint(self.data, self.offset, len(self.data), 32)
+        return value
 
-        while shift < 32:
-            byte_val = self.read_byte()
-            result |= (byte_val & 0x7F) << shift
+    def write_v_long(self, value: int) -> None:
+        """Write variable-length 64-bit integer"""
+        self.data += _encode_varint(value & 0xFFFFFFFFFFFFFFFF)
 
-            if (byte_val & 0x80) == 0:
-                break
+    def read_v_long(self) -> int:
+        """Read variable-length 64-bit integer"""
+        value, self.offset = _decode_varint(self.data, self.offset, len(self.data), 64)
+        return value
 
-            shift += 7
+    def write_v_ints(self, values: Iterable[int]) -> None:
+        """Write a run of variable-length integers in one pass, without a count"""
+        self.data += _encode_varints(values, 0xFFFFFFFF)
 
-        return result
+    def read_v_ints(self, count: int) -> List[int]:
+        """Read count variable-length integers in one pass"""
+        values, self.offset = _decode_varints(self.data, self.offset, len(self.data), count, 32)
+        return values
+
+    def write_v_int_array(self, values: Sequence[int]) -> None:
+        """Write a count-prefixed variable-length integer array"""
+        if values is None:
+            self.write_v_int(0)
+        else:
+            self.write_v_int(len(values))
+            self.write_v_ints(values)
+
+    def read_v_int_array(self) -> List[int]:
+        """Read a count-prefixed variable-length integer array"""
+        count = self.read_v_int()
+        if count <= 0:
+            return []
+        return self.read_v_ints(count)
 
     def write_string(self, value: str) -> None:
         """Write string with length prefix"""
@@ -105,7 +143,7 @@ class ByteStream:
         else:
             encoded = value.encode('utf-8')
             self.write_v_int(len(encoded))
-            self.data.extend(encoded)
+            self.data += encoded
 
     def read_string(self) -> str:
         """Read string with length prefix"""
@@ -116,13 +154,9 @@ class ByteStream:
         if self.offset + length > len(self.data):
             return ""
 
-        data = self.data[self.offset:self.offset + length]
+        start = self.offset
         self.offset += length
-
-        try:
-            return data.decode('utf-8')
-        except UnicodeDecodeError:
-            return ""
+        return _decode_utf8(self.data, start, length)
 
     def write_bytes(self, data: bytes) -> None:
         """Write byte array with length prefix"""
@@ -130,7 +164,7 @@ class ByteStream:
             self.write_v_int(0)
         else:
             self.write_v_int(len(data))
-            self.data.extend(data)
+            self.data += data
 
     def read_bytes(self) -> bytes:
         """Read byte array with length prefix"""
@@ -141,14 +175,28 @@ class ByteStream:
         if self.offset + length > len(self.data):
             return b""
 
-        data = self.data[self.offset:self.offset + length]
+        data = bytes(memoryview(self.data)[self.offset:self.offset + length])
         self.offset += length
-        return bytes(data)
+        return data
+
+    def write(self, data: Buffer) -> None:
+        """Write raw bytes"""
+        self.data += data
+
+    def read(self, count: int) -> bytes:
+        """Read up to count raw bytes"""
+        data = bytes(memoryview(self.data)[self.offset:self.offset + count])
+        self.offset += len(data)
+        return data
 
     def get_remaining_bytes(self) -> int:
         """Get number of remaining bytes"""
         return max(0, len(self.data) - self.offset)
 
+    def get_length(self) -> int:
+        """Bytes written"""
+        return len(self.data)
+
     def get_capacity(self) -> int:
         """Get total capacity"""
         return len(self.data)
@@ -165,7 +213,100 @@ class ByteStream:
         """Get all bytes"""
         return bytes(self.data)
 
+    def get_byte_array(self) -> bytes:
+        """Get all bytes"""
+        return bytes(self.data)
+
+    def set_byte_array(self, data: Buffer, length: int) -> None:
+        """Read from a copy of the first length bytes of data"""
+        self.data = bytearray(memoryview(data)[:length])
+        self.offset = 0
+
     def clear(self) -> None:
         """Clear stream"""
         self.data.clear()
         self.offset = 0
+
+
+def _encode_varint(value: int) -> bytes:
+    """7-bit groups, least significant first; value must already be unsigned"""
+    if value < 0x80:
+        return bytes((value,))
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _decode_varint(data: Buffer, offset: int, end: int, bits: int) -> Tuple[int, int]:
+    """Decode a varint at offset, returns (value, new offset); missing bytes read as zero"""
+    result = 0
+    shift = 0
+    while shift < bits:
+        if offset >= end:
+            break
+        byte_val = data[offset]
+        offset += 1
+        result |= (byte_val & 0x7F) << shift
+        if not byte_val & 0x80:
+            break
+        shift += 7
+    return result, offset
+
+
+def _encode_varints(values: Iterable[int], mask: int) -> bytes:
+    """Encode a run of varints; a run of values below 0x80 is converted by bytes() in one call"""
+    if not isinstance(values, (list, tuple)):
+        values = list(values)
+    if not values:
+        return b""
+    if min(values) >= 0 and max(values) < 0x80:
+        return bytes(values)
+
+    out = bytearray()
+    append = out.append
+    for value in values:
+        value &= mask
+        while value >= 0x80:
+            append((value & 0x7F) | 0x80)
+            value >>= 7
+        append(value)
+    return bytes(out)
+
+
+def _decode_varints(data: Buffer, offset: int, end: int, count: int, bits: int) -> Tuple[List[int], int]:
+    """Decode count varints at offset, returns (values, new offset); missing values read as zero"""
+    if count <= 0:
+        return [], offset
+
+    # All single-byte values: the next count bytes are the values themselves
+    stop = offset + count
+    if stop <= end:
+        window = memoryview(data)[offset:stop]
+        if max(window) < 0x80:
+            return window.tolist(), stop
+
+    values: List[int] = []
+    append = values.append
+    for _ in range(count):
+        result = 0
+        shift = 0
+        while shift < bits and offset < end:
+            byte_val = data[offset]
+            offset += 1
+            result |= (byte_val & 0x7F) << shift
+            if not byte_val & 0x80:
+                break
+            shift += 7
+        append(result)
+    return values, offset
+
+
+def _decode_utf8(data: Buffer, start: int, length: int) -> str:
+    """Decode a UTF-8 slice of the buffer without an intermediate copy"""
+    try:
+        return str(memoryview(data)[start:start + length], 'utf-8')
+    except UnicodeDecodeError:
+        return ""